@@ -2,14 +2,14 @@
 """
 Summary of Document Classification Performance Across All Collections.
 """
-import fitz
 import os
 import sys
 from collections import Counter
 from datetime import datetime
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'ocr-gui'))
-from document_classifier import classify_document, DocType
+from document_classifier import DocType
+from parallel_classifier import ParallelClassifier
 
 COLLECTIONS = {
     "Warren Commission": {
@@ -32,7 +32,7 @@ COLLECTIONS = {
     },
 }
 
-def test_collection(name: str, config: dict):
+def test_collection(name: str, config: dict, classifier: ParallelClassifier):
     """Test a single collection."""
     type_counts = Counter()
     total_pages = 0
@@ -47,21 +47,17 @@ def test_collection(name: str, config: dict):
     
     sample_per_file = config.get("sample_per_file", 15)
     
-    for pdf_path in files:
-        if not os.path.exists(pdf_path):
-            continue
-            
-        pdf = fitz.open(pdf_path)
-        pages = len(pdf)
+    def sample_pages(pages):
         step = max(1, pages // sample_per_file)
-        
-        for i in range(0, pages, step)[:sample_per_file]:
-            text = pdf[i].get_text()
-            result = classify_document(text)
-            type_counts[result.doc_type.value] += 1
+        return range(0, pages, step)[:sample_per_file]
+    
+    # Samples of every file are classified together across the worker pool
+    files = [f for f in files if os.path.exists(f)]
+    results = classifier.classify_pdfs(files, pages_for=sample_pages, continuity=False)
+    for pages in results.values():
+        for page in pages:
+            type_counts[page.classification.doc_type.value] += 1
             total_pages += 1
-        
-        pdf.close()
     
     return type_counts, total_pages
 
@@ -76,11 +72,12 @@ def main():
     all_counts = Counter()
     total_all = 0
     
+    classifier = ParallelClassifier()
     for name, config in COLLECTIONS.items():
         print(f"\n{name}")
         print("-" * 40)
         
-        counts, total = test_collection(name, config)
+        counts, total = test_collection(name, config, classifier)
         all_counts.update(counts)
         total_all += total
         
@@ -90,6 +87,7 @@ def main():
         
         unknown_pct = counts.get("UNKNOWN", 0) / total * 100 if total > 0 else 0
         print(f"  UNKNOWN rate: {unknown_pct:.1f}%")
+    classifier.shutdown()
     
     # Overall summary
     print("\n" + "=" * 70)
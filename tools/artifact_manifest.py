@@ -0,0 +1,438 @@
+"""
+artifact_manifest.py — Per-document record of every processed artifact
+
+Every processed document gets a <base>.manifest.json in processed/ naming
+its source file and each derivative by role, with sizes, mtimes and
+SHA-256 hashes:
+
+    {
+        "base": "yates",
+        "source": "uploads/yates.pdf",
+        "searchable_pdf": "yates_searchable.pdf",
+        "txt": "yates.txt", "md": "yates.md", "html": null,
+        "ocr_json": "yates.ocr.json", "transcript": null,
+        "vtt": null, "srt": null, "entities": null,
+        "metadata": "yates.documents.json",
+        "alternate_sources": ["uploads/yates.mp3"],
+        "sizes": {"source": 1048576, ...},
+        "modified": {"source": 1772580320.0, ...},
+        "hashes": {"source": "9f86d0...", ...},
+        "updated_at": "2026-10-16T12:00:00"
+    }
+
+Paths are relative to processed/. When two sources share a base name
+(uploads/yates.pdf and uploads/yates.mp3), one is the document's "source"
+and the others are listed under "alternate_sources", so every one of them
+stays resolvable and deletable by name.
+
+The server records a manifest when a job, paste or URL ingest finishes
+writing a document's files, and endpoints resolve artifacts with one
+manifest lookup instead of probing candidate paths. A lookup that misses
+rebuilds the manifest once if the requested file exists on disk (written
+after the manifest, or by code that never called record()); documents
+processed before manifests existed get one built on first lookup. Hashes
+are computed on a background thread, so a manifest may briefly lack hashes
+for files that just changed.
+
+Usage:
+    manifests = ArtifactManifests("processed", source_exts={"pdf", "mp3"})
+    manifests.record("yates", source_path="processed/uploads/yates.pdf")
+    path = manifests.locate("yates_searchable.pdf")     # Absolute path or None
+    manifest, relpath = manifests.resolve("yates.mp3")  # Entry of one file
+    manifests.artifact_path("yates", "txt")
+    manifests.remove("yates")                           # Document + derivatives
+"""
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+# Derivative roles and the suffix appended to the base name in processed/
+ARTIFACT_SUFFIXES = {
+    "searchable_pdf": "_searchable.pdf",
+    "txt": ".txt",
+    "md": ".md",
+    "html": ".html",
+    "ocr_json": ".ocr.json",
+    "transcript": ".transcript.json",
+    "vtt": ".vtt",
+    "srt": ".srt",
+    "entities": ".entities.json",
+    "metadata": ".documents.json",
+}
+
+ROLES = ("source",) + tuple(ARTIFACT_SUFFIXES)
+
+MANIFEST_SUFFIX = ".manifest.json"
+
+# Longest first, so "x.ocr.json" is not read as "x.ocr" + ".json"
+_DERIVED_SUFFIXES = sorted(list(ARTIFACT_SUFFIXES.values()) + [MANIFEST_SUFFIX], key=len, reverse=True)
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def document_base(filename: str) -> str:
+    """Base name of the document a file belongs to (x_searchable.pdf -> x)."""
+    for suffix in _DERIVED_SUFFIXES:
+        if filename.endswith(suffix) and len(filename) > len(suffix):
+            return filename[:-len(suffix)]
+    return os.path.splitext(filename)[0]
+
+
+def is_derived(filename: str) -> bool:
+    """True if filename is a derivative or manifest rather than a source."""
+    return any(filename.endswith(suffix) and len(filename) > len(suffix) for suffix in _DERIVED_SUFFIXES)
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactManifests:
+    """Reads, writes and caches the manifests in one processed/ folder."""
+
+    def __init__(self, folder: str, source_exts=()):
+        """
+        Args:
+            folder: The processed/ folder
+            source_exts: Extensions (without the dot) probed for a document's
+                         source when building a manifest with no known source
+        """
+        self.folder = folder
+        self.uploads_dir = os.path.join(folder, "uploads")
+        self.source_exts = sorted(source_exts)
+        self._cache: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        # Hashing large media must not block the request that wrote it
+        self._hasher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="manifest-hash")
+        self._hash_pending: set[str] = set()
+
+    def manifest_path(self, base_name: str) -> str:
+        return os.path.join(self.folder, f"{base_name}{MANIFEST_SUFFIX}")
+
+    def abspath(self, relpath: str) -> str:
+        return os.path.join(self.folder, *relpath.split("/"))
+
+    # =========================================================================
+    # Reading
+    # =========================================================================
+
+    def get(self, base_name: str, build: bool = True) -> Optional[dict]:
+        """
+        The manifest of a document, from the cache or its file.
+
+        Args:
+            base_name: Document base name
+            build: Build and write one if the document has no manifest yet
+
+        Returns:
+            Manifest dict, or None if the document has no files at all
+        """
+        with self._lock:
+            manifest = self._cache.get(base_name)
+        if manifest is not None:
+            return manifest
+        try:
+            with open(self.manifest_path(base_name), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return self.record(base_name) if build else None
+        with self._lock:
+            self._cache[base_name] = manifest
+        return manifest
+
+    def is_artifact_name(self, filename: str) -> bool:
+        """True if filename can be a document's source or derivative."""
+        ext = os.path.splitext(filename)[1][1:].lower()
+        return is_derived(filename) or ext in self.source_exts
+
+    def artifact_path(self, base_name: str, role: str) -> Optional[str]:
+        """Absolute path of one artifact of a document, or None."""
+        manifest = self.get(base_name)
+        relpath = manifest.get(role) if manifest else None
+        if not relpath and role in ARTIFACT_SUFFIXES:
+            if os.path.isfile(self.abspath(f"{base_name}{ARTIFACT_SUFFIXES[role]}")):
+                manifest = self.record(base_name)  # Written after the manifest
+                relpath = manifest.get(role) if manifest else None
+        if relpath and os.path.isfile(self.abspath(relpath)):
+            return self.abspath(relpath)
+        return None
+
+    def _on_disk(self, filename: str) -> bool:
+        return (os.path.isfile(os.path.join(self.folder, filename))
+                or os.path.isfile(os.path.join(self.uploads_dir, filename)))
+
+    def resolve(self, filename: str) -> tuple[Optional[dict], Optional[str]]:
+        """
+        The manifest of the document a file belongs to and the file's entry
+        in it, for a file name as the UI passes it.
+
+        Returns:
+            (manifest, relpath) where relpath is the file's processed/-relative
+            path if the manifest lists it (as any role or alternate source);
+            (manifest, None) if it does not, (None, None) for unknown names
+        """
+        if not self.is_artifact_name(filename):
+            return None, None
+        base_name = document_base(filename)
+        manifest = self.get(base_name, build=False)
+        relpath = self._listed(manifest, filename) if manifest else None
+        if relpath is None and (manifest is None or self._on_disk(filename)):
+            manifest = self.record(base_name, source_name=filename)
+            relpath = self._listed(manifest, filename) if manifest else None
+        return manifest, relpath
+
+    @staticmethod
+    def _listed(manifest: dict, filename: str) -> Optional[str]:
+        """processed/-relative path under which manifest lists filename."""
+        listed = [manifest.get(role) for role in ROLES] + manifest.get("alternate_sources", [])
+        for relpath in (filename, f"uploads/{filename}"):
+            if relpath in listed:
+                return relpath
+        return None
+
+    def locate(self, filename: str) -> Optional[str]:
+        """
+        Resolve a file name as the UI passes it (x.pdf, x_searchable.pdf,
+        x.mp3, x.txt) to an absolute path.
+
+        Priority matches the old path probing: the file itself in processed/,
+        then the searchable PDF (for .pdf names), then the original in
+        uploads/. Names that cannot be a source or derivative (jobs.db)
+        resolve to None.
+        """
+        if not self.is_artifact_name(filename):
+            return None
+        base_name = document_base(filename)
+        manifest = self.get(base_name, build=False)
+        path = self._pick(manifest, filename) if manifest else None
+        if not (path and os.path.isfile(path)) and (manifest is None or self._on_disk(filename)):
+            manifest = self.record(base_name, source_name=filename)
+            path = self._pick(manifest, filename) if manifest else None
+        if path and os.path.isfile(path):
+            return path
+        return None
+
+    def _pick(self, manifest: dict, filename: str) -> Optional[str]:
+        relpath = self._listed(manifest, filename)
+        if relpath == filename:
+            return self.abspath(filename)
+        if filename.lower().endswith(".pdf") and manifest.get("searchable_pdf"):
+            return self.abspath(manifest["searchable_pdf"])
+        if relpath:
+            return self.abspath(relpath)
+        return None
+
+    # =========================================================================
+    # Writing
+    # =========================================================================
+
+    def _find_sources(self, base_name: str, previous: Optional[dict],
+                      source_path: Optional[str], source_name: Optional[str]) -> list[str]:
+        """
+        processed/-relative paths of the document's original files, the
+        source first and then any others sharing its base name.
+        """
+        candidates = []
+        if source_path:
+            candidates.append(source_path)
+        if previous:
+            # Keep the existing source first so a new upload does not displace it
+            candidates += [self.abspath(p) for p in [previous.get("source")] + previous.get("alternate_sources", []) if p]
+        if source_name and not is_derived(source_name):
+            candidates += [os.path.join(self.folder, source_name), os.path.join(self.uploads_dir, source_name)]
+        for ext in self.source_exts:
+            candidates += [
+                os.path.join(self.folder, f"{base_name}.{ext}"),
+                os.path.join(self.uploads_dir, f"{base_name}.{ext}"),
+            ]
+        sources = []
+        for path in candidates:
+            if not os.path.isfile(path):
+                continue
+            relpath = os.path.relpath(path, self.folder).replace(os.sep, "/")
+            if relpath.startswith("..") or ("/" not in relpath and is_derived(relpath)):
+                continue  # Outside processed/, or one of the document's derivatives
+            if relpath not in sources:
+                sources.append(relpath)
+        return sources
+
+    def record(self, base_name: str, source_path: Optional[str] = None,
+               source_name: Optional[str] = None) -> Optional[dict]:
+        """
+        Rebuild a document's manifest from the files on disk and write it
+        atomically. Hashes are reused for files whose size and mtime did not
+        change; the others are computed in the background.
+
+        Args:
+            base_name: Document base name
+            source_path: Absolute path of the original, if known
+            source_name: File name the document was requested by
+
+        Returns:
+            The new manifest, or None if the document has no files (any
+            stale manifest is removed)
+        """
+        previous = self.get(base_name, build=False)
+        manifest = {"base": base_name}
+        sources = self._find_sources(base_name, previous, source_path, source_name)
+        paths = {"source": sources[0] if sources else None}
+        for role, suffix in ARTIFACT_SUFFIXES.items():
+            relpath = f"{base_name}{suffix}"
+            paths[role] = relpath if os.path.isfile(self.abspath(relpath)) else None
+        manifest.update(paths)
+        manifest["alternate_sources"] = sources[1:]
+
+        sizes, modified, hashes = {}, {}, {}
+        old_hashes = previous.get("hashes", {}) if previous else {}
+        for role, relpath in paths.items():
+            if not relpath:
+                continue
+            try:
+                st = os.stat(self.abspath(relpath))
+            except OSError:
+                manifest[role] = None
+                continue
+            unchanged = (
+                previous
+                and previous.get(role) == relpath
+                and previous.get("sizes", {}).get(role) == st.st_size
+                and previous.get("modified", {}).get(role) == st.st_mtime
+                and role in old_hashes
+            )
+            if unchanged:
+                hashes[role] = old_hashes[role]
+            sizes[role] = st.st_size
+            modified[role] = st.st_mtime
+        manifest.update(sizes=sizes, modified=modified, hashes=hashes,
+                        updated_at=datetime.now().isoformat(timespec="seconds"))
+
+        if not sizes:
+            self._forget(base_name)
+            return None
+
+        self._write(base_name, manifest)
+        if hashes.keys() != sizes.keys():
+            self._schedule_hashes(base_name)
+        return manifest
+
+    def _write(self, base_name: str, manifest: dict, replaces: Optional[dict] = None) -> bool:
+        """
+        Write a manifest atomically and cache it. With replaces, only if the
+        cached manifest is still that one (no newer record() in between).
+        """
+        path = self.manifest_path(base_name)
+        with self._lock:
+            if replaces is not None and self._cache.get(base_name) is not replaces:
+                return False
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(tmp_path, path)
+            self._cache[base_name] = manifest
+        return True
+
+    def _schedule_hashes(self, base_name: str):
+        with self._lock:
+            if base_name in self._hash_pending:
+                return
+            self._hash_pending.add(base_name)
+        self._hasher.submit(self._fill_hashes, base_name)
+
+    def _fill_hashes(self, base_name: str):
+        """Hash the artifacts the current manifest has no hash for."""
+        with self._lock:
+            self._hash_pending.discard(base_name)
+            manifest = self._cache.get(base_name)
+        if not manifest:
+            return
+        hashes = dict(manifest.get("hashes", {}))
+        for role, size in manifest.get("sizes", {}).items():
+            if role in hashes:
+                continue
+            path = self.abspath(manifest[role])
+            try:
+                st = os.stat(path)
+                if st.st_size != size or st.st_mtime != manifest["modified"][role]:
+                    continue  # Changed again; the next record() rehashes it
+                hashes[role] = file_sha256(path)
+            except OSError as e:
+                print(f"Warning: could not hash {manifest[role]}: {e}")
+        if hashes != manifest.get("hashes"):
+            self._write(base_name, {**manifest, "hashes": hashes}, replaces=manifest)
+
+    def wait_for_hashes(self):
+        """Block until queued hashing has finished (tests, shutdown)."""
+        self._hasher.submit(lambda: None).result()
+
+    def _forget(self, base_name: str):
+        with self._lock:
+            self._cache.pop(base_name, None)
+        try:
+            os.remove(self.manifest_path(base_name))
+        except FileNotFoundError:
+            pass
+
+    def remove(self, base_name: str, roles=ROLES,
+               alternates: Optional[list[str]] = None) -> tuple[list[str], list[str]]:
+        """
+        Delete a document's artifacts; the manifest goes too once nothing
+        is left, otherwise it is rewritten.
+
+        Args:
+            base_name: Document base name
+            roles: Roles to delete (default: source and every derivative)
+            alternates: Alternate sources to delete (processed/-relative);
+                        default: all of them if roles include "source"
+
+        Returns:
+            (deleted processed/-relative paths, warnings)
+        """
+        # Rebuild first so files written since the last record() go too
+        manifest = self.record(base_name)
+        deleted, warnings = [], []
+        if not manifest:
+            return deleted, warnings
+        if alternates is None:
+            alternates = manifest["alternate_sources"] if "source" in roles else []
+        targets = [manifest.get(role) for role in roles]
+        targets += [p for p in alternates if p in manifest["alternate_sources"]]
+        for relpath in targets:
+            if not relpath:
+                continue
+            try:
+                os.remove(self.abspath(relpath))
+                deleted.append(relpath)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                warnings.append(f"Failed to delete {os.path.basename(relpath)}: {e}")
+        self.record(base_name)
+        return deleted, warnings
+
+    def export(self, base_name: str, zf, prefix: Optional[str] = None) -> int:
+        """
+        Add a document's artifacts and manifest to an open ZipFile.
+
+        Returns:
+            Number of artifacts written
+        """
+        manifest = self.record(base_name)
+        if not manifest:
+            return 0
+        prefix = prefix if prefix is not None else f"{base_name}/"
+        count = 0
+        for relpath in [manifest.get(role) for role in ROLES] + manifest["alternate_sources"]:
+            if relpath and os.path.isfile(self.abspath(relpath)):
+                zf.write(self.abspath(relpath), f"{prefix}{relpath}")
+                count += 1
+        zf.writestr(f"{prefix}{base_name}{MANIFEST_SUFFIX}", json.dumps(manifest, indent=2))
+        return count
@@ -4,14 +4,13 @@ Pattern Discovery Tool
 
 Analyzes UNKNOWN pages to discover new document types and patterns.
 """
-import fitz
 import os
 import sys
 import re
 from collections import Counter
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'ocr-gui'))
-from document_classifier import classify_document, get_all_scores
+from parallel_classifier import ParallelClassifier
 
 WC_DIR = "raw-material/warren-commission"
 
@@ -21,24 +20,29 @@ def analyze_unknown_pages(volume_nums=[16, 17, 18, 19, 20, 21], samples_per_vol=
     all_texts = []
     pattern_counts = Counter()
     
+    volumes = {}
     for vol_num in volume_nums:
         pdf_path = f"{WC_DIR}/GPO-WARRENCOMMISSIONHEARINGS-{vol_num}.pdf"
-        if not os.path.exists(pdf_path):
-            continue
-            
+        if os.path.exists(pdf_path):
+            volumes[pdf_path] = vol_num
+    
+    def sample_pages(total_pages):
+        step = max(1, total_pages // samples_per_vol)
+        return range(0, total_pages, step)[:samples_per_vol]
+    
+    # Classify the samples of all volumes across the worker pool at once
+    with ParallelClassifier() as classifier:
+        classified = classifier.classify_pdfs(volumes, pages_for=sample_pages, continuity=False)
+    
+    for pdf_path, vol_num in volumes.items():
         print(f"\n{'='*60}")
         print(f"VOLUME {vol_num}")
         print(f"{'='*60}")
         
-        pdf = fitz.open(pdf_path)
-        total_pages = len(pdf)
-        step = max(1, total_pages // samples_per_vol)
-        
-        for i in range(0, total_pages, step)[:samples_per_vol]:
-            page_num = i + 1
-            text = pdf[i].get_text()
-            
-            result = classify_document(text)
+        for page in classified[pdf_path]:
+            page_num = page.page
+            text = page.text
+            result = page.classification
             
             if result.doc_type.value == "UNKNOWN" and len(text) > 100:
                 print(f"\n--- Page {page_num} ({len(text)} chars) ---")
@@ -110,8 +114,6 @@ def analyze_unknown_pages(volume_nums=[16, 17, 18, 19, 20, 21], samples_per_vol=
                     "text": text,
                     "patterns": patterns_found
                 })
-        
-        pdf.close()
     
     print("\n" + "="*60)
     print("PATTERN SUMMARY")
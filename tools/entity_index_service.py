@@ -0,0 +1,151 @@
+"""
+entity_index_service.py — One shared, hot-reloadable entity index
+
+Holds the EntityMatcher and EntityLinker built from the project's entity
+JSON files (people.json, places.json, organizations.json) as a single
+immutable snapshot, so both engines always agree on which entities exist.
+
+Updates are copy-on-write: a background thread rebuilds the snapshot from
+the files and swaps it in with one assignment. Requests read whichever
+snapshot is current and never see a half-built index; writers never block
+readers. The matcher automaton and linker fuzzy index are compiled over
+every name, so each update is a full rebuild; queued updates that have
+not started yet are coalesced into one.
+
+Usage:
+    service = EntityIndexService(data_dir)
+    service.load()                       # Synchronous initial build
+
+    snapshot = service.snapshot          # Take once per request
+    snapshot.matcher.find_matches(text)
+    snapshot.linker.link_entities(text)
+
+    service.add_record("people.json")    # Background, returns a Future
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from entity_matcher import EntityMatcher
+
+# entity_matcher puts ocr-gui/ on sys.path
+from entity_linker import EntityLinker
+
+# Data files that feed the index
+ENTITY_FILES = ("people.json", "places.json", "organizations.json")
+
+
+@dataclass(frozen=True)
+class EntitySnapshot:
+    """Matcher and linker built from the same entity records."""
+    matcher: EntityMatcher
+    linker: EntityLinker
+    version: int
+    built_at: str
+
+
+class EntityIndexService:
+    """Owns the current EntitySnapshot and rebuilds it off the request path."""
+
+    def __init__(self, data_dir: str, sample_fallback: bool = True):
+        self.data_dir = str(data_dir)
+        self.sample_fallback = sample_fallback
+        self._snapshot: Optional[EntitySnapshot] = None
+        self._version = 0
+        # One builder thread: updates apply in order, each on the latest snapshot
+        self._builder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="entity-index")
+        self._lock = threading.Lock()
+        self._queued: Optional[Future] = None
+
+    @property
+    def snapshot(self) -> EntitySnapshot:
+        """The current snapshot (load() must have been called)."""
+        return self._snapshot
+
+    @property
+    def matcher(self) -> EntityMatcher:
+        return self._snapshot.matcher
+
+    @property
+    def linker(self) -> EntityLinker:
+        return self._snapshot.linker
+
+    def _publish(self, matcher: EntityMatcher, linker: EntityLinker) -> EntitySnapshot:
+        with self._lock:
+            self._version += 1
+            self._snapshot = EntitySnapshot(
+                matcher=matcher,
+                linker=linker,
+                version=self._version,
+                built_at=datetime.now().isoformat(),
+            )
+            return self._snapshot
+
+    # =========================================================================
+    # Building
+    # =========================================================================
+
+    def _build_full(self) -> EntitySnapshot:
+        """Build a snapshot from every entity file."""
+        matcher = EntityMatcher()
+        loaded = matcher.load_from_entity_files(self.data_dir)
+        if loaded == 0 and self.sample_fallback:
+            print("Warning: No entities loaded from JSON files, falling back to sample data")
+            matcher.load_sample_data()
+        matcher = EntityMatcher.from_index(matcher.index)
+        linker = EntityLinker(Path(self.data_dir))
+        return self._publish(matcher, linker)
+
+    def _run_queued(self) -> EntitySnapshot:
+        with self._lock:
+            self._queued = None
+        return self._build_full()
+
+    def load(self) -> EntitySnapshot:
+        """Build the initial snapshot synchronously."""
+        return self._build_full()
+
+    def reload(self) -> Future:
+        """
+        Rebuild from the files in the background.
+
+        A rebuild that is queued but not started yet already reads the
+        latest files, so its Future is returned instead of queuing another.
+        """
+        with self._lock:
+            if self._queued is None:
+                self._queued = self._builder.submit(self._run_queued)
+            return self._queued
+
+    def add_record(self, target_file: str) -> Optional[Future]:
+        """
+        Pick up a record just written to target_file, in the background.
+
+        Returns a Future resolving to the new snapshot, or None if the file
+        does not feed the entity index.
+        """
+        if target_file not in ENTITY_FILES:
+            return None
+        return self.reload()
+
+    # =========================================================================
+    # Info
+    # =========================================================================
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        index = snapshot.matcher.index
+        return {
+            "version": snapshot.version,
+            "built_at": snapshot.built_at,
+            "matcher_entities": index.total_count(),
+            "linker_people": len(snapshot.linker.people),
+            "linker_places": len(snapshot.linker.places),
+        }
+
+    def shutdown(self):
+        self._builder.shutdown(wait=True)
@@ -9,6 +9,10 @@ Supports:
 - Alias matching via person_alias table
 - Confidence scoring (100% for exact match, lower for partial/fuzzy)
 
+All known names are compiled into one Aho-Corasick automaton
+(ocr-gui/name_automaton.py), rebuilt whenever the index changes, so every
+whole-word occurrence of every name is found in a single pass over the text.
+
 Usage:
     from entity_matcher import EntityMatcher, find_entities
     
@@ -24,10 +28,24 @@ Usage:
 import json
 import os
 import re
+import sys
 from dataclasses import dataclass, asdict, field
 from typing import Optional
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'ocr-gui'))
+from name_automaton import NameAutomaton
+from span_resolver import SpanSet, select_spans
+
+# Index tables scanned by find_matches: (table, entity_type, confidence, method)
+# Table order breaks ties between equal matches at the same position
+MATCH_TABLES = [
+    ("persons", "person", 1.0, "exact_match"),
+    ("aliases", "person", 0.95, "alias_match"),  # Slightly lower for alias
+    ("places", "place", 1.0, "exact_match"),
+    ("orgs", "org", 1.0, "exact_match"),
+]
+
 
 @dataclass
 class EntityMatch:
@@ -58,6 +76,53 @@ class EntityIndex:
     def total_count(self) -> int:
         return len(self.persons) + len(self.aliases) + len(self.places) + len(self.orgs)
 
+    def add_person_record(self, p: dict):
+        """Index one people.json record with its flipped name and aliases."""
+        display = p.get("display_name", "")
+        pid = p.get("person_id") or p.get("id") or "unknown"
+        if display:
+            self.persons[display.lower()] = {
+                "id": pid, "display_name": display
+            }
+            # Also index "First Last" if "Last, First"
+            if "," in display:
+                parts = [part.strip() for part in display.split(",")]
+                if len(parts) == 2:
+                    flipped = f"{parts[1]} {parts[0]}"
+                    self.persons[flipped.lower()] = {
+                        "id": pid, "display_name": display
+                    }
+        # Index aliases from nested aliases array
+        for alias in p.get("aliases", []):
+            alias_name = alias.get("alias_name") or alias.get("alias_value", "")
+            if alias_name:
+                self.aliases[alias_name.lower()] = {
+                    "person_id": pid, "display_name": display
+                }
+
+    def add_place_record(self, p: dict):
+        """Index one places.json record."""
+        name = p.get("name", "")
+        pid = p.get("place_id") or p.get("id") or "unknown"
+        if name:
+            self.places[name.lower()] = {"id": pid, "name": name}
+
+    def add_org_record(self, o: dict):
+        """Index one organizations.json record."""
+        name = o.get("name", "")
+        oid = o.get("org_id") or o.get("id") or "unknown"
+        if name:
+            self.orgs[name.lower()] = {"id": oid, "name": name}
+
+    def build_automaton(self) -> NameAutomaton:
+        """Compile every indexed name into one automaton."""
+        automaton = NameAutomaton()
+        for rank, (table, entity_type, confidence, method) in enumerate(MATCH_TABLES):
+            for name_lower, info in getattr(self, table).items():
+                automaton.add(name_lower, (rank, entity_type, confidence, method, info))
+        automaton.build()
+        return automaton
+
 
 class EntityMatcher:
     """
@@ -70,10 +135,20 @@ class EntityMatcher:
     
     def __init__(self):
         self.index = EntityIndex()
+        self._automaton = None
+        self._automaton_key = None
         self._name_pattern = re.compile(
             r'\b(?:[A-Z][a-z]+|[A-Z]{2,})(?:\s+[A-Z]\.?\s*)?(?:\s+(?:[A-Z][a-z]+|[A-Z]{2,}))+\b'
         )
     
+    @classmethod
+    def from_index(cls, index: EntityIndex) -> "EntityMatcher":
+        """Matcher over an existing index, with its automaton compiled up front."""
+        matcher = cls()
+        matcher.index = index
+        matcher._get_automaton()
+        return matcher
+    
     # =========================================================================
     # LOADING METHODS
     # =========================================================================
@@ -255,35 +330,13 @@ class EntityMatcher:
         Returns:
             Number of entities loaded.
         """
-        import os
-
         # Load people + aliases
         people_path = os.path.join(data_dir, "people.json")
         if os.path.exists(people_path):
             with open(people_path, "r", encoding="utf-8") as f:
                 people = json.load(f)
             for p in people:
-                display = p.get("display_name", "")
-                pid = p.get("person_id") or p.get("id") or "unknown"
-                if display:
-                    self.index.persons[display.lower()] = {
-                        "id": pid, "display_name": display
-                    }
-                    # Also index "First Last" if "Last, First"
-                    if "," in display:
-                        parts = [p.strip() for p in display.split(",")]
-                        if len(parts) == 2:
-                            flipped = f"{parts[1]} {parts[0]}"
-                            self.index.persons[flipped.lower()] = {
-                                "id": pid, "display_name": display
-                            }
-                # Index aliases from nested aliases array
-                for alias in p.get("aliases", []):
-                    alias_name = alias.get("alias_name") or alias.get("alias_value", "")
-                    if alias_name:
-                        self.index.aliases[alias_name.lower()] = {
-                            "person_id": pid, "display_name": display
-                        }
+                self.index.add_person_record(p)
 
         # Load places
         places_path = os.path.join(data_dir, "places.json")
@@ -291,10 +344,7 @@ class EntityMatcher:
             with open(places_path, "r", encoding="utf-8") as f:
                 places = json.load(f)
             for p in places:
-                name = p.get("name", "")
-                pid = p.get("place_id") or p.get("id") or "unknown"
-                if name:
-                    self.index.places[name.lower()] = {"id": pid, "name": name}
+                self.index.add_place_record(p)
 
         # Load organizations
         orgs_path = os.path.join(data_dir, "organizations.json")
@@ -302,10 +352,7 @@ class EntityMatcher:
             with open(orgs_path, "r", encoding="utf-8") as f:
                 orgs = json.load(f)
             for o in orgs:
-                name = o.get("name", "")
-                oid = o.get("org_id") or o.get("id") or "unknown"
-                if name:
-                    self.index.orgs[name.lower()] = {"id": oid, "name": name}
+                self.index.add_org_record(o)
 
         self.index.loaded_at = datetime.now().isoformat()
         return self.index.total_count()
@@ -322,99 +369,47 @@ class EntityMatcher:
             text: OCR or document text to scan
             
         Returns:
-            List of EntityMatch objects sorted by position
+            List of EntityMatch objects sorted by position; every
+            occurrence of a name is reported, overlaps are resolved by
+            _deduplicate_matches (longest match wins)
         """
         matches = []
-        text_lower = text.lower()
-        
-        # Check exact person matches
-        for name_lower, info in self.index.persons.items():
-            pos = text_lower.find(name_lower)
-            if pos >= 0:
-                matches.append(EntityMatch(
-                    text=text[pos:pos + len(name_lower)],
-                    entity_type="person",
-                    entity_id=info["id"],
-                    display_name=info["display_name"],
-                    confidence=1.0,
-                    method="exact_match",
-                    start_pos=pos,
-                    end_pos=pos + len(name_lower),
-                    status="matched"
-                ))
-        
-        # Check alias matches
-        for alias_lower, info in self.index.aliases.items():
-            pos = text_lower.find(alias_lower)
-            if pos >= 0:
-                # Check if not already matched as exact person
-                if not any(m.start_pos <= pos < m.end_pos and m.entity_type == "person" for m in matches):
-                    matches.append(EntityMatch(
-                        text=text[pos:pos + len(alias_lower)],
-                        entity_type="person",
-                        entity_id=info["person_id"],
-                        display_name=info["display_name"],
-                        confidence=0.95,  # Slightly lower for alias
-                        method="alias_match",
-                        start_pos=pos,
-                        end_pos=pos + len(alias_lower),
-                        status="matched"
-                    ))
-        
-        # Check place matches
-        for name_lower, info in self.index.places.items():
-            pos = text_lower.find(name_lower)
-            if pos >= 0:
-                matches.append(EntityMatch(
-                    text=text[pos:pos + len(name_lower)],
-                    entity_type="place",
-                    entity_id=info["id"],
-                    display_name=info["name"],
-                    confidence=1.0,
-                    method="exact_match",
-                    start_pos=pos,
-                    end_pos=pos + len(name_lower),
-                    status="matched"
-                ))
-        
-        # Check org matches
-        for name_lower, info in self.index.orgs.items():
-            pos = text_lower.find(name_lower)
-            if pos >= 0:
-                matches.append(EntityMatch(
-                    text=text[pos:pos + len(name_lower)],
-                    entity_type="org",
-                    entity_id=info["id"],
-                    display_name=info["name"],
-                    confidence=1.0,
-                    method="exact_match",
-                    start_pos=pos,
-                    end_pos=pos + len(name_lower),
-                    status="matched"
-                ))
+        ranks = []
+        for start, end, (rank, entity_type, confidence, method, info) in self._get_automaton().find_all(text):
+            matches.append(EntityMatch(
+                text=text[start:end],
+                entity_type=entity_type,
+                entity_id=info["id"] if "id" in info else info["person_id"],
+                display_name=info["display_name"] if "display_name" in info else info["name"],
+                confidence=confidence,
+                method=method,
+                start_pos=start,
+                end_pos=end,
+                status="matched"
+            ))
+            ranks.append(rank)
         
         # Sort by position and remove duplicates
-        matches.sort(key=lambda m: (m.start_pos, -m.confidence))
-        return self._deduplicate_matches(matches)
+        order = sorted(range(len(matches)), key=lambda i: (matches[i].start_pos, -matches[i].confidence, ranks[i]))
+        return self._deduplicate_matches([matches[i] for i in order])
+    
+    def _get_automaton(self) -> NameAutomaton:
+        """Return the automaton for the current index, rebuilding it after any change."""
+        key = (id(self.index), self.index.loaded_at, self.index.total_count())
+        if self._automaton is None or self._automaton_key != key:
+            self._automaton = self.index.build_automaton()
+            self._automaton_key = key
+        return self._automaton
     
     def _deduplicate_matches(self, matches: list[EntityMatch]) -> list[EntityMatch]:
-        """Remove overlapping matches, keeping highest confidence."""
-        if not matches:
-            return []
-        
-        result = []
-        for match in matches:
-            # Check if this match overlaps with any existing
-            overlaps = False
-            for existing in result:
-                if (match.start_pos < existing.end_pos and 
-                    match.end_pos > existing.start_pos):
-                    overlaps = True
-                    break
-            if not overlaps:
-                result.append(match)
-        
-        return result
+        """Remove overlapping matches, keeping the longest, then highest confidence."""
+        kept = select_spans(
+            matches,
+            span=lambda m: (m.start_pos, m.end_pos),
+            priority=lambda m: (m.start_pos - m.end_pos, -m.confidence),
+        )
+        kept.sort(key=lambda m: m.start_pos)
+        return kept
     
     def find_new_candidates(self, text: str) -> list[EntityMatch]:
         """
@@ -422,16 +417,13 @@ class EntityMatcher:
         
         Uses regex to find name-like patterns that aren't already matched.
         """
-        known_matches = self.find_matches(text)
-        known_positions = set()
-        for m in known_matches:
-            known_positions.update(range(m.start_pos, m.end_pos))
+        known_spans = SpanSet((m.start_pos, m.end_pos) for m in self.find_matches(text))
         
         candidates = []
         for match in self._name_pattern.finditer(text):
             start, end = match.span()
             # Skip if overlaps with known entity
-            if any(p in known_positions for p in range(start, end)):
+            if known_spans.overlaps(start, end):
                 continue
             
             name = match.group(0)
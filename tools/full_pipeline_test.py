@@ -5,15 +5,13 @@ Full Pipeline Test - Warren Commission Volume 1
 Tests the complete OCR → Classification → Extraction pipeline on sample pages.
 Outputs results to tools/output/wc_vol1_test/
 """
-import fitz
 import json
 import os
 import sys
 from datetime import datetime
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'ocr-gui'))
-from document_classifier import classify_document, get_all_scores, DocType
-from zone_extractor import extract_document
+from parallel_classifier import ClassifiedPage, ParallelClassifier, page_count
 
 # Configuration
 PDF_PATH = "raw-material/hsca/HSCA-Final-Report.pdf"
@@ -25,20 +23,15 @@ def ensure_output_dir():
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     os.makedirs(f"{OUTPUT_DIR}/pages", exist_ok=True)
 
-def process_page(pdf, page_num: int) -> dict:
-    """Process a single page through the full pipeline."""
-    page = pdf[page_num - 1]  # 0-indexed
-    text = page.get_text()
-    
-    # Classification
-    classification = classify_document(text)
-    
-    # Extraction
-    extraction = extract_document(text)
+def process_page(page: ClassifiedPage) -> dict:
+    """Summarize a page classified and extracted by the worker pool."""
+    text = page.text
+    classification = page.classification
+    extraction = page.extraction
     
     return {
-        "page": page_num,
-        "char_count": len(text),
+        "page": page.page,
+        "char_count": page.char_count,
         "text_preview": text[:500].replace('\n', ' '),
         "classification": {
             "type": classification.doc_type.value,
@@ -73,8 +66,7 @@ def main():
     
     # Open PDF
     print("Opening PDF...")
-    pdf = fitz.open(PDF_PATH)
-    total_pages = len(pdf)
+    total_pages = page_count(PDF_PATH)
     print(f"Total pages: {total_pages}")
     print()
     
@@ -86,9 +78,16 @@ def main():
     results = []
     type_counts = {}
     
-    for page_num in pages_to_test:
+    # Sampled pages are unrelated, so no multi-page continuity
+    with ParallelClassifier() as classifier:
+        pages = classifier.classify_pdf(
+            PDF_PATH, pages=[p - 1 for p in pages_to_test], continuity=False, extract=True
+        )
+    
+    for page in pages:
+        page_num = page.page
         print(f"Processing page {page_num}...", end=" ")
-        result = process_page(pdf, page_num)
+        result = process_page(page)
         
         # Save individual page text
         page_file = f"{OUTPUT_DIR}/pages/page_{page_num:04d}.txt"
@@ -107,8 +106,6 @@ def main():
         fields = result['extraction']['fields_found']
         print(f"{doc_type} ({conf:.0%}) - {fields} fields")
     
-    pdf.close()
-    
     # Summary
     print()
     print("=" * 70)
@@ -0,0 +1,345 @@
+"""
+history_catalog.py — Incrementally maintained catalog of processed/ files
+
+Keeps the list /api/history returns in an in-memory SQLite table instead
+of rescanning processed/ and processed/uploads/ on every request.
+
+The catalog only rescans when something changed:
+
+- refresh() compares the mtimes of the two directories (two stat calls)
+  and does nothing if neither changed. Creating, deleting or renaming a
+  file updates its directory's mtime.
+- When a directory did change, one scandir pass lists it and only files
+  not seen before are stat'd. Sidecar checks (transcript, .ocr.json) are
+  set lookups against the listing.
+- touch() marks files written in place (same name, directory mtime
+  unchanged) for a restat on the next refresh.
+- A watcher thread refreshes in the background and restats everything
+  every FULL_RESCAN_SECONDS to catch anything else written in place.
+
+The derived rows are diffed against the table, so a refresh writes only
+the rows that changed. Queries are indexed SELECTs with filters, sorting
+and pagination.
+
+Usage:
+    catalog = HistoryCatalog("processed", audio_exts={"mp3"}, video_exts={"mp4"})
+    catalog.start()                          # Background watcher
+    catalog.refresh()                        # Cheap when nothing changed
+    page = catalog.query(kind=["audio"], sort="modified", descending=True, limit=50)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+# Seconds between the watcher's directory checks
+WATCH_INTERVAL = 2.0
+
+# Seconds between full restats of every file
+FULL_RESCAN_SECONDS = 300
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".tiff", ".webp", ".heic", ".heif"}
+
+# Sort keys accepted by query(), ties broken by name then origin
+SORT_COLUMNS = {
+    "name": "name COLLATE NOCASE",
+    "modified": "modified",
+    "size": "size",
+    "kind": "kind",
+    "type": "type",
+    "status": "status",
+}
+
+COLUMNS = ("name", "status", "size", "type", "kind", "origin", "modified")
+
+
+class HistoryCatalog:
+    """Thread-safe catalog of the documents in processed/ and processed/uploads/."""
+
+    def __init__(self, folder: str, audio_exts=(), video_exts=()):
+        """
+        Args:
+            folder: The processed/ folder
+            audio_exts: Audio extensions without the dot (as AUDIO_EXTS)
+            video_exts: Video extensions without the dot (as VIDEO_EXTS)
+        """
+        self.folder = folder
+        self.uploads_dir = os.path.join(folder, "uploads")
+        self.audio_exts = {f".{e}" for e in audio_exts}
+        self.video_exts = {f".{e}" for e in video_exts}
+        self.media_exts = self.audio_exts | self.video_exts
+
+        # (origin, name) -> (size, mtime) for every file seen, sidecars included
+        self._entries: dict[tuple[str, str], tuple[int, float]] = {}
+        # (origin, name) -> row tuple (COLUMNS order) currently in the table
+        self._rows: dict[tuple[str, str], tuple] = {}
+        self._stamps = None
+        self._pending: set[str] = set()
+        self._restat_all = True
+        self._last_full = 0.0
+
+        self._scan_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE files (
+                name     TEXT NOT NULL,
+                status   TEXT NOT NULL,
+                size     INTEGER NOT NULL,
+                type     TEXT NOT NULL,
+                kind     TEXT NOT NULL,
+                origin   TEXT NOT NULL,
+                modified REAL NOT NULL,
+                PRIMARY KEY (origin, name)
+            );
+            CREATE INDEX files_name ON files (name COLLATE NOCASE);
+            CREATE INDEX files_modified ON files (modified);
+            CREATE INDEX files_kind ON files (kind);
+        """)
+
+        self._watcher = None
+        self._stop = threading.Event()
+
+    # =========================================================================
+    # Classification (same rules /api/history always used)
+    # =========================================================================
+
+    def infer_kind(self, ext: str) -> str:
+        if ext == ".pdf":
+            return "document"
+        if ext in self.audio_exts:
+            return "audio"
+        if ext in self.video_exts:
+            return "video"
+        if ext in IMAGE_EXTS:
+            return "image"
+        if ext == ".txt":
+            return "text"
+        return "other"
+
+    def _derive(self, processed: list[str], uploads: list[str]) -> dict[tuple[str, str], tuple]:
+        """Rows for the current listing; sidecar checks are set lookups."""
+        names = set(processed)
+        rows = {}
+
+        def add(origin, name, status, file_type, ext):
+            size, modified = self._entries[(origin, name)]
+            rows[(origin, name)] = (name, status, size, file_type, self.infer_kind(ext), origin, modified)
+
+        for name in processed:
+            base_name, ext = os.path.splitext(name)
+            ext = ext.lower()
+            if ext == ".pdf":
+                add("processed", name, "completed", "OCR_RESULT" if "_searchable" in name else "UPLOAD", ext)
+            elif ext in self.media_exts:
+                has_transcript = f"{base_name}.transcript.json" in names
+                add("processed", name, "completed" if has_transcript else "pending",
+                    "TRANSCRIPT" if has_transcript else "MEDIA_UPLOAD", ext)
+            elif ext == ".txt":
+                if f"{base_name}.ocr.json" in names:
+                    add("processed", name, "completed", "TEXT_INGEST", ext)
+
+        # Originals in uploads/ unless processed/ already lists the same name
+        listed = {name for _, name in rows}
+        for name in uploads:
+            if name in listed:
+                continue
+            base_name, ext = os.path.splitext(name)
+            ext = ext.lower()
+            if ext == ".pdf":
+                add("uploads", name, "completed", "ORIGINAL_PDF", ext)
+            elif ext in self.media_exts:
+                has_transcript = f"{base_name}.transcript.json" in names
+                add("uploads", name, "completed" if has_transcript else "pending",
+                    "TRANSCRIPT" if has_transcript else "MEDIA_UPLOAD", ext)
+        return rows
+
+    # =========================================================================
+    # Maintenance
+    # =========================================================================
+
+    def _dir_stamps(self) -> tuple:
+        stamps = []
+        for path in (self.folder, self.uploads_dir):
+            try:
+                stamps.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                stamps.append(None)
+        return tuple(stamps)
+
+    def _list(self, origin: str, path: str, restat: bool) -> list[str]:
+        """File names in path; stats new files (and all of them if restat)."""
+        pending = self._pending
+        names = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if not entry.is_file():
+                            continue
+                        key = (origin, entry.name)
+                        if restat or key not in self._entries or _touched(entry.name, pending):
+                            st = entry.stat()
+                            self._entries[key] = (st.st_size, st.st_mtime)
+                    except OSError:
+                        continue  # Removed while scanning
+                    names.append(entry.name)
+        except FileNotFoundError:
+            pass
+        return names
+
+    def refresh(self, restat: bool = False) -> bool:
+        """
+        Bring the catalog up to date.
+
+        Args:
+            restat: Stat every file, not just new and touched ones
+
+        Returns:
+            True if the directories were rescanned
+        """
+        with self._scan_lock:
+            stamps = self._dir_stamps()
+            restat = restat or self._restat_all
+            if not restat and not self._pending and stamps == self._stamps:
+                return False
+            self._restat_all = False
+
+            processed = self._list("processed", self.folder, restat)
+            uploads = self._list("uploads", self.uploads_dir, restat)
+            live = {("processed", name) for name in processed} | {("uploads", name) for name in uploads}
+            for key in self._entries.keys() - live:
+                del self._entries[key]
+
+            rows = self._derive(processed, uploads)
+            changed = [row for key, row in rows.items() if self._rows.get(key) != row]
+            removed = [key for key in self._rows if key not in rows]
+            if changed or removed:
+                with self._lock, self._conn:
+                    self._conn.executemany("DELETE FROM files WHERE origin = ? AND name = ?", removed)
+                    self._conn.executemany(
+                        f"INSERT OR REPLACE INTO files ({', '.join(COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        changed,
+                    )
+            self._rows = rows
+            self._stamps = stamps
+            self._pending = set()
+            if restat:
+                self._last_full = time.monotonic()
+            return True
+
+    def touch(self, base_name: str):
+        """Restat base_name and its derivatives on the next refresh."""
+        with self._scan_lock:
+            self._pending.add(base_name)
+
+    def invalidate(self):
+        """Restat every file on the next refresh."""
+        self._restat_all = True
+
+    def start(self, interval: float = WATCH_INTERVAL):
+        """Refresh in a background thread until stop()."""
+        if self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name="history-catalog", daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self, interval: float):
+        while not self._stop.is_set():
+            try:
+                full = time.monotonic() - self._last_full >= FULL_RESCAN_SECONDS
+                self.refresh(restat=full)
+            except Exception as e:
+                print(f"Warning: history catalog refresh failed: {e}")
+            self._stop.wait(interval)
+
+    # =========================================================================
+    # Querying
+    # =========================================================================
+
+    def query(
+        self,
+        kind: Optional[list[str]] = None,
+        file_type: Optional[list[str]] = None,
+        status: Optional[str] = None,
+        origin: Optional[str] = None,
+        search: Optional[str] = None,
+        sort: str = "name",
+        descending: bool = False,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> dict:
+        """
+        Filtered, sorted page of catalog rows.
+
+        Args:
+            kind: Only these kinds (document, audio, video, image, text, other)
+            file_type: Only these types (OCR_RESULT, UPLOAD, TRANSCRIPT, ...)
+            status: "completed" or "pending"
+            origin: "processed" or "uploads"
+            search: Case-insensitive substring of the file name
+            sort: One of SORT_COLUMNS
+            descending: Reverse the sort
+            limit: Page size (None = all rows)
+            offset: Rows to skip
+
+        Returns:
+            {"total": n, "files": [...]} where total counts every match
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort key: {sort}")
+
+        where, params = [], []
+        if kind:
+            where.append(f"kind IN ({', '.join('?' * len(kind))})")
+            params.extend(kind)
+        if file_type:
+            where.append(f"type IN ({', '.join('?' * len(file_type))})")
+            params.extend(t.upper() for t in file_type)
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        if origin:
+            where.append("origin = ?")
+            params.append(origin)
+        if search:
+            where.append("instr(lower(name), ?) > 0")
+            params.append(search.lower())
+        condition = f"WHERE {' AND '.join(where)}" if where else ""
+        direction = "DESC" if descending else "ASC"
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM files {condition}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"""
+                SELECT {', '.join(COLUMNS)} FROM files {condition}
+                ORDER BY {SORT_COLUMNS[sort]} {direction}, name COLLATE NOCASE, origin
+                LIMIT ? OFFSET ?
+                """,
+                params + [-1 if limit is None else limit, offset],
+            ).fetchall()
+        return {"total": total, "files": [dict(zip(COLUMNS, row)) for row in rows]}
+
+    def stats(self) -> dict:
+        with self._lock:
+            by_kind = dict(self._conn.execute("SELECT kind, COUNT(*) FROM files GROUP BY kind").fetchall())
+        return {"files": sum(by_kind.values()), "by_kind": by_kind, "tracked": len(self._entries)}
+
+
+def _touched(name: str, pending: set[str]) -> bool:
+    """True if name is one of the pending base names or derived from one."""
+    if not pending:
+        return False
+    for base_name in pending:
+        if name == base_name or (name.startswith(base_name) and name[len(base_name)] in "._"):
+            return True
+    return False
@@ -0,0 +1,327 @@
+"""
+classification_cache.py — Persistent per-page classification cache
+
+Stores classifier output per page in SQLite so repeat reviews of the same
+document skip classification (and, for PDFs, text extraction) entirely.
+
+Page rows are keyed by:
+- SHA-1 of the page text
+- prev_type (continuity changes the result for identical text)
+- fingerprint engine version (derived from FINGERPRINTS / MAX_SCORES)
+
+After train_classifier.py --apply edits the fingerprints, the engine version
+changes and every page is recomputed on its next review. The version is
+read from the current engine on every lookup; rows from older versions are
+dropped when the cache is opened and again as soon as a lookup sees that
+reload_fingerprints() swapped the engine.
+
+Document rows map a file (path + size + mtime) to its ordered page hashes,
+which lets review_endpoint rebuild the full result list without reopening
+the PDF.
+
+Both tables are LRU-bounded by last_used timestamps. Hits only record
+their timestamp in memory; the pending timestamps are written in one
+transaction every TOUCH_FLUSH_ROWS hits or TOUCH_FLUSH_SECONDS, with the
+next insert, or before pruning, so a cache hit never commits on its own.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from document_classifier import classify_with_scores, get_fingerprint_engine
+
+# Characters of page text returned to the workbench for sample/display
+TEXT_SAMPLE_CHARS = 2000
+
+# Default LRU limits
+MAX_PAGES = 200_000
+MAX_DOCUMENTS = 5_000
+
+# Prune only after this many inserts past the limit (avoids a DELETE per page)
+PRUNE_SLACK = 1_000
+
+# Pending last_used updates are written after this many hits or seconds
+TOUCH_FLUSH_ROWS = 500
+TOUCH_FLUSH_SECONDS = 30.0
+
+
+def hash_text(text: str) -> str:
+    """Stable content hash for a page's text."""
+    return hashlib.sha1(text.encode("utf-8", errors="replace")).hexdigest()
+
+
+def build_page_result(classification, all_scores: dict, text: str) -> dict:
+    """Serialize one classified page the way the cache stores it."""
+    page_result = classification.to_dict()
+    page_result["all_scores"] = {k: round(v, 4) for k, v in all_scores.items()}
+    page_result["text"] = text[:TEXT_SAMPLE_CHARS]
+    return page_result
+
+
+class ClassificationCache:
+    """Thread-safe SQLite store of per-page classification results."""
+
+    def __init__(self, db_path: str, max_pages: int = MAX_PAGES, max_documents: int = MAX_DOCUMENTS):
+        self.db_path = db_path
+        self.max_pages = max_pages
+        self.max_documents = max_documents
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                text_hash  TEXT NOT NULL,
+                prev_type  TEXT NOT NULL,
+                version    TEXT NOT NULL,
+                result     TEXT NOT NULL,
+                last_used  REAL NOT NULL,
+                PRIMARY KEY (text_hash, prev_type, version)
+            );
+            CREATE INDEX IF NOT EXISTS pages_last_used ON pages(last_used);
+
+            CREATE TABLE IF NOT EXISTS documents (
+                path         TEXT PRIMARY KEY,
+                size         INTEGER NOT NULL,
+                mtime_ns     INTEGER NOT NULL,
+                page_hashes  TEXT NOT NULL,
+                last_used    REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS documents_last_used ON documents(last_used);
+            """
+        )
+        self._page_inserts = 0
+        self._document_inserts = 0
+        # (text_hash, prev_type, version) / path -> last_used, not yet written
+        self._page_touches: dict[tuple[str, str, str], float] = {}
+        self._document_touches: dict[str, float] = {}
+        self._last_flush = time.monotonic()
+        self._version = None
+        with self._lock:
+            self._sync_version()
+
+    @property
+    def version(self) -> str:
+        """Version of the fingerprint engine currently in use."""
+        return get_fingerprint_engine().version
+
+    def _sync_version(self) -> str:
+        """
+        Return the current engine version, dropping rows from older versions
+        if the engine changed since the last lookup. Caller holds the lock.
+        """
+        version = self.version
+        if version != self._version:
+            # Results from older fingerprint sets can never hit again
+            self._page_touches.clear()
+            self._conn.execute("DELETE FROM pages WHERE version != ?", (version,))
+            self._conn.commit()
+            self._version = version
+        return version
+
+    def _touch_pages(self, keys: list[tuple[str, str, str]]):
+        """Record page hits for the next flush. Caller holds the lock."""
+        now = time.time()
+        for key in keys:
+            self._page_touches[key] = now
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        """Flush pending hits if enough piled up. Caller holds the lock."""
+        pending = len(self._page_touches) + len(self._document_touches)
+        if pending >= TOUCH_FLUSH_ROWS or time.monotonic() - self._last_flush >= TOUCH_FLUSH_SECONDS:
+            self._flush_touches()
+            self._conn.commit()
+
+    def _flush_touches(self):
+        """Write pending last_used updates without committing. Caller holds the lock."""
+        if self._page_touches:
+            self._conn.executemany(
+                "UPDATE pages SET last_used = ? WHERE text_hash = ? AND prev_type = ? AND version = ?",
+                [(used, *key) for key, used in self._page_touches.items()],
+            )
+            self._page_touches.clear()
+        if self._document_touches:
+            self._conn.executemany(
+                "UPDATE documents SET last_used = ? WHERE path = ?",
+                [(used, path) for path, used in self._document_touches.items()],
+            )
+            self._document_touches.clear()
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        """Write pending last_used updates now."""
+        with self._lock:
+            self._flush_touches()
+            self._conn.commit()
+
+    # =========================================================================
+    # Page level
+    # =========================================================================
+
+    def get_page(self, text_hash: str, prev_type: str) -> Optional[dict]:
+        """Return a cached page result, or None."""
+        with self._lock:
+            version = self._sync_version()
+            row = self._conn.execute(
+                "SELECT result FROM pages WHERE text_hash = ? AND prev_type = ? AND version = ?",
+                (text_hash, prev_type, version),
+            ).fetchone()
+            if row is None:
+                return None
+            self._touch_pages([(text_hash, prev_type, version)])
+        return json.loads(row[0])
+
+    def put_page(self, text_hash: str, prev_type: str, page_result: dict):
+        """Store a page result."""
+        with self._lock:
+            version = self._sync_version()
+            self._flush_touches()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (text_hash, prev_type, version, result, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (text_hash, prev_type, version, json.dumps(page_result), time.time()),
+            )
+            self._page_inserts += 1
+            if self._page_inserts >= PRUNE_SLACK:
+                self._prune("pages", self.max_pages)
+                self._page_inserts = 0
+            self._conn.commit()
+
+    def classify(self, text: str, prev_type: str = "UNKNOWN") -> tuple[dict, str]:
+        """
+        Classify a page through the cache.
+
+        Args:
+            text: Page text
+            prev_type: Doc type of the previous page (for continuity)
+
+        Returns:
+            Tuple of (page_result, text_hash). page_result holds the
+            ClassificationResult dict plus "all_scores" and "text" (sample).
+        """
+        text_hash = hash_text(text)
+        page_result = self.get_page(text_hash, prev_type)
+        if page_result is not None:
+            self.hits += 1
+            return page_result, text_hash
+
+        self.misses += 1
+        classification, all_scores = classify_with_scores(text, prev_type=prev_type)
+        page_result = build_page_result(classification, all_scores, text)
+        self.put_page(text_hash, prev_type, page_result)
+        return page_result, text_hash
+
+    # =========================================================================
+    # Document level
+    # =========================================================================
+
+    def get_document(self, path: str) -> Optional[list[dict]]:
+        """
+        Rebuild every page result for an unchanged file from the cache.
+
+        Returns None if the file changed, was never cached, or any page
+        result is missing for the current fingerprint version.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, page_hashes FROM documents WHERE path = ?",
+                (os.path.abspath(path),),
+            ).fetchone()
+        if row is None or row[0] != stat.st_size or row[1] != stat.st_mtime_ns:
+            return None
+
+        results = []
+        keys = []
+        prev_type = "UNKNOWN"
+        with self._lock:
+            version = self._sync_version()
+            for text_hash in json.loads(row[2]):
+                page_row = self._conn.execute(
+                    "SELECT result FROM pages WHERE text_hash = ? AND prev_type = ? AND version = ?",
+                    (text_hash, prev_type, version),
+                ).fetchone()
+                if page_row is None:
+                    return None
+                page_result = json.loads(page_row[0])
+                results.append(page_result)
+                keys.append((text_hash, prev_type, version))
+                prev_type = page_result["doc_type"]
+
+            self._document_touches[os.path.abspath(path)] = time.time()
+            self._touch_pages(keys)
+
+        self.hits += len(results)
+        return results
+
+    def put_document(self, path: str, page_hashes: list[str]):
+        """Record the ordered page hashes for a file."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+
+        with self._lock:
+            self._flush_touches()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (path, size, mtime_ns, page_hashes, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (os.path.abspath(path), stat.st_size, stat.st_mtime_ns, json.dumps(page_hashes), time.time()),
+            )
+            self._document_inserts += 1
+            if self._document_inserts >= PRUNE_SLACK // 10:
+                self._prune("documents", self.max_documents)
+                self._document_inserts = 0
+            self._conn.commit()
+
+    # =========================================================================
+    # Maintenance
+    # =========================================================================
+
+    def _prune(self, table: str, limit: int):
+        """Evict least recently used rows beyond limit. Caller holds the lock."""
+        count = self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        if count > limit:
+            self._conn.execute(
+                f"DELETE FROM {table} WHERE rowid IN "
+                f"(SELECT rowid FROM {table} ORDER BY last_used ASC LIMIT ?)",
+                (count - limit,),
+            )
+
+    def clear(self):
+        """Drop all cached results."""
+        with self._lock:
+            self._page_touches.clear()
+            self._document_touches.clear()
+            self._conn.execute("DELETE FROM pages")
+            self._conn.execute("DELETE FROM documents")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Return size and hit/miss counters."""
+        with self._lock:
+            self._sync_version()
+            pages = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            documents = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        return {
+            "version": self.version,
+            "pages": pages,
+            "documents": documents,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
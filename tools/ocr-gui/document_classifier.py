@@ -11,10 +11,17 @@ See: docs/ui/ocr/plans/document-layout-analyzer.md
 """
 
 import re
+import hashlib
+import json
 from dataclasses import dataclass
 from typing import Optional
 from enum import Enum
 
+try:
+    from re import _constants as sre_constants, _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_constants, sre_parse
+
 # Fuzzy matching support
 try:
     from rapidfuzz import fuzz
@@ -690,6 +697,232 @@ CANONICAL_FINGERPRINTS = {
 }
 
 
+# =============================================================================
+# COMPILED FINGERPRINT ENGINE
+# =============================================================================
+# FINGERPRINTS is plain data so train_classifier.py --apply can edit it. The
+# engine compiles it once per import (or reload) into per-zone scan tables.
+
+# Search zones
+ZONE_HEADER = "header"      # First N lines (most types)
+ZONE_FULL = "full"          # Full preprocessed text (interviews/statements)
+ZONE_COMBINED = "combined"  # Header + footer + body sample (get_all_scores)
+
+# Types whose fingerprints are searched over the full page text
+FULL_TEXT_TYPES = {DocType.FBI_302, DocType.WITNESS_STATEMENT}
+
+# Shortest literal worth checking with `in` before running a pattern
+MIN_REQUIRED_LITERAL = 3
+
+# The only non-ASCII characters IGNORECASE matches against ASCII letters;
+# mapped before lowercasing so the literal prefilter never misses a match
+_ASCII_FOLD = str.maketrans({0x130: "i", 0x131: "i", 0x17F: "s", 0x212A: "k"})
+
+# Bump when classification logic changes in a way the fingerprint data
+# does not capture (invalidates cached page results)
+CLASSIFIER_REVISION = 2
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    """A single weighted fingerprint pattern."""
+    fid: int  # Position in FingerprintEngine.fingerprints
+    doc_type: DocType
+    pattern: str
+    weight: int
+
+
+class FingerprintEngine:
+    """
+    Precompiled fingerprint matcher.
+
+    Patterns are compiled with the flags each entry point has always used
+    (IGNORECASE for classify_document, IGNORECASE|MULTILINE for
+    get_all_scores) and grouped by search zone. Identical patterns shared by
+    several types are compiled and searched once per zone, and a zone scan
+    reports every matching fingerprint id.
+
+    Most patterns cannot match unless some literal (or one of a set of
+    alternative literals) occurs in the text, e.g. "government" and
+    "printing" for U.S. GOVERNMENT PRINTING OFFICE. scan() checks those with
+    `in` on the lowercased text first and only runs the regexes that can
+    still match, which skips most of them on a typical page.
+    """
+
+    def __init__(self, fingerprints: Optional[dict] = None, canonical: Optional[dict] = None):
+        fingerprints = FINGERPRINTS if fingerprints is None else fingerprints
+        canonical = CANONICAL_FINGERPRINTS if canonical is None else canonical
+
+        self.fingerprints: list[Fingerprint] = []
+        self.by_type: dict[DocType, list[Fingerprint]] = {}
+        for doc_type, patterns in fingerprints.items():
+            entries = []
+            for pattern, weight in patterns:
+                fp = Fingerprint(len(self.fingerprints), doc_type, pattern, weight)
+                self.fingerprints.append(fp)
+                entries.append(fp)
+            self.by_type[doc_type] = entries
+
+        self.max_scores = {
+            doc_type: sum(fp.weight for fp in entries)
+            for doc_type, entries in self.by_type.items()
+        }
+
+        self.zones = {
+            ZONE_HEADER: self._compile_zone(
+                [fp for fp in self.fingerprints if fp.doc_type not in FULL_TEXT_TYPES],
+                re.IGNORECASE,
+            ),
+            ZONE_FULL: self._compile_zone(
+                [fp for fp in self.fingerprints if fp.doc_type in FULL_TEXT_TYPES],
+                re.IGNORECASE,
+            ),
+            ZONE_COMBINED: self._compile_zone(
+                self.fingerprints,
+                re.IGNORECASE | re.MULTILINE,
+            ),
+        }
+
+        # Identifies this fingerprint set for persisted results
+        self.version = self._compute_version(fingerprints, canonical, self.max_scores)
+
+        # Canonical strings lowercased once for fuzzy_classify
+        self.canonical: list[tuple[DocType, list[tuple[str, str, int]], int]] = [
+            (
+                doc_type,
+                [(text.lower(), text, weight) for text, weight in entries],
+                sum(weight for _, weight in entries),
+            )
+            for doc_type, entries in canonical.items()
+        ]
+
+    @staticmethod
+    def _compute_version(fingerprints: dict, canonical: dict, max_scores: dict) -> str:
+        """Hash the registry so any --apply edit yields a new version."""
+        payload = json.dumps(
+            {
+                "revision": CLASSIFIER_REVISION,
+                "fuzzy": HAS_RAPIDFUZZ,
+                "fingerprints": [[t.value, [list(p) for p in pats]] for t, pats in fingerprints.items()],
+                "canonical": [[t.value, [list(c) for c in pats]] for t, pats in canonical.items()],
+                "max_scores": [[t.value, score] for t, score in max_scores.items()],
+            },
+            ensure_ascii=False,
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _compile_zone(fingerprints: list[Fingerprint], flags: int) -> list[tuple[re.Pattern, tuple[int, ...], list]]:
+        """Compile a zone's patterns, folding duplicate patterns into one entry."""
+        grouped: dict[str, list[int]] = {}
+        for fp in fingerprints:
+            grouped.setdefault(fp.pattern, []).append(fp.fid)
+        return [
+            (re.compile(pattern, flags), tuple(fids), required_literals(pattern))
+            for pattern, fids in grouped.items()
+        ]
+
+    def scan(self, zone: str, text: str) -> set[int]:
+        """Return the ids of every fingerprint in a zone that matches text."""
+        folded = text.translate(_ASCII_FOLD).lower()
+        hits: set[int] = set()
+        for regex, fids, required in self.zones[zone]:
+            if required and not all(any(literal in folded for literal in options) for options in required):
+                continue
+            if regex.search(text):
+                hits.update(fids)
+        return hits
+
+    def score(self, hits: set[int]) -> dict[DocType, tuple[float, list[str]]]:
+        """
+        Convert matched fingerprint ids into normalized per-type scores.
+
+        Returns:
+            Dictionary mapping DocType to (confidence, matched_patterns),
+            in FINGERPRINTS order.
+        """
+        results: dict[DocType, tuple[float, list[str]]] = {}
+        for doc_type, entries in self.by_type.items():
+            score = 0.0
+            matched = []
+            for fp in entries:
+                if fp.fid in hits:
+                    score += fp.weight
+                    matched.append(fp.pattern)
+            max_score = self.max_scores[doc_type]
+            results[doc_type] = (score / max_score if max_score > 0 else 0.0, matched)
+        return results
+
+
+def required_literals(pattern: str) -> list[tuple[str, ...]]:
+    """
+    Lowercase ASCII literals any match of pattern must contain.
+
+    Each entry is a tuple of alternatives, at least one of which occurs in
+    every match: ("government",) for a plain word, ("routine", "urgent")
+    for URGENT|ROUTINE. Only mandatory parts count (optional groups,
+    character classes and lookarounds are skipped), so an empty list just
+    means the pattern is always run.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return []
+    return _required_in(parsed)
+
+
+def _required_in(sequence) -> list[tuple[str, ...]]:
+    required = []
+    run = []
+
+    def end_run():
+        if len(run) >= MIN_REQUIRED_LITERAL:
+            required.append(("".join(run),))
+        run.clear()
+
+    for op, av in sequence:
+        if op is sre_constants.LITERAL and av < 128:
+            run.append(chr(av).lower())
+            continue
+        end_run()
+        if op is sre_constants.SUBPATTERN:
+            required.extend(_required_in(av[-1]))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[0] >= 1:
+            required.extend(_required_in(av[2]))
+        elif op is sre_constants.BRANCH:
+            # Every branch must contribute a literal, or nothing is required
+            options = set()
+            for branch in av[1]:
+                branch_required = _required_in(branch)
+                if not branch_required:
+                    break
+                options.update(max(branch_required, key=lambda alts: min(map(len, alts))))
+            else:
+                required.append(tuple(sorted(options)))
+    end_run()
+    return required
+
+
+_ENGINE = FingerprintEngine()
+
+
+def get_fingerprint_engine() -> FingerprintEngine:
+    """Return the compiled engine for the current fingerprint registry."""
+    return _ENGINE
+
+
+def reload_fingerprints() -> FingerprintEngine:
+    """
+    Recompile the engine after FINGERPRINTS or CANONICAL_FINGERPRINTS
+    have been modified in place.
+    """
+    global _ENGINE
+    _ENGINE = FingerprintEngine()
+    MAX_SCORES.clear()
+    MAX_SCORES.update(_ENGINE.max_scores)
+    return _ENGINE
+
+
 # =============================================================================
 # FUZZY CLASSIFICATION ENGINE
 # =============================================================================
@@ -714,14 +947,13 @@ def fuzzy_classify(text: str, threshold: int = 70) -> tuple[DocType, float, list
     text_lower = text.lower()
     scores: dict[DocType, tuple[float, list[str]]] = {}
     
-    for doc_type, fingerprints in CANONICAL_FINGERPRINTS.items():
+    for doc_type, fingerprints, max_possible in _ENGINE.canonical:
         type_score = 0.0
         matched = []
-        max_possible = sum(weight for _, weight in fingerprints)
         
-        for canonical, weight in fingerprints:
+        for canonical_lower, canonical, weight in fingerprints:
             # Use partial_ratio to find the best substring match
-            score = fuzz.partial_ratio(canonical.lower(), text_lower)
+            score = fuzz.partial_ratio(canonical_lower, text_lower)
             
             if score >= threshold:
                 # Weight the score by the fingerprint's importance
@@ -759,8 +991,14 @@ def extract_header_sample(text: str, num_lines: int = 25) -> str:
     Returns:
         First N lines as a single string
     """
-    lines = text.split('\n')
-    return '\n'.join(lines[:num_lines])
+    if num_lines <= 0:
+        return ""
+    end = -1
+    for _ in range(num_lines):
+        end = text.find('\n', end + 1)
+        if end < 0:
+            return text
+    return text[:end]
 
 
 def extract_footer_sample(text: str, num_lines: int = 15) -> str:
@@ -774,8 +1012,14 @@ def extract_footer_sample(text: str, num_lines: int = 15) -> str:
     Returns:
         Last N lines as a single string
     """
-    lines = text.split('\n')
-    return '\n'.join(lines[-num_lines:])
+    if num_lines <= 0:
+        return text
+    start = len(text)
+    for _ in range(num_lines):
+        start = text.rfind('\n', 0, start)
+        if start < 0:
+            return text
+    return text[start + 1:]
 
 
 def preprocess_text(text: str) -> str:
@@ -817,6 +1061,74 @@ def get_agency(doc_type: DocType) -> str:
 def classify_document(text: str, header_lines: int = 25, prev_type: Optional[str] = None) -> ClassificationResult:
     """
     Classify document type by matching fingerprints against header.
+
+    See _classify_page for the staged approach.
+
+    Args:
+        text: Full OCR text to classify
+        header_lines: Number of lines to analyze (default: 25)
+        prev_type: Type of the previous page (for continuity)
+
+    Returns:
+        ClassificationResult with doc_type, confidence, and matched patterns
+    """
+    result, _ = _classify_page(text, header_lines, prev_type)
+    return result
+
+
+def classify_with_scores(
+    text: str, header_lines: int = 25, prev_type: Optional[str] = None
+) -> tuple[ClassificationResult, dict[str, float]]:
+    """
+    Classify a page and return its per-type score vector in one evaluation.
+
+    The score vector is get_all_scores()'s: the combined header + footer +
+    body sample the review UI has always shown as alternatives. It is
+    scanned over the raw text with MULTILINE, while doc_type comes from the
+    preprocessed header and full-text zones, so the two vectors need their
+    own scans; both skip patterns whose required literals are absent.
+
+    Args:
+        text: Full OCR text to classify
+        header_lines: Number of lines to analyze (default: 25)
+        prev_type: Type of the previous page (for continuity)
+
+    Returns:
+        Tuple of (ClassificationResult, {doc_type_name: score}) with the
+        same scores as get_all_scores(text, header_lines)
+    """
+    page = score_page(text, header_lines, all_scores=True)
+    return resolve_page(page, prev_type), page.all_scores
+
+
+def _rank_scores(scores: dict[DocType, tuple[float, list[str]]]) -> dict[str, float]:
+    """Round engine scores and sort them highest first."""
+    results = {
+        doc_type.value: round(normalized, 3)
+        for doc_type, (normalized, _) in scores.items()
+    }
+    return dict(sorted(results.items(), key=lambda x: x[1], reverse=True))
+
+
+@dataclass
+class PageScores:
+    """
+    Continuity-independent classification of one page (stages 0-2).
+
+    Picklable, so pages can be scored in worker processes and resolved in
+    page order afterwards with resolve_page().
+    """
+    result: ClassificationResult  # Best type before continuity
+    scores: dict[DocType, tuple[float, list[str]]]  # Regex-stage scores
+    blank: bool = False  # Stage 0 short-circuit; continuity never applies
+    all_scores: Optional[dict[str, float]] = None  # get_all_scores() vector, if requested
+
+
+def _classify_page(
+    text: str, header_lines: int = 25, prev_type: Optional[str] = None
+) -> tuple[ClassificationResult, dict[DocType, tuple[float, list[str]]]]:
+    """
+    Classify document type by matching fingerprints against header.
     
     Uses a multi-stage approach:
     0. Structural page detection (BLANK, based on character count)
@@ -824,17 +1136,55 @@ def classify_document(text: str, header_lines: int = 25, prev_type: Optional[str
     2. Levenshtein fuzzy matching (fallback for garbled OCR)
     3. Stateful continuity (handles multi-page reports)
 
+    Stages 0-2 live in score_page() and stage 3 in resolve_page().
+
     Args:
         text: Full OCR text to classify
         header_lines: Number of lines to analyze (default: 25)
         prev_type: Type of the previous page (for continuity)
 
     Returns:
-        ClassificationResult with doc_type, confidence, and matched patterns
+        Tuple of (ClassificationResult, regex-stage scores per DocType)
+    """
+    page = score_page(text, header_lines)
+    return resolve_page(page, prev_type), page.scores
+
+
+def score_page(text: str, header_lines: int = 25, all_scores: bool = False) -> PageScores:
+    """
+    Run classification stages 0-2 (blank detection, regex, fuzzy) on a page.
+
+    The result does not depend on neighbouring pages, so a document's pages
+    can be scored in any order or in parallel.
+
+    Args:
+        text: Full OCR text of the page
+        header_lines: Number of lines to analyze (default: 25)
+        all_scores: Also fill PageScores.all_scores (as get_all_scores)
+
+    Returns:
+        PageScores to pass to resolve_page()
+    """
+    page = score_blank(text)
+    if page is None:
+        # Preprocess to handle OCR artifacts
+        preprocessed = preprocess_text(text)
+        page = score_preprocessed(preprocessed, extract_header_sample(preprocessed, header_lines))
+    if all_scores:
+        page.all_scores = get_all_scores(text, header_lines)
+    return page
+
+
+def score_blank(text: str) -> Optional[PageScores]:
+    """
+    Stage 0: BLANK page detection (before preprocessing).
+
+    Args:
+        text: Full OCR text of the page
+
+    Returns:
+        PageScores for a blank page, or None if the page has content
     """
-    # =================================================================
-    # Stage 0: BLANK page detection (before preprocessing)
-    # =================================================================
     # Strip and count meaningful characters
     stripped = text.strip()
     char_count = len(stripped)
@@ -851,44 +1201,44 @@ def classify_document(text: str, header_lines: int = 25, prev_type: Optional[str
             re.match(r'^\d{1,4}$', stripped)  # Just a page number
         )
         if is_blank_page:
-            return ClassificationResult(
-                doc_type=DocType.BLANK,
-                confidence=0.95,
-                matched_patterns=[f"char_count={char_count}"],
-                header_sample=stripped[:100],
+            # Under 100 chars, so scoring the whole page is cheap
+            hits = _ENGINE.scan(ZONE_HEADER, stripped) | _ENGINE.scan(ZONE_FULL, stripped)
+            return PageScores(
+                result=ClassificationResult(
+                    doc_type=DocType.BLANK,
+                    confidence=0.95,
+                    matched_patterns=[f"char_count={char_count}"],
+                    header_sample=stripped[:100],
+                ),
+                scores=_ENGINE.score(hits),
+                blank=True,
             )
-    
-    # Preprocess to handle OCR artifacts
-    text = preprocess_text(text)
-    
-    header_sample = extract_header_sample(text, header_lines)
-    footer_sample = extract_footer_sample(text, 15)
-    
+    return None
+
+
+def score_preprocessed(text: str, header_sample: str) -> PageScores:
+    """
+    Run stages 1-2 (regex, fuzzy) on a non-blank page.
+
+    Args:
+        text: Output of preprocess_text() for the page
+        header_sample: First header lines of text (extract_header_sample)
+
+    Returns:
+        PageScores to pass to resolve_page()
+    """
     # =================================================================
     # Stage 1: Regex Fingerprints
     # =================================================================
-    results: dict[DocType, tuple[float, list[str]]] = {}
-    
-    for doc_type, patterns in FINGERPRINTS.items():
-        score = 0.0
-        matched = []
-        
-        # Determine search range (some docs have fingerprints in body/footer)
-        search_text = header_sample
-        if doc_type in [DocType.FBI_302, DocType.WITNESS_STATEMENT]:
-            search_text = text # Check full text for interviews/statements
-            
-        for pattern, weight in patterns:
-            if re.search(pattern, search_text, re.IGNORECASE):
-                score += weight
-                matched.append(pattern)
-        
-        confidence = score / MAX_SCORES[doc_type] if MAX_SCORES[doc_type] > 0 else 0.0
-        results[doc_type] = (confidence, matched)
+    # Most types are searched in the header; interviews/statements
+    # (FULL_TEXT_TYPES) are checked against the full text
+    hits = _ENGINE.scan(ZONE_HEADER, header_sample) | _ENGINE.scan(ZONE_FULL, text)
+    results = _ENGINE.score(hits)
 
     # Find best regex match
     best_type = max(results.keys(), key=lambda t: results[t][0])
     best_score, best_matches = results[best_type]
+    best_matches = list(best_matches)
 
     # =================================================================
     # Stage 2: Fuzzy Logic (Fallback for low confidence)
@@ -900,10 +1250,40 @@ def classify_document(text: str, header_lines: int = 25, prev_type: Optional[str
             best_score = fuzzy_score
             best_matches = fuzzy_matches
 
+    return PageScores(
+        result=ClassificationResult(
+            doc_type=best_type,
+            confidence=best_score,
+            matched_patterns=best_matches,
+            header_sample=header_sample
+        ),
+        scores=results,
+    )
+
+
+def resolve_page(page: PageScores, prev_type: Optional[str] = None) -> ClassificationResult:
+    """
+    Apply stage 3 (stateful continuity) to a scored page.
+
+    Cheap enough to run sequentially over a whole document after its pages
+    were scored in parallel.
+
+    Args:
+        page: Output of score_page()
+        prev_type: Resolved type of the previous page
+
+    Returns:
+        Final ClassificationResult (page.result is not modified)
+    """
+    best_type = page.result.doc_type
+    best_score = page.result.confidence
+    best_matches = list(page.result.matched_patterns)
+    header_sample = page.result.header_sample
+
     # =================================================================
     # Stage 3: Stateful Continuity (Carry-over)
     # =================================================================
-    if prev_type and prev_type != "UNKNOWN" and prev_type != "BLANK":
+    if not page.blank and prev_type and prev_type != "UNKNOWN" and prev_type != "BLANK":
         # Professional continuation rule:
         # If previous was 302, Teletype, or Cable and current score is weak, carry-over
         report_types = ["FBI_302", "FBI_TELETYPE", "CIA_CABLE", "MEMO", "WC_TESTIMONY", "WC_EXHIBIT"]
@@ -932,74 +1312,6 @@ def classify_document(text: str, header_lines: int = 25, prev_type: Optional[str
         header_sample=header_sample
     )
 
-    # =================================================================
-    # Stage 1: Regex-based classification
-    # =================================================================
-    scores: dict[DocType, tuple[float, list[str]]] = {}
-    
-    for doc_type, patterns in FINGERPRINTS.items():
-        score = 0
-        matched = []
-        
-        for pattern, weight in patterns:
-            # Use MULTILINE for ^ anchors to work per-line
-            flags = re.IGNORECASE | re.MULTILINE
-            if re.search(pattern, combined_sample, flags):
-                score += weight
-                matched.append(pattern)
-        
-        # Normalize score to 0.0 - 1.0
-        max_score = MAX_SCORES[doc_type]
-        normalized = score / max_score if max_score > 0 else 0.0
-        scores[doc_type] = (normalized, matched)
-    
-    # Find best regex match
-    best_type = max(scores.keys(), key=lambda t: scores[t][0])
-    best_score, best_matches = scores[best_type]
-    method = "regex"
-    
-    # =================================================================
-    # Stage 2: Fuzzy fallback (when regex confidence is low)
-    # =================================================================
-    FUZZY_THRESHOLD = 0.5  # Trigger fuzzy matching below this confidence
-    
-    if best_score < FUZZY_THRESHOLD and HAS_RAPIDFUZZ:
-        fuzzy_type, fuzzy_conf, fuzzy_matches = fuzzy_classify(combined_sample)
-        
-        # Case A: Fuzzy agrees with regex - boost confidence
-        if fuzzy_type == best_type and fuzzy_conf > 0:
-            # Combine scores (weighted average favoring the higher one)
-            combined_conf = max(best_score, fuzzy_conf * 0.9)
-            best_score = combined_conf
-            best_matches = best_matches + [f"[fuzzy] {m}" for m in fuzzy_matches[:3]]
-            method = "regex+fuzzy"
-        
-        # Case B: Fuzzy is much more confident - override
-        elif fuzzy_conf > best_score + 0.15 and fuzzy_conf >= 0.3:
-            best_type = fuzzy_type
-            best_score = fuzzy_conf * 0.85  # Slight penalty for fuzzy-only
-            best_matches = [f"[fuzzy] {m}" for m in fuzzy_matches]
-            method = "fuzzy"
-    
-    # =================================================================
-    # Final decision
-    # =================================================================
-    # If best score is still too low, return UNKNOWN
-    if best_score < 0.10:
-        return ClassificationResult(
-            doc_type=DocType.UNKNOWN,
-            confidence=0.0,
-            matched_patterns=[],
-            header_sample=header_sample[:500],
-        )
-    
-    return ClassificationResult(
-        doc_type=best_type,
-        confidence=best_score,
-        matched_patterns=best_matches,
-        header_sample=header_sample[:500],
-    )
-
 
 def get_all_scores(text: str, header_lines: int = 25) -> dict[str, float]:
     """
@@ -1018,20 +1330,7 @@ def get_all_scores(text: str, header_lines: int = 25) -> dict[str, float]:
     body_sample = text[:3000] if len(text) > 3000 else text
     combined_sample = header_sample + "\n" + footer_sample + "\n" + body_sample
     
-    results = {}
-    
-    for doc_type, patterns in FINGERPRINTS.items():
-        score = 0
-        for pattern, weight in patterns:
-            flags = re.IGNORECASE | re.MULTILINE
-            if re.search(pattern, combined_sample, flags):
-                score += weight
-        
-        max_score = MAX_SCORES[doc_type]
-        normalized = score / max_score if max_score > 0 else 0.0
-        results[doc_type.value] = round(normalized, 3)
-    
-    return dict(sorted(results.items(), key=lambda x: x[1], reverse=True))
+    return _rank_scores(_ENGINE.score(_ENGINE.scan(ZONE_COMBINED, combined_sample)))
 
 
 # =============================================================================
@@ -0,0 +1,111 @@
+"""
+document_context.py — Per-document analysis state
+
+One DocumentContext is built per OCR'd document and handed to the
+classifier, zone extractor and metadata parser, so work they all need is
+done once per document instead of once per stage:
+
+- preprocessed text and the classifier's header sample
+- a line-offset index of the raw text, giving zone bounds without splitting
+- the ClassificationResult itself
+
+Everything is computed lazily on first use and then cached.
+
+Usage:
+    context = DocumentContext(ocr_text)
+    extraction = extract_document(ocr_text, context=context)
+    metadata = parse_metadata(ocr_text, context=context)
+    context.classification.doc_type   # Classified once, shared by both
+"""
+
+from functools import cached_property
+from typing import Optional
+
+from document_classifier import (
+    ClassificationResult,
+    PageScores,
+    extract_header_sample,
+    preprocess_text,
+    resolve_page,
+    score_blank,
+    score_preprocessed,
+)
+
+
+class DocumentContext:
+    """Lazily computed, cached analysis of one document's text."""
+
+    def __init__(
+        self,
+        text: str,
+        header_lines: int = 25,
+        prev_type: Optional[str] = None,
+        classification: Optional[ClassificationResult] = None,
+    ):
+        """
+        Args:
+            text: Full OCR text
+            header_lines: Lines the classifier analyzes (as classify_document)
+            prev_type: Type of the previous page (for continuity)
+            classification: Known classification, if already computed
+        """
+        self.text = text
+        self.header_lines = header_lines
+        self.prev_type = prev_type
+        if classification is not None:
+            self.__dict__["classification"] = classification
+
+    # =========================================================================
+    # Text
+    # =========================================================================
+
+    @cached_property
+    def line_starts(self) -> list[int]:
+        """Offset of the first character of every line in text."""
+        starts = [0]
+        find = self.text.find
+        pos = find('\n')
+        while pos >= 0:
+            starts.append(pos + 1)
+            pos = find('\n', pos + 1)
+        return starts
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_starts)
+
+    def zone_bounds(self, header_lines: int, footer_lines: int) -> Optional[tuple[int, int]]:
+        """
+        (header_end, footer_start) offsets for zone_extractor, or None when
+        the document has no more than header_lines + footer_lines lines.
+        """
+        if self.line_count <= header_lines + footer_lines:
+            return None
+        return self.line_starts[header_lines] - 1, self.line_starts[-footer_lines]
+
+    @cached_property
+    def preprocessed(self) -> str:
+        """Text with OCR artifacts cleaned up (preprocess_text)."""
+        return preprocess_text(self.text)
+
+    @cached_property
+    def header_sample(self) -> str:
+        """First header_lines lines of the preprocessed text."""
+        return extract_header_sample(self.preprocessed, self.header_lines)
+
+    # =========================================================================
+    # Classification
+    # =========================================================================
+
+    @cached_property
+    def page_scores(self) -> PageScores:
+        """Classifier stages 0-2, before continuity."""
+        page = score_blank(self.text)
+        if page is None:
+            page = score_preprocessed(self.preprocessed, self.header_sample)
+        return page
+
+    @cached_property
+    def classification(self) -> ClassificationResult:
+        """Same result as classify_document(text, header_lines, prev_type)."""
+        return resolve_page(self.page_scores, self.prev_type)
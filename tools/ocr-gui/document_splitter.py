@@ -0,0 +1,377 @@
+"""
+document_splitter.py — Per-document metadata for multi-document files
+
+A scanned FBI file is often many documents bound together: twenty FD-302s,
+a memo, a teletype. MetadataParser only reads the first and last couple of
+thousand characters of the text it is given, so parsing the concatenated
+OCR output yields one RIF/agent/date for the whole file.
+
+This module works page by page instead:
+
+1. Load the pages from the .ocr.json page array, the `--- PAGE n ---`
+   markers of the .txt output, or form feeds (ocrmypdf sidecar text).
+2. Score every page (classifier stages 0-2) and walk them in order with
+   classifier continuity to find where each logical document starts.
+3. Run zone extraction and the metadata parser on each document's text.
+
+For large files, scoring and extraction run in the process pool of a
+ParallelClassifier. The result is written as a compact sidecar,
+<base>.documents.json, next to the OCR output.
+
+Usage:
+    with ParallelClassifier() as classifier:
+        splitter = DocumentSplitter(classifier)
+        pages = load_pages("processed/report")
+        documents = splitter.split(pages)
+        write_sidecar("processed/report.documents.json", "report.pdf", pages, documents)
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from document_classifier import (
+    ClassificationResult,
+    DocType,
+    PageScores,
+    extract_header_sample,
+    get_agency,
+    resolve_page,
+    score_page,
+)
+from document_context import DocumentContext
+from metadata_parser import MetadataParser
+from parallel_classifier import ParallelClassifier
+from zone_extractor import extract_by_type
+
+# Files with fewer pages are processed inline (pool start-up costs more)
+PARALLEL_MIN_PAGES = 8
+
+# Lines at the top of a page searched for a document start marker
+START_LINES = 10
+
+# Form headers that open a new document of a type. A page matching one
+# starts a new document even when continuity would carry the previous
+# document's type over it (e.g. the second of several consecutive 302s).
+DOCUMENT_START_PATTERNS = {
+    DocType.FBI_302: [r"FEDERAL BUREAU OF INVESTIGATION", r"F.?D.?E.?R.?A.?L\s+BUREAU", r"FD.?302"],
+    DocType.FBI_TELETYPE: [r"TELETYPE"],
+    DocType.NARA_RIF: [r"\d{3}-\d{5}-\d{5}", r"RECORD\s+NUMBER\s*:"],
+    DocType.CIA_CABLE: [r"CLASSIFIED MESSAGE", r"\bDIR\s+\d+"],
+    DocType.MEMO: [r"MEMORANDUM", r"^\s*TO\s*:"],
+    DocType.WC_TESTIMONY: [r"TESTIMONY\s+OF"],
+    DocType.WC_AFFIDAVIT: [r"AFFIDAVIT"],
+    DocType.LETTER: [r"^\s*Dear\s+"],
+}
+
+_START_REGEXES = {
+    doc_type: [re.compile(p, re.IGNORECASE | re.MULTILINE) for p in patterns]
+    for doc_type, patterns in DOCUMENT_START_PATTERNS.items()
+}
+
+# Metadata parser fields copied into the sidecar (values only)
+METADATA_FIELDS = ("rif_number", "agency", "date", "author", "footer_author", "footer_file_number", "footer_date")
+
+PAGE_MARKER = re.compile(r"^--- PAGE (\d+) ---$", re.MULTILINE)
+
+
+@dataclass
+class Page:
+    """One page of OCR text."""
+    page: int  # 1-based
+    text: str
+
+
+@dataclass
+class LogicalDocument:
+    """A run of consecutive pages forming one document."""
+    index: int  # 1-based position in the file
+    pages: list[int]  # 1-based page numbers
+    classification: ClassificationResult  # Of the first page
+    metadata: dict = field(default_factory=dict)
+
+    @property
+    def doc_type(self) -> str:
+        return self.classification.doc_type.value
+
+    def to_dict(self) -> dict:
+        return {
+            "index": self.index,
+            "pages": [self.pages[0], self.pages[-1]],
+            "doc_type": self.doc_type,
+            "confidence": round(self.classification.confidence, 3),
+            "agency": get_agency(self.classification.doc_type),
+            **self.metadata,
+        }
+
+
+# =============================================================================
+# PAGE LOADING
+# =============================================================================
+
+def _page_text(page_data: dict) -> str:
+    """Text of one .ocr.json page (Python backend pages only carry lines)."""
+    if page_data.get("text") is not None:
+        return page_data["text"]
+    return "\n".join(line.get("text", "") for line in page_data.get("lines", []))
+
+
+def split_text_pages(text: str) -> list[Page]:
+    """
+    Split concatenated OCR text into pages.
+
+    Understands the `--- PAGE n ---` markers written by OCRWorker and the
+    form feeds in ocrmypdf sidecar text; otherwise the text is one page.
+    """
+    markers = list(PAGE_MARKER.finditer(text))
+    if markers:
+        pages = []
+        for i, marker in enumerate(markers):
+            end = markers[i + 1].start() if i + 1 < len(markers) else len(text)
+            pages.append(Page(int(marker.group(1)), text[marker.end():end].strip("\n")))
+        return pages
+    if "\f" in text:
+        return [Page(i + 1, part) for i, part in enumerate(text.split("\f"))]
+    return [Page(1, text)]
+
+
+def load_pages(base_path: str) -> list[Page]:
+    """
+    Load the pages of an OCR output.
+
+    Args:
+        base_path: Output path without extension (e.g. processed/report);
+            <base>.ocr.json is preferred, then <base>.txt and <base>.md
+
+    Returns:
+        Pages in order (empty if no output exists)
+    """
+    json_path = f"{base_path}.ocr.json"
+    if os.path.exists(json_path):
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            pages = [
+                Page(page_data.get("page", i + 1), _page_text(page_data))
+                for i, page_data in enumerate(data.get("pages", []))
+            ]
+            if any(page.text.strip() for page in pages):
+                return pages
+        except (OSError, ValueError):
+            pass
+
+    for path in (f"{base_path}.txt", f"{base_path}.md"):
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return split_text_pages(f.read())
+    return []
+
+
+# =============================================================================
+# BOUNDARY DETECTION
+# =============================================================================
+
+def starts_document(doc_type: DocType, text: str) -> bool:
+    """True if the top of a page carries the form header of doc_type."""
+    regexes = _START_REGEXES.get(doc_type)
+    if not regexes:
+        return False
+    header = extract_header_sample(text, START_LINES)
+    return any(regex.search(header) for regex in regexes)
+
+
+def _opening(page: Page, scored: PageScores, resolved: ClassificationResult) -> Optional[ClassificationResult]:
+    """
+    Classification of the document a page opens, or None for a continuation.
+
+    Checks the page's own type, then its resolved type, then any other type
+    with fingerprint evidence on the page (best score first), so a 302
+    header is recognized even on a page continuity assigned to a memo.
+    """
+    if starts_document(scored.result.doc_type, page.text):
+        return scored.result
+    if starts_document(resolved.doc_type, page.text):
+        return resolved
+    candidates = sorted(
+        (
+            (score, doc_type, matched)
+            for doc_type, (score, matched) in scored.scores.items()
+            if score > 0 and doc_type in _START_REGEXES
+            and doc_type not in (scored.result.doc_type, resolved.doc_type)
+        ),
+        key=lambda c: -c[0],
+    )
+    for score, doc_type, matched in candidates:
+        if starts_document(doc_type, page.text):
+            return ClassificationResult(
+                doc_type=doc_type,
+                confidence=score,
+                matched_patterns=list(matched),
+                header_sample=scored.result.header_sample,
+            )
+    return None
+
+
+def find_documents(pages: list[Page], scores: list[PageScores]) -> list[LogicalDocument]:
+    """
+    Group scored pages into logical documents.
+
+    Continuity runs against the type of the document being built (blank
+    pages do not interrupt it). A new document starts when the resolved
+    type changes, or when a page opens with a form header (see _opening).
+
+    Args:
+        pages: Pages in order
+        scores: score_page() result for each page
+
+    Returns:
+        Documents in page order; blank pages belong to the surrounding document
+    """
+    documents: list[LogicalDocument] = []
+    current: Optional[LogicalDocument] = None
+    leading_blanks: list[int] = []
+
+    for page, scored in zip(pages, scores):
+        if scored.blank:
+            if current is None:
+                leading_blanks.append(page.page)
+            else:
+                current.pages.append(page.page)
+            continue
+
+        resolved = resolve_page(scored, current.doc_type if current else None)
+        opening = _opening(page, scored, resolved)
+
+        if current is None or opening is not None or resolved.doc_type.value != current.doc_type:
+            current = LogicalDocument(
+                index=len(documents) + 1,
+                pages=leading_blanks + [page.page],
+                classification=opening or resolved,
+            )
+            documents.append(current)
+            leading_blanks = []
+        else:
+            current.pages.append(page.page)
+
+    if leading_blanks:
+        # Nothing but blank pages
+        documents.append(LogicalDocument(
+            index=1,
+            pages=leading_blanks,
+            classification=scores[0].result,
+        ))
+    return documents
+
+
+# =============================================================================
+# WORKERS (run in pool processes)
+# =============================================================================
+
+_PARSER: Optional[MetadataParser] = None
+
+
+def _extract_metadata(text: str, classification: ClassificationResult) -> dict:
+    """Worker: zone fields and header/footer metadata of one document, values only."""
+    global _PARSER
+    if _PARSER is None:
+        _PARSER = MetadataParser()
+
+    context = DocumentContext(text, classification=classification)
+    extraction = extract_by_type(text, classification, context)
+    parsed = _PARSER.parse(text, context=context)
+
+    metadata = {"fields": {name: f.value for name, f in extraction.fields.items()}}
+    for name in METADATA_FIELDS:
+        extracted = getattr(parsed, name)
+        if extracted is not None:
+            metadata[name] = extracted.value
+    if parsed.date_iso:
+        metadata["date_iso"] = parsed.date_iso
+    return metadata
+
+
+# =============================================================================
+# SPLITTER
+# =============================================================================
+
+class DocumentSplitter:
+    """
+    Splits a file's pages into logical documents and extracts their metadata.
+
+    Files with at least PARALLEL_MIN_PAGES pages are scored and extracted
+    in the classifier's process pool; without a classifier (or with a
+    single worker) everything runs inline.
+    """
+
+    def __init__(self, classifier: Optional[ParallelClassifier] = None, header_lines: int = 25):
+        self.classifier = classifier
+        self.header_lines = header_lines
+
+    def split(self, pages: list[Page]) -> list[LogicalDocument]:
+        """
+        Find the documents in pages and fill in each one's metadata.
+
+        Args:
+            pages: Pages of one file, in order
+
+        Returns:
+            LogicalDocument list in page order
+        """
+        if not pages:
+            return []
+        classifier = self.classifier
+        parallel = classifier is not None and classifier.workers > 1 and len(pages) >= PARALLEL_MIN_PAGES
+        texts = [page.text for page in pages]
+
+        if parallel:
+            scores = [
+                page.scores
+                for page in classifier.iter_texts(texts, continuity=False, header_lines=self.header_lines, text_chars=0)
+            ]
+        else:
+            scores = [score_page(text, self.header_lines) for text in texts]
+
+        documents = find_documents(pages, scores)
+
+        text_by_page = {page.page: page.text for page in pages}
+        jobs = [
+            ("\n\n".join(text_by_page[n] for n in document.pages), document.classification)
+            for document in documents
+        ]
+        if parallel and len(documents) > 1:
+            futures = [classifier.submit(_extract_metadata, text, classification) for text, classification in jobs]
+            results = [future.result() for future in futures]
+        else:
+            results = [_extract_metadata(text, classification) for text, classification in jobs]
+
+        for document, metadata in zip(documents, results):
+            document.metadata = metadata
+        return documents
+
+
+# =============================================================================
+# SIDECAR
+# =============================================================================
+
+def sidecar_data(source: str, pages: list[Page], documents: list[LogicalDocument]) -> dict:
+    """JSON-serializable per-document summary of one file."""
+    return {
+        "version": "1.0",
+        "source": source,
+        "page_count": len(pages),
+        "generated_at": datetime.now().isoformat(),
+        "documents": [document.to_dict() for document in documents],
+    }
+
+
+def write_sidecar(path: str, source: str, pages: list[Page], documents: list[LogicalDocument]) -> dict:
+    """Write <base>.documents.json atomically and return its contents."""
+    data = sidecar_data(source, pages, documents)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+    return data
@@ -1,32 +1,94 @@
 
 import json
 import re
+from collections import defaultdict
 from pathlib import Path
 from typing import List, Dict, Any
+
+from name_automaton import NameAutomaton
+from span_resolver import select_spans
 try:
     from rapidfuzz import process, fuzz
     HAS_RAPIDFUZZ = True
 except ImportError:
     HAS_RAPIDFUZZ = False
 
+# Fuzzy stage: capitalized word runs scored against master names
+PROPER_NOUN_PATTERN = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b')
+FUZZY_MIN_LEN = 4
+FUZZY_THRESHOLD = 88  # Slightly higher threshold for blocks
+
+# Record fields used as fuzzy master names
+PEOPLE_NAME_FIELDS = ["display_name", "given_name", "family_name"]
+PLACE_NAME_FIELDS = ["name"]
+
+
+class FuzzyIndex:
+    """
+    Master names of one entity type, blocked by token initials.
+
+    A candidate is only scored against names sharing at least one token
+    initial letter with it. token_set_ratio scores a subset match ("Oswald"
+    vs "Lee Harvey Oswald") at 100 whatever the token count or length, so
+    blocking on those would drop real links; only OCR damage to every first
+    letter can hide a match at FUZZY_THRESHOLD from the initials block.
+    """
+
+    def __init__(self, master: List[Dict[str, Any]]):
+        self.master = master
+        self.names = [item["name"] for item in master]
+        self._by_initial = defaultdict(set)
+        for i, name in enumerate(self.names):
+            for initial in self.initials(name):
+                self._by_initial[initial].add(i)
+        self._blocks = {}
+
+    @staticmethod
+    def initials(name: str) -> frozenset:
+        return frozenset(token[0].lower() for token in name.split() if token)
+
+    def block(self, initials: frozenset) -> List[int]:
+        """Indexes of master names sharing an initial, in master order."""
+        if initials not in self._blocks:
+            members = set()
+            for initial in initials:
+                members |= self._by_initial.get(initial, set())
+            self._blocks[initials] = sorted(members)
+        return self._blocks[initials]
+
+
 class EntityLinker:
     """
     Narrative Entity Linking Engine.
     Cross-references archival text with existing People and Places databases.
     """
     
-    def __init__(self, data_dir: Path):
+    def __init__(self, data_dir: Path, people: List[Dict[str, Any]] = None, places: List[Dict[str, Any]] = None):
         self.data_dir = data_dir
-        self.people = self._load_json(data_dir / "people.json")
-        self.places = self._load_json(data_dir / "places.json")
+        self.people = self._load_json(data_dir / "people.json") if people is None else people
+        self.places = self._load_json(data_dir / "places.json") if places is None else places
         
         # Compile patterns for high-speed matching
-        self.people_patterns = self._build_people_patterns()
-        self.places_patterns = self._build_places_patterns()
+        self.people_patterns = self._build_people_patterns(self.people)
+        self.places_patterns = self._build_places_patterns(self.places)
         
         # Build master name lists for fuzzy matching
-        self.master_people = self._build_master_names(self.people, ["display_name", "given_name", "family_name"])
-        self.master_places = self._build_master_names(self.places, ["name"])
+        self.master_people = self._build_master_names(self.people, PEOPLE_NAME_FIELDS)
+        self.master_places = self._build_master_names(self.places, PLACE_NAME_FIELDS)
+
+        self._compile()
+
+    def _compile(self):
+        """Build the exact-match automaton and fuzzy blocks from the pattern lists."""
+        # One automaton over every name variant, built once per linker
+        self.exact_patterns = self._build_exact_patterns()
+        self.exact_automaton = NameAutomaton()
+        for i, entity in enumerate(self.exact_patterns):
+            self.exact_automaton.add(entity["name"], i)
+        self.exact_automaton.build()
+
+        self.fuzzy_people = FuzzyIndex(self.master_people)
+        self.fuzzy_places = FuzzyIndex(self.master_places)
 
     def _load_json(self, path: Path) -> List[Dict[str, Any]]:
         """Load archival JSON data."""
@@ -38,10 +100,10 @@ class EntityLinker:
         except Exception:
             return []
 
-    def _build_people_patterns(self):
+    def _build_people_patterns(self, people):
         """Build regex patterns for known people, including initials and aliases."""
         patterns = []
-        for p in self.people:
+        for p in people:
             names = []
             display = p.get("display_name", "")
             given = p.get("given_name", "")
@@ -74,16 +136,17 @@ class EntityLinker:
                     entity_id = p.get("id") or p.get("person_id") or "unknown"
                     patterns.append({
                         "pattern": re.compile(r'\b' + re.escape(name) + r'\b', re.IGNORECASE),
+                        "name": name,
                         "id": entity_id,
                         "display": display or entity_id,
                         "match_len": len(name)
                     })
         return patterns
 
-    def _build_places_patterns(self):
+    def _build_places_patterns(self, places):
         """Build regex patterns for known places."""
         patterns = []
-        for p in self.places:
+        for p in places:
             names = [p["name"]]
             if p.get("id"): names.append(p["id"].replace('-', ' '))
             
@@ -93,12 +156,35 @@ class EntityLinker:
                     entity_id = p.get("id") or p.get("place_id") or "unknown"
                     patterns.append({
                         "pattern": re.compile(r'\b' + re.escape(name) + r'\b', re.IGNORECASE),
+                        "name": name,
                         "id": entity_id,
                         "display": p.get("name", entity_id),
                         "match_len": len(name)
                     })
         return patterns
 
+    def _build_exact_patterns(self):
+        """Combine people and place patterns, most specific (longest) name first."""
+        combined = []
+        for p in self.people_patterns:
+            combined.append({**p, "type": "PERSON"})
+        for p in self.places_patterns:
+            combined.append({**p, "type": "PLACE"})
+        combined.sort(key=lambda x: x["match_len"], reverse=True)
+        return combined
+
+    def _exact_matches(self, text: str):
+        """Yield (pattern_index, start, end) for every whole-word name occurrence."""
+        text_lower = text.lower()
+        if len(text_lower) != len(text):
+            # Lowercasing changed offsets (rare Unicode); scan pattern by pattern
+            for i, entity in enumerate(self.exact_patterns):
+                for match in entity["pattern"].finditer(text):
+                    yield i, match.start(), match.end()
+            return
+        for start, end, i in self.exact_automaton.find_all(text, text_lower=text_lower):
+            yield i, start, end
+
     def _build_master_names(self, data_list, fields):
         """Build a flat list of names for fuzzy matching."""
         master = []
@@ -131,112 +217,110 @@ class EntityLinker:
         if not text:
             return []
             
-        # Combine all patterns and sort by the length of the matched text (proxy by display name length)
-        combined = []
-        for p in self.people_patterns:
-            combined.append({**p, "type": "PERSON"})
-        for p in self.places_patterns:
-            combined.append({**p, "type": "PLACE"})
-            
-        # Sort by specificity of the matched text (match_len)
-        combined.sort(key=lambda x: x["match_len"], reverse=True)
-            
         links = []
         potential_matches = []
         
-        # --- Stage 1: Collect Exact Regex Matches ---
-        for entity in combined:
-            for match in entity["pattern"].finditer(text):
-                potential_matches.append({
-                    "id": entity["id"],
-                    "type": entity["type"],
-                    "label": entity["display"],
-                    "matched_text": match.group(0),
-                    "start": match.start(),
-                    "end": match.end(),
-                    "method": "exact",
-                    "score": 100
-                })
+        # --- Stage 1: Collect Exact Matches (single automaton pass) ---
+        # Ordered by pattern (longest name first), then position
+        for i, start, end in sorted(self._exact_matches(text)):
+            entity = self.exact_patterns[i]
+            potential_matches.append({
+                "id": entity["id"],
+                "type": entity["type"],
+                "label": entity["display"],
+                "matched_text": text[start:end],
+                "start": start,
+                "end": end,
+                "method": "exact",
+                "score": 100
+            })
 
         # --- Stage 2: Collect Fuzzy Matches from Proper Noun Sequences ---
         if HAS_RAPIDFUZZ:
-            proper_noun_pattern = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b')
-            for match in proper_noun_pattern.finditer(text):
-                candidate = match.group(0)
-                if len(candidate) < 4: continue
-                
-                # Check people
-                best_p = self._fuzzy_search(candidate, self.master_people)
-                if best_p and best_p["score"] >= 88: # Slightly higher threshold for blocks
-                    potential_matches.append({
-                        "id": best_p["id"],
-                        "type": "PERSON",
-                        "label": best_p["display"],
-                        "matched_text": candidate,
-                        "start": match.start(),
-                        "end": match.end(),
-                        "method": "fuzzy",
-                        "score": best_p["score"]
-                    })
-                
-                # Check places
-                best_pl = self._fuzzy_search(candidate, self.master_places)
-                if best_pl and best_pl["score"] >= 88:
-                    potential_matches.append({
-                        "id": best_pl["id"],
-                        "type": "PLACE",
-                        "label": best_pl["display"],
-                        "matched_text": candidate,
-                        "start": match.start(),
-                        "end": match.end(),
-                        "method": "fuzzy",
-                        "score": best_pl["score"]
-                    })
+            spans = [
+                (match.group(0), match.start(), match.end())
+                for match in PROPER_NOUN_PATTERN.finditer(text)
+                if len(match.group(0)) >= FUZZY_MIN_LEN
+            ]
+            # Score each distinct candidate once per entity type
+            candidates = list(dict.fromkeys(candidate for candidate, _, _ in spans))
+            best_people = self._fuzzy_search(candidates, self.fuzzy_people)
+            best_places = self._fuzzy_search(candidates, self.fuzzy_places)
+
+            for candidate, start, end in spans:
+                for entity_type, best in (("PERSON", best_people), ("PLACE", best_places)):
+                    found = best.get(candidate)
+                    if found:
+                        potential_matches.append({
+                            "id": found["id"],
+                            "type": entity_type,
+                            "label": found["display"],
+                            "matched_text": candidate,
+                            "start": start,
+                            "end": end,
+                            "method": "fuzzy",
+                            "score": found["score"]
+                        })
 
         # --- Stage 3: Resolve Overlaps and De-duplicate ---
-        # Sort by match length (longest first), then score
-        potential_matches.sort(key=lambda x: (x["end"] - x["start"], x["score"]), reverse=True)
-        
+        # Longest match first, then score; one link per entity
         seen_ids = set()
-        consumed_ranges = []
-        
-        for m in potential_matches:
-            # Check for range overlap
-            overlap = False
-            for c_start, c_end in consumed_ranges:
-                if (m["start"] >= c_start and m["start"] < c_end) or \
-                   (m["end"] > c_start and m["end"] <= c_end) or \
-                   (m["start"] <= c_start and m["end"] >= c_end):
-                    overlap = True
-                    break
-            
-            if not overlap and m["id"] not in seen_ids:
-                links.append({
-                    "id": m["id"],
-                    "type": m["type"],
-                    "label": m["label"],
-                    "matched_text": m["matched_text"],
-                    "method": m["method"],
-                    "score": round(m["score"], 1) if m["method"] == "fuzzy" else 100
-                })
-                seen_ids.add(m["id"])
-                consumed_ranges.append((m["start"], m["end"]))
+
+        def first_for_entity(m):
+            if m["id"] in seen_ids:
+                return False
+            seen_ids.add(m["id"])
+            return True
+
+        for m in select_spans(
+            potential_matches,
+            span=lambda m: (m["start"], m["end"]),
+            priority=lambda m: (m["start"] - m["end"], -m["score"]),
+            accept=first_for_entity,
+        ):
+            links.append({
+                "id": m["id"],
+                "type": m["type"],
+                "label": m["label"],
+                "matched_text": m["matched_text"],
+                "method": m["method"],
+                "score": round(m["score"], 1) if m["method"] == "fuzzy" else 100
+            })
                 
         return links
 
-    def _fuzzy_search(self, candidate, master_list):
-        """Search a master list for the best fuzzy match."""
-        if not master_list: return None
-        
-        # Only take items that are reasonably similar in length
-        name_strings = [item["name"] for item in master_list]
-        
-        result = process.extractOne(candidate, name_strings, scorer=fuzz.token_set_ratio)
-        
-        if result:
-            match_str, score, idx = result
-            return {**master_list[idx], "score": score}
-        return None
+    def _fuzzy_search(self, candidates: List[str], index: FuzzyIndex) -> Dict[str, Dict[str, Any]]:
+        """
+        Best master entry scoring >= FUZZY_THRESHOLD for each candidate.
+
+        Candidates with the same initials share a block and are scored in
+        one multi-threaded cdist call.
+        """
+        if not candidates or not index.names:
+            return {}
+
+        groups = defaultdict(list)
+        for candidate in candidates:
+            groups[index.initials(candidate)].append(candidate)
+
+        best = {}
+        for initials, group in groups.items():
+            choices = index.block(initials)
+            if not choices:
+                continue
+            scores = process.cdist(
+                group,
+                [index.names[i] for i in choices],
+                scorer=fuzz.token_set_ratio,
+                score_cutoff=FUZZY_THRESHOLD,
+                workers=-1,
+            )
+            for candidate, row in zip(group, scores):
+                # First best, like extractOne over the master list
+                j = int(row.argmax())
+                if row[j] >= FUZZY_THRESHOLD:
+                    best[candidate] = {**index.master[choices[j]], "score": float(row[j])}
+        return best
 
 # Test logic
 if __name__ == "__main__":
@@ -0,0 +1,377 @@
+"""
+job_queue.py — Durable processing jobs with a bounded worker pool
+
+Jobs are plain dicts (the shape returned by /api/jobs) persisted as JSON in
+SQLite, so they survive a server restart. Started jobs wait in priority
+lanes and are run by a fixed number of worker threads:
+
+- QUICK: text/subtitle/document/email imports (seconds)
+- NORMAL: images, short PDFs, media
+- BULK: long PDFs and large uploads
+
+General workers take the lowest non-empty lane first. One extra worker
+serves only the QUICK lane so imports never wait behind a 900-page OCR run.
+
+Interrupted jobs (queued or processing when the server stopped) are put
+back in their lane by resume(). Cancellation removes queued jobs
+immediately and signals running ones through the attached OCRWorker /
+TranscriptionWorker (their cancel() sets _cancel_flag).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+# Priority lanes (lower runs first)
+PRIORITY_QUICK = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2
+PRIORITY_NAMES = {"quick": PRIORITY_QUICK, "normal": PRIORITY_NORMAL, "bulk": PRIORITY_BULK}
+
+# Job statuses
+STATUS_PENDING = "pending"  # Created, not started
+STATUS_QUEUED = "queued"  # Waiting for a worker
+STATUS_PROCESSING = "processing"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+ACTIVE_STATUSES = {STATUS_QUEUED, STATUS_PROCESSING}
+FINAL_STATUSES = {STATUS_COMPLETED, STATUS_FAILED, STATUS_CANCELLED}
+
+# Default worker threads for NORMAL/BULK work (plus one QUICK-only worker)
+DEFAULT_WORKERS = 2
+
+# Minimum seconds between progress writes for a running job
+SAVE_INTERVAL = 1.0
+
+
+class JobCancelled(Exception):
+    """Raised inside a job runner to stop at a safe point."""
+
+
+class JobQueue:
+    """
+    SQLite-backed job store with priority lanes and a fixed worker pool.
+
+    Args:
+        db_path: SQLite file (":memory:" for tests)
+        run_job: Called as run_job(job) on a worker thread. It mutates the
+            job dict in place and calls save(job) to persist progress.
+        workers: Threads serving every lane
+        quick_workers: Additional threads serving only the QUICK lane
+    """
+
+    def __init__(self, db_path: str, run_job: Callable[[dict], None],
+                 workers: int = DEFAULT_WORKERS, quick_workers: int = 1):
+        self.db_path = db_path
+        self.run_job = run_job
+        self.workers = max(1, workers)
+        self.quick_workers = max(0, quick_workers)
+
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._lanes = {lane: deque() for lane in PRIORITY_NAMES.values()}
+        self._jobs: dict[str, dict] = {}  # Jobs not yet finished
+        self._cancel_events: dict[str, threading.Event] = {}
+        self._active_workers: dict[str, object] = {}
+        self._last_saved: dict[str, float] = {}
+        self._threads: list[threading.Thread] = []
+
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                seq       INTEGER PRIMARY KEY AUTOINCREMENT,
+                id        TEXT UNIQUE NOT NULL,
+                status    TEXT NOT NULL,
+                priority  INTEGER NOT NULL,
+                created   REAL NOT NULL,
+                updated   REAL NOT NULL,
+                data      TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status);
+            """
+        )
+        self._conn.commit()
+
+    # =========================================================================
+    # Store
+    # =========================================================================
+
+    def create(self, job: dict, priority: int = PRIORITY_NORMAL) -> dict:
+        """Assign an id (job_<n>), persist the job as pending and return it."""
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO jobs (id, status, priority, created, updated, data) VALUES (?, ?, ?, ?, ?, ?)",
+                ("", STATUS_PENDING, priority, now, now, "{}"),
+            )
+            job_id = f"job_{cur.lastrowid}"
+            job.update({
+                "id": job_id,
+                "status": STATUS_PENDING,
+                "priority": _priority_name(priority),
+                "created_at": now,
+            })
+            self._conn.execute(
+                "UPDATE jobs SET id = ?, data = ? WHERE seq = ?",
+                (job_id, json.dumps(job), cur.lastrowid),
+            )
+            self._conn.commit()
+            self._jobs[job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return the live job dict, or the stored copy of a finished job."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return job
+            row = self._conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def recent(self, status: Optional[str] = None, limit: int = 50) -> list[dict]:
+        """Recent jobs (newest first) without their logs."""
+        query = "SELECT id, status, priority, created, updated, data FROM jobs WHERE id != ''"
+        params = []
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        query += " ORDER BY seq DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+            live = dict(self._jobs)
+
+        jobs = []
+        for job_id, status, priority, created, updated, data in rows:
+            job = live.get(job_id) or json.loads(data)
+            jobs.append({
+                "id": job_id,
+                "status": job.get("status", status),
+                "priority": _priority_name(priority),
+                "progress": job.get("progress", 0),
+                "files": len(job.get("files", [])),
+                "created_at": created,
+                "updated_at": updated,
+            })
+        return jobs
+
+    def save(self, job: dict, force: bool = True):
+        """
+        Persist a job dict.
+
+        With force=False the write is skipped if the job was saved less than
+        SAVE_INTERVAL seconds ago (for per-page progress callbacks).
+        """
+        now = time.time()
+        job_id = job["id"]
+        if not force and now - self._last_saved.get(job_id, 0) < SAVE_INTERVAL:
+            return
+        with self._lock:
+            self._last_saved[job_id] = now
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, updated = ?, data = ? WHERE id = ?",
+                (job["status"], now, json.dumps(job), job_id),
+            )
+            self._conn.commit()
+
+    # =========================================================================
+    # Scheduling
+    # =========================================================================
+
+    def submit(self, job_id: str, priority: Optional[int] = None, message: Optional[str] = None) -> Optional[dict]:
+        """
+        Queue a pending job for a worker.
+
+        Returns the job, or None if it does not exist. Jobs that are already
+        queued, running or finished are returned unchanged. message is
+        appended to the job's log and persisted with it.
+        """
+        job = self.get(job_id)
+        if job is None or job["status"] != STATUS_PENDING:
+            return job
+        if priority is not None:
+            job["priority"] = _priority_name(priority)
+        if message:
+            job.setdefault("log", []).append(message)
+        self._enqueue(job)
+        return job
+
+    def _enqueue(self, job: dict):
+        lane = PRIORITY_NAMES.get(job.get("priority"), PRIORITY_NORMAL)
+        job["status"] = STATUS_QUEUED
+        with self._lock:
+            self._jobs[job["id"]] = job
+            self._cancel_events[job["id"]] = threading.Event()
+            self._conn.execute("UPDATE jobs SET priority = ? WHERE id = ?", (lane, job["id"]))
+        self.save(job)
+        with self._ready:
+            self._lanes[lane].append(job["id"])
+            self._ready.notify_all()
+        self._start_threads()
+
+    def _start_threads(self):
+        with self._lock:
+            if self._threads:
+                return
+            specs = [(f"job-worker-{i + 1}", PRIORITY_BULK) for i in range(self.workers)]
+            specs += [(f"job-worker-quick-{i + 1}", PRIORITY_QUICK) for i in range(self.quick_workers)]
+            for name, max_lane in specs:
+                thread = threading.Thread(target=self._worker_loop, args=(max_lane,), name=name, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _next_job(self, max_lane: int) -> dict:
+        """Block until a job in a lane <= max_lane is available."""
+        with self._ready:
+            while True:
+                for lane in sorted(self._lanes):
+                    if lane <= max_lane and self._lanes[lane]:
+                        job = self._jobs[self._lanes[lane].popleft()]
+                        # Claimed under the lock so cancel() sees it as running
+                        job["status"] = STATUS_PROCESSING
+                        return job
+                self._ready.wait()
+
+    def _worker_loop(self, max_lane: int):
+        while True:
+            job = self._next_job(max_lane)
+            job_id = job["id"]
+            job["started_at"] = time.time()
+            self.save(job)
+            try:
+                self.run_job(job)
+                if self.is_cancelled(job_id):
+                    job["status"] = STATUS_CANCELLED
+            except JobCancelled:
+                job["status"] = STATUS_CANCELLED
+            except Exception as e:
+                job["status"] = STATUS_FAILED
+                job.setdefault("log", []).append(f"✗ Error: {str(e)}")
+            if job["status"] == STATUS_PROCESSING:
+                job["status"] = STATUS_COMPLETED
+            job["finished_at"] = time.time()
+            self.save(job)
+            with self._lock:
+                self._jobs.pop(job_id, None)
+                self._cancel_events.pop(job_id, None)
+                self._active_workers.pop(job_id, None)
+                self._last_saved.pop(job_id, None)
+
+    def resume(self) -> int:
+        """
+        Re-queue jobs interrupted by a restart.
+
+        Files that already completed are kept; files caught mid-processing
+        go back to pending. Returns the number of jobs re-queued.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM jobs WHERE status IN (?, ?) ORDER BY seq",
+                tuple(ACTIVE_STATUSES),
+            ).fetchall()
+
+        for (data,) in rows:
+            job = json.loads(data)
+            for file_info in job.get("files", []):
+                if file_info.get("status") == STATUS_PROCESSING:
+                    file_info["status"] = STATUS_PENDING
+                    file_info["progress"] = 0
+            job.setdefault("log", []).append("Resumed after server restart")
+            self._enqueue(job)
+        return len(rows)
+
+    # =========================================================================
+    # Cancellation
+    # =========================================================================
+
+    def attach_worker(self, job_id: str, worker):
+        """Register the OCRWorker/TranscriptionWorker currently running a job."""
+        with self._lock:
+            self._active_workers[job_id] = worker
+            cancelled = job_id in self._cancel_events and self._cancel_events[job_id].is_set()
+        if cancelled:
+            worker.cancel()
+
+    def detach_worker(self, job_id: str):
+        with self._lock:
+            self._active_workers.pop(job_id, None)
+
+    def is_cancelled(self, job_id: str) -> bool:
+        with self._lock:
+            event = self._cancel_events.get(job_id)
+        return event is not None and event.is_set()
+
+    def check_cancelled(self, job_id: str):
+        """Raise JobCancelled if cancellation was requested."""
+        if self.is_cancelled(job_id):
+            raise JobCancelled(job_id)
+
+    def cancel(self, job_id: str) -> Optional[dict]:
+        """
+        Cancel a job.
+
+        Pending and queued jobs are cancelled immediately. Running jobs are
+        signalled and finish as cancelled at their next check.
+        """
+        job = self.get(job_id)
+        if job is None or job["status"] in FINAL_STATUSES:
+            return job
+
+        with self._ready:
+            for lane in self._lanes.values():
+                if job_id in lane:
+                    lane.remove(job_id)
+            event = self._cancel_events.get(job_id)
+            worker = self._active_workers.get(job_id)
+            running = job["status"] == STATUS_PROCESSING
+
+        job.setdefault("log", []).append("Job cancelled by user")
+        if running:
+            if event is not None:
+                event.set()
+            if worker is not None:
+                worker.cancel()
+            self.save(job)
+            return job
+
+        job["status"] = STATUS_CANCELLED
+        self.save(job)
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            self._cancel_events.pop(job_id, None)
+        return job
+
+    # =========================================================================
+    # Maintenance
+    # =========================================================================
+
+    def stats(self) -> dict:
+        """Queue depth per lane and job counts per status."""
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs WHERE id != '' GROUP BY status"))
+            lanes = {name: len(self._lanes[lane]) for name, lane in PRIORITY_NAMES.items()}
+            running = sum(1 for job in self._jobs.values() if job["status"] == STATUS_PROCESSING)
+        return {
+            "workers": self.workers,
+            "quick_workers": self.quick_workers,
+            "running": running,
+            "queued": lanes,
+            "jobs": counts,
+        }
+
+
+def _priority_name(priority: int) -> str:
+    for name, lane in PRIORITY_NAMES.items():
+        if lane == priority:
+            return name
+    return "normal"
@@ -27,7 +27,8 @@ from dataclasses import dataclass, field, asdict
 
 # Import document classifier for type detection
 try:
-    from document_classifier import classify_document, DocType, ClassificationResult
+    from document_classifier import DocType, ClassificationResult
+    from document_context import DocumentContext
     CLASSIFIER_AVAILABLE = True
 except ImportError:
     CLASSIFIER_AVAILABLE = False
@@ -291,13 +292,14 @@ class MetadataParser:
             for name, cfg in self.FOOTER_PATTERNS.items()
         }
     
-    def parse(self, text: str, include_footer: bool = True) -> ParsedMetadata:
+    def parse(self, text: str, include_footer: bool = True, context: Optional["DocumentContext"] = None) -> ParsedMetadata:
         """
         Parse OCR text and extract header (and optionally footer) metadata.
         
         Args:
             text: Full OCR text from document
             include_footer: If True, also scan document footer for FBI 302 metadata
+            context: DocumentContext for text; reuses its classification
             
         Returns:
             ParsedMetadata with extracted fields and confidence scores
@@ -306,7 +308,9 @@ class MetadataParser:
         
         # Step 1: Classify document type (if classifier available)
         if CLASSIFIER_AVAILABLE:
-            classification = classify_document(text)
+            if context is None:
+                context = DocumentContext(text)
+            classification = context.classification
             result.classified_type = classification.doc_type.value
             result.classification_confidence = classification.confidence
             result.classification_label = classification.confidence_label
@@ -517,19 +521,20 @@ class MetadataParser:
 # CONVENIENCE FUNCTIONS
 # =============================================================================
 
-def parse_metadata(text: str, include_footer: bool = True) -> dict:
+def parse_metadata(text: str, include_footer: bool = True, context: Optional["DocumentContext"] = None) -> dict:
     """
     Convenience function to parse text and return JSON-serializable dict.
     
     Args:
         text: OCR text to parse
         include_footer: If True, also scan document footer (default: True)
+        context: DocumentContext for text, shared with other stages
         
     Returns:
         Dictionary with extracted metadata from header and footer
     """
     parser = MetadataParser()
-    result = parser.parse(text, include_footer=include_footer)
+    result = parser.parse(text, include_footer=include_footer, context=context)
     return result.to_dict()
 
 
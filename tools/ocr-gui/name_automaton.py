@@ -0,0 +1,121 @@
+"""
+name_automaton.py — Aho-Corasick matching of known names
+
+Compiles any number of entity names into one automaton and finds every
+occurrence of every name in a single pass over the text, instead of one
+str.find / regex scan per name.
+
+Matching is case-insensitive (names and text are lowercased) and, by
+default, restricted to whole words: both ends of a match must pass the
+same test as regex `\\b`, so results equal `\\bname\\b` with IGNORECASE.
+
+Usage:
+    automaton = NameAutomaton()
+    automaton.add("Lee Harvey Oswald", {"id": "person-002"})
+    automaton.add("Dallas", {"id": "place-001"})
+    automaton.build()
+
+    for start, end, payload in automaton.find_all(text):
+        ...
+"""
+
+from typing import Any, Iterator, Optional
+
+
+def is_word_char(ch: str) -> bool:
+    """True for characters regex `\\w` matches."""
+    return ch.isalnum() or ch == "_"
+
+
+def at_word_boundary(text: str, pos: int) -> bool:
+    """Same test as regex `\\b` at position pos."""
+    before = pos > 0 and is_word_char(text[pos - 1])
+    after = pos < len(text) and is_word_char(text[pos])
+    return before != after
+
+
+class NameAutomaton:
+    """Aho-Corasick automaton mapping lowercase names to payloads."""
+
+    def __init__(self):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._own: list[list[int]] = [[]]  # Names ending exactly at each state
+        self._out: list[list[int]] = [[]]  # Plus those reachable by failure links
+        self._names: list[tuple[int, Any]] = []  # (name length, payload)
+        self._built = True
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, name: str, payload: Any):
+        """Add a name; the same name may be added with several payloads."""
+        name = name.lower()
+        if not name:
+            return
+        node = 0
+        for ch in name:
+            next_node = self._goto[node].get(ch)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][ch] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._own.append([])
+                self._out.append([])
+            node = next_node
+        self._own[node].append(len(self._names))
+        self._names.append((len(name), payload))
+        self._built = False
+
+    def build(self):
+        """Compute failure links (called automatically before matching)."""
+        queue = list(self._goto[0].values())
+        for node in queue:
+            self._fail[node] = 0
+            self._out[node] = self._own[node]
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                # Names ending at the fallback state also end here
+                self._out[child] = self._own[child] + self._out[self._fail[child]]
+        self._built = True
+
+    def iter_matches(self, text_lower: str) -> Iterator[tuple[int, int, Any]]:
+        """Yield (start, end, payload) for every occurrence, in order of end position."""
+        if not self._built:
+            self.build()
+        goto, fail, out, names = self._goto, self._fail, self._out, self._names
+        node = 0
+        for i, ch in enumerate(text_lower):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                for name_id in out[node]:
+                    length, payload = names[name_id]
+                    yield i + 1 - length, i + 1, payload
+
+    def find_all(self, text: str, whole_words: bool = True,
+                 text_lower: Optional[str] = None) -> Iterator[tuple[int, int, Any]]:
+        """
+        Yield (start, end, payload) for every name occurring in text.
+
+        Args:
+            text: Text to scan
+            whole_words: Only report matches on word boundaries
+            text_lower: text.lower(), if the caller already has it
+        """
+        if text_lower is None:
+            text_lower = text.lower()
+        for start, end, payload in self.iter_matches(text_lower):
+            if whole_words and not (at_word_boundary(text_lower, start) and at_word_boundary(text_lower, end)):
+                continue
+            yield start, end, payload
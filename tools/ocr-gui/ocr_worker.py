@@ -1,9 +1,11 @@
 """
 ocr_worker.py — Background OCR processing for the GUI tool.
 
-Supports two backends:
+Supports three backends:
 1. Python (pytesseract + pdf2image) — Windows native
 2. WSL (ocrmypdf) — Higher quality, requires WSL Ubuntu
+3. Native (ocrmypdf) — Same pipeline on Linux/macOS, no WSL; the "wsl"
+   backend falls back to it automatically outside Windows
 
 Supported image formats:
 - PDF, JPG, PNG, TIFF, WEBP (native PIL)
@@ -12,10 +14,17 @@ Supported image formats:
 
 import os
 import json
+import importlib.util
+import multiprocessing
+import queue
+import shutil
 import subprocess
+import sys
 import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, NamedTuple, Optional
 
 # Register HEIC/HEIF support for iPhone photos
 try:
@@ -25,6 +34,29 @@ try:
 except ImportError:
     HEIC_SUPPORTED = False
 
+# Python backend: OCR processes (None = CPU count) and pages queued per process
+OCR_WORKERS = None
+PAGES_IN_FLIGHT_PER_WORKER = 2
+
+# PDF rasterization: resolution (pdf2image's default) and the memory budget
+# for rasterized pages held at once across all OCR processes
+OCR_DPI = 200
+OCR_MAX_MEMORY_MB = 1024
+
+# ocrmypdf backends: --output-type values and text-layer modes
+IS_WINDOWS = os.name == "nt"
+OCRMYPDF_OUTPUT_TYPES = ("pdfa", "pdf", "pdfa-1", "pdfa-2", "pdfa-3")
+OCRMYPDF_MODES = {
+    "skip": "--skip-text",  # OCR only pages without a text layer
+    "redo": "--redo-ocr",  # Replace existing OCR, keep vector text
+    "force": "--force-ocr",  # Rasterize and OCR every page
+}
+
+# ocrmypdf backends: how often cancellation is checked while the process
+# is quiet, and how long it gets to exit after terminate() before kill()
+CANCEL_POLL_SECONDS = 0.25
+TERMINATE_TIMEOUT_SECONDS = 5
+
 # Poppler path for Windows (adjust if needed)
 POPPLER_PATH = r"C:\Users\willh\AppData\Local\Microsoft\WinGet\Packages\oschwartz10612.Poppler_Microsoft.Winget.Source_8wekyb3d8bbwe\poppler-25.07.0\Library\bin"
 
@@ -157,6 +189,183 @@ HTML_TEMPLATE = """<!DOCTYPE html>
 </html>"""
 
 
+# ============================================================================
+# PAGE OCR (runs in worker processes)
+# ============================================================================
+
+def _page_from_data(data: dict, page_num: int, width: int, height: int) -> dict:
+    """
+    Build page text and line boxes from one pytesseract.image_to_data result.
+
+    Text keeps Tesseract's layout: words joined by spaces, one line per
+    text line and a blank line between paragraphs/blocks.
+    """
+    page_data = {
+        "page": page_num,
+        "width": width,
+        "height": height,
+        "lines": []
+    }
+    text_lines = []
+    last_par_id = None
+    last_text_line_id = None
+
+    # Group words into lines for smoother sync
+    current_line = None
+    last_line_id = -1
+
+    for j in range(len(data['text'])):
+        # Level 5 is Word
+        if data['level'][j] == 5:
+            text_val = data['text'][j].strip()
+            if not text_val: continue
+
+            par_id = (data['block_num'][j], data['par_num'][j])
+            text_line_id = (data['block_num'][j], data['par_num'][j], data['line_num'][j])
+            if text_line_id != last_text_line_id:
+                if last_par_id is not None and par_id != last_par_id:
+                    text_lines.append("")
+                text_lines.append(text_val)
+                last_par_id = par_id
+                last_text_line_id = text_line_id
+            else:
+                text_lines[-1] += " " + text_val
+
+            line_id = f"{data['block_num'][j]}_{data['line_num'][j]}"
+            if line_id != last_line_id:
+                current_line = {
+                    "bbox": [data['left'][j], data['top'][j], data['left'][j]+data['width'][j], data['top'][j]+data['height'][j]],
+                    "text": text_val
+                }
+                page_data["lines"].append(current_line)
+                last_line_id = line_id
+            else:
+                current_line["text"] += " " + text_val
+                # Expand line bbox (right, bottom)
+                current_line["bbox"][2] = data['left'][j] + data['width'][j]
+                current_line["bbox"][3] = max(current_line["bbox"][3], data['top'][j] + data['height'][j])
+
+    return {"text": "\n".join(text_lines) + "\n", "page_data": page_data}
+
+
+class PdfPage(NamedTuple):
+    """A PDF page to rasterize inside the OCR process."""
+    path: str
+    page_num: int  # 1-based
+    dpi: int
+
+
+def ocrmypdf_command() -> Optional[list[str]]:
+    """Command prefix for a locally installed ocrmypdf, or None."""
+    exe = shutil.which("ocrmypdf")
+    if exe:
+        return [exe]
+    if importlib.util.find_spec("ocrmypdf") is not None:
+        return [sys.executable, "-m", "ocrmypdf"]
+    return None
+
+
+def _poppler_path() -> Optional[str]:
+    return POPPLER_PATH if os.path.isdir(POPPLER_PATH) else None
+
+
+def pdf_page_count(filepath: str) -> int:
+    """Page count without rasterizing (fitz, else poppler's pdfinfo)."""
+    try:
+        import fitz
+        with fitz.open(filepath) as doc:
+            return len(doc)
+    except ImportError:
+        from pdf2image import pdfinfo_from_path
+        return int(pdfinfo_from_path(filepath, poppler_path=_poppler_path())["Pages"])
+
+
+def estimate_page_bytes(filepath: str, dpi: int) -> int:
+    """RGB size of the first page rendered at dpi (US Letter if unknown)."""
+    width_pt, height_pt = 612, 792
+    try:
+        import fitz
+        with fitz.open(filepath) as doc:
+            if len(doc):
+                width_pt, height_pt = doc[0].rect.width, doc[0].rect.height
+    except Exception:
+        pass
+    return int(width_pt * dpi / 72) * int(height_pt * dpi / 72) * 3
+
+
+def rasterize_pdf_page(page: PdfPage):
+    """Render one PDF page to a PIL image (fitz pixmap, else pdf2image)."""
+    from PIL import Image
+
+    try:
+        import fitz
+    except ImportError:
+        from pdf2image import convert_from_path
+        return convert_from_path(
+            page.path, dpi=page.dpi, first_page=page.page_num, last_page=page.page_num,
+            poppler_path=_poppler_path(),
+        )[0]
+
+    with fitz.open(page.path) as doc:
+        pix = doc[page.page_num - 1].get_pixmap(dpi=page.dpi, alpha=False)
+        return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+
+
+def _ocr_page(source, page_num: int) -> dict:
+    """
+    Worker: a single Tesseract pass yielding both text and line boxes.
+
+    `source` is a PIL image or a PdfPage, which is rasterized here so the
+    parent never holds more than the in-flight pages.
+    """
+    import pytesseract
+
+    image = rasterize_pdf_page(source) if isinstance(source, PdfPage) else source
+    data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+    return _page_from_data(data, page_num, image.width, image.height)
+
+
+# ============================================================================
+# SHARED OCR PROCESS POOL
+# ============================================================================
+
+# Spawn pools shared by every OCRWorker, keyed by process count. The server
+# creates a worker per file; the pool (and each process's pytesseract
+# import) outlives them so start-up is paid once per process, not per file.
+_ocr_pools: dict[int, ProcessPoolExecutor] = {}
+_ocr_pools_lock = threading.Lock()
+
+
+def get_ocr_pool(processes: int) -> ProcessPoolExecutor:
+    """Return the shared pool of `processes` OCR processes, creating it on first use."""
+    with _ocr_pools_lock:
+        pool = _ocr_pools.get(processes)
+        if pool is None:
+            pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _ocr_pools[processes] = pool
+        return pool
+
+
+def _discard_ocr_pool(processes: int, pool: ProcessPoolExecutor):
+    """Drop a broken pool so the next file starts a fresh one."""
+    with _ocr_pools_lock:
+        if _ocr_pools.get(processes) is pool:
+            del _ocr_pools[processes]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_ocr_pools():
+    """Stop the shared OCR processes (a later OCR run starts new ones)."""
+    with _ocr_pools_lock:
+        pools = list(_ocr_pools.values())
+        _ocr_pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
 class OCRWorker:
     """Handles OCR processing in a background thread."""
 
@@ -172,6 +381,12 @@ class OCRWorker:
         deskew: bool = True,
         clean: bool = True,
         force_ocr: bool = False,
+        ocr_workers: Optional[int] = OCR_WORKERS,
+        dpi: int = OCR_DPI,
+        max_memory_mb: int = OCR_MAX_MEMORY_MB,
+        ocr_mode: Optional[str] = None,
+        output_type: str = "pdfa",
+        optimize: int = 1,
         on_progress: Optional[Callable] = None,
         on_complete: Optional[Callable] = None,
         on_log: Optional[Callable[[str], None]] = None,
@@ -187,6 +402,13 @@ class OCRWorker:
         self.deskew = deskew
         self.clean = clean
         self.force_ocr = force_ocr
+        self.ocr_workers = max(1, ocr_workers or os.cpu_count() or 1)
+        self.dpi = dpi
+        self.max_memory_mb = max_memory_mb
+        # ocrmypdf: skip/redo/force (force_ocr=True implies "force")
+        self.ocr_mode = ocr_mode if ocr_mode in OCRMYPDF_MODES else ("force" if force_ocr else None)
+        self.output_type = output_type if output_type in OCRMYPDF_OUTPUT_TYPES else "pdfa"
+        self.optimize = min(max(int(optimize), 0), 3)
         
         # Callbacks
         self.on_progress = on_progress
@@ -257,10 +479,7 @@ class OCRWorker:
             self.log(f"Starting: {filename}")
 
             try:
-                if self.backend == "wsl":
-                    success, msg = self._process_wsl(filepath)
-                else:
-                    success, msg = self._process_python(filepath)
+                success, msg = self._process(filepath)
 
                 if self.on_complete:
                     # GUI expects (filename, success, message)
@@ -281,10 +500,7 @@ class OCRWorker:
         if on_complete: self.on_complete = on_complete
         
         try:
-            if self.backend == "wsl":
-                success, msg = self._process_wsl(filepath)
-            else:
-                success, msg = self._process_python(filepath)
+            success, msg = self._process(filepath)
             
             if self.on_complete:
                 # Server expects (success, message)
@@ -297,11 +513,62 @@ class OCRWorker:
     # BACKENDS
     # ========================================================================
 
+    def _process(self, filepath: str) -> tuple[bool, str]:
+        """Dispatch to the configured backend."""
+        if self.backend == "python":
+            return self._process_python(filepath)
+        if self.backend == "native" or (self.backend == "wsl" and not IS_WINDOWS):
+            return self._process_native(filepath)
+        return self._process_wsl(filepath)
+
+    def _ocr_pages(self, pages: list, max_in_flight: Optional[int] = None):
+        """
+        OCR pages in the shared process pool, yielding (page_num, result) in
+        page order.
+
+        `pages` holds PIL images or PdfPage descriptors. At most
+        max_in_flight pages (default: PAGES_IN_FLIGHT_PER_WORKER per
+        process) are queued at a time, so PDF pages are rasterized just
+        ahead of the page being consumed. On cancellation the queued pages
+        are dropped and (page_num, None) is yielded.
+        """
+        window = self.ocr_workers * PAGES_IN_FLIGHT_PER_WORKER
+        if max_in_flight is not None:
+            window = max(1, min(window, max_in_flight))
+        processes = min(self.ocr_workers, window, len(pages))
+
+        if processes <= 1:
+            for i, source in enumerate(pages):
+                if self._cancel_flag.is_set():
+                    yield i + 1, None
+                    return
+                yield i + 1, _ocr_page(source, i + 1)
+            return
+
+        pool = get_ocr_pool(self.ocr_workers)
+        pending = {}
+        try:
+            next_submit = 0
+            for i in range(len(pages)):
+                while next_submit < len(pages) and next_submit < i + window:
+                    pending[next_submit] = pool.submit(_ocr_page, pages[next_submit], next_submit + 1)
+                    next_submit += 1
+                if self._cancel_flag.is_set():
+                    yield i + 1, None
+                    return
+                yield i + 1, pending.pop(i).result()
+        except BrokenProcessPool:
+            _discard_ocr_pool(self.ocr_workers, pool)
+            raise
+        finally:
+            # The pool is shared: drop only this file's queued pages
+            for future in pending.values():
+                future.cancel()
+
     def _process_python(self, filepath: str) -> tuple[bool, str]:
         """Process using pytesseract (Windows native)."""
         try:
             import pytesseract
-            from pdf2image import convert_from_path
             from PIL import Image
         except ImportError as e:
             return False, f"Missing dependency: {e}"
@@ -310,12 +577,18 @@ class OCRWorker:
         base_name = os.path.splitext(filename)[0]
 
         ext = os.path.splitext(filepath)[1].lower()
+        max_in_flight = None
         if ext == ".pdf":
-            self.log(f"Converting PDF to images: {filename}")
+            # Pages are rasterized one at a time inside the OCR processes
             try:
-                images = convert_from_path(filepath, poppler_path=POPPLER_PATH)
+                page_count = pdf_page_count(filepath)
             except Exception as e:
                 return False, f"PDF conversion failed: {e}"
+            images = [PdfPage(filepath, n, self.dpi) for n in range(1, page_count + 1)]
+            # Stay under the memory ceiling (rendered page + Tesseract working copy)
+            page_bytes = estimate_page_bytes(filepath, self.dpi) * 2
+            max_in_flight = max(1, (self.max_memory_mb * 1024 * 1024) // page_bytes)
+            self.log(f"Rasterizing {page_count} pages at {self.dpi} DPI: {filename}")
         elif ext in (".heic", ".heif"):
             # iPhone photo format
             if not HEIC_SUPPORTED:
@@ -339,11 +612,13 @@ class OCRWorker:
             "pages": []
         }
 
-        for i, image in enumerate(images):
-            if self._cancel_flag.is_set():
+        total_pages = len(images)
+        text_parts = []
+
+        for page_num, page in self._ocr_pages(images, max_in_flight):
+            if page is None:
                 return False, "Cancelled"
 
-            page_num = i + 1
             self.log(f"  Page {page_num}/{total_pages}")
 
             if self.on_progress:
@@ -355,44 +630,13 @@ class OCRWorker:
                     self.on_progress(pct, f"Processing page {page_num}/{total_pages}...")
 
             # 1. Standard text output
-            text = pytesseract.image_to_string(image)
-            full_text += f"\n\n--- PAGE {page_num} ---\n\n{text}"
+            text_parts.append(f"\n\n--- PAGE {page_num} ---\n\n{page['text']}")
 
             # 2. Coordinate data for Workbench
             if self.output_json:
-                data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
-                page_data = {
-                    "page": page_num,
-                    "width": image.width,
-                    "height": image.height,
-                    "lines": []
-                }
-                
-                # Group words into lines for smoother sync
-                current_line = None
-                last_line_id = -1
-                
-                for j in range(len(data['text'])):
-                    # Level 5 is Word
-                    if data['level'][j] == 5:
-                        text_val = data['text'][j].strip()
-                        if not text_val: continue
-                        
-                        line_id = f"{data['block_num'][j]}_{data['line_num'][j]}"
-                        if line_id != last_line_id:
-                            current_line = {
-                                "bbox": [data['left'][j], data['top'][j], data['left'][j]+data['width'][j], data['top'][j]+data['height'][j]],
-                                "text": text_val
-                            }
-                            page_data["lines"].append(current_line)
-                            last_line_id = line_id
-                        else:
-                            current_line["text"] += " " + text_val
-                            # Expand line bbox (right, bottom)
-                            current_line["bbox"][2] = data['left'][j] + data['width'][j]
-                            current_line["bbox"][3] = max(current_line["bbox"][3], data['top'][j] + data['height'][j])
+                ocr_json_data["pages"].append(page["page_data"])
 
-                ocr_json_data["pages"].append(page_data)
+        full_text = "".join(text_parts)
 
         if self.output_txt:
             txt_path = os.path.join(self.output_dir, f"{base_name}.txt")
@@ -458,24 +702,57 @@ class OCRWorker:
 
     def _process_wsl(self, filepath: str) -> tuple[bool, str]:
         """Process using ocrmypdf via WSL."""
+        return self._run_ocrmypdf(filepath, ["wsl", "ocrmypdf"], self._to_wsl_path, "WSL")
+
+    def _process_native(self, filepath: str) -> tuple[bool, str]:
+        """Process using a locally installed ocrmypdf (Linux/macOS)."""
+        command = ocrmypdf_command()
+        if command is None:
+            return False, "ocrmypdf not installed. Run: pip install ocrmypdf (or apt install ocrmypdf)"
+        return self._run_ocrmypdf(filepath, command, os.path.abspath, "OCRmyPDF")
+
+    def _ocrmypdf_options(self) -> list[str]:
+        """ocrmypdf flags shared by the WSL and native backends."""
+        options = []
+        if self.deskew:
+            if self.ocr_mode == "redo":
+                self.log("  Note: --deskew is not compatible with --redo-ocr, skipping deskew.")
+            else:
+                options.append("--deskew")
+        if self.clean: options.append("--clean")
+        if self.ocr_mode: options.append(OCRMYPDF_MODES[self.ocr_mode])
+        options.extend(["--jobs", str(self.ocr_workers)])
+        options.extend(["--optimize", str(self.optimize)])
+        options.extend(["--output-type", self.output_type if self.output_pdf else "none"])
+        return options
+
+    def _run_ocrmypdf(self, filepath: str, command: list[str], to_path: Callable[[str], str], label: str) -> tuple[bool, str]:
+        """
+        Run ocrmypdf and report progress parsed from its stderr.
+
+        Args:
+            filepath: Input PDF/image
+            command: Command prefix (e.g. ["wsl", "ocrmypdf"])
+            to_path: Maps local paths to paths the command can open
+            label: Name used in progress messages
+        """
         filename = os.path.basename(filepath)
         base_name = os.path.splitext(filename)[0]
 
-        wsl_input = self._to_wsl_path(filepath)
-        wsl_output_dir = self._to_wsl_path(self.output_dir)
+        run_input = to_path(filepath)
+        run_output_dir = to_path(self.output_dir)
 
-        pdf_output = f"{wsl_output_dir}/{base_name}_searchable.pdf"
-        txt_output = f"{wsl_output_dir}/{base_name}.txt" if self.output_txt else None
+        # --output-type none writes no PDF; ocrmypdf then expects "-" as output
+        pdf_output = f"{run_output_dir}/{base_name}_searchable.pdf" if self.output_pdf else "-"
+        txt_output = f"{run_output_dir}/{base_name}.txt" if self.output_txt else None
 
-        cmd = ["wsl", "ocrmypdf"]
-        if self.deskew: cmd.append("--deskew")
-        if self.clean: cmd.append("--clean")
-        if self.force_ocr: cmd.append("--force-ocr")
+        cmd = list(command)
+        cmd.extend(self._ocrmypdf_options())
         if txt_output: cmd.extend(["--sidecar", txt_output])
         
         # Use --verbose 1 to get page-level logging
         cmd.extend(["--verbose", "1"])
-        cmd.extend([wsl_input, pdf_output])
+        cmd.extend([run_input, pdf_output])
 
         self.log(f"  Running OCRmyPDF...")
 
@@ -505,7 +782,7 @@ class OCRWorker:
                     # Server expects (pct, msg)
                     self.on_progress(clamped_pct, msg)
 
-        update_progress(10, f"Initializing WSL for {total_pages} pages...")
+        update_progress(10, f"Initializing {label} for {total_pages} pages...")
 
         try:
             import subprocess
@@ -519,11 +796,29 @@ class OCRWorker:
                 universal_newlines=True
             )
 
+            # stderr is read on its own thread so a quiet process (one long
+            # page, postprocessing) cannot block the cancellation check
+            lines = queue.Queue()
+
+            def read_stderr():
+                for stderr_line in process.stderr:
+                    lines.put(stderr_line)
+                lines.put(None)
+
+            threading.Thread(target=read_stderr, name="ocrmypdf-stderr", daemon=True).start()
+
             full_stderr = []
             
             while True:
-                line = process.stderr.readline()
-                if not line and process.poll() is not None:
+                if self._cancel_flag.is_set():
+                    self._terminate(process)
+                    return False, "Cancelled"
+
+                try:
+                    line = lines.get(timeout=CANCEL_POLL_SECONDS)
+                except queue.Empty:
+                    continue
+                if line is None:
                     break
                 
                 if line:
@@ -572,7 +867,7 @@ class OCRWorker:
             stderr_text = "\n".join(full_stderr)
 
             if process.returncode == 0:
-                self.log(f"  Saved: {base_name}_searchable.pdf")
+                if self.output_pdf: self.log(f"  Saved: {base_name}_searchable.pdf")
                 if self.output_txt: self.log(f"  Saved: {base_name}.txt")
                 
                 # Convert to MD if requested
@@ -650,6 +945,16 @@ class OCRWorker:
             self.log(f"  Error: {str(e)}")
             return False, str(e)
 
+    @staticmethod
+    def _terminate(process: subprocess.Popen):
+        """Stop a backend process, killing it if it ignores terminate()."""
+        process.terminate()
+        try:
+            process.wait(timeout=TERMINATE_TIMEOUT_SECONDS)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
     def _to_wsl_path(self, windows_path: str) -> str:
         """Convert Windows path to WSL path."""
         path = os.path.abspath(windows_path)
@@ -0,0 +1,310 @@
+"""
+parallel_classifier.py — Multi-process page classification for PDFs
+
+Splits a PDF into page-range chunks and scores them in a process pool.
+Each worker opens the PDF itself (fitz documents cannot be pickled),
+extracts the text of its pages and runs the continuity-independent stages
+of the classifier (score_page). The parent collects the chunks in page
+order and applies the continuity pass (resolve_page) sequentially, which
+is cheap compared with regex scoring.
+
+Pages that are already text (OCR output) go through iter_texts(), and
+other per-document work can share the same workers through submit().
+
+Usage:
+    with ParallelClassifier() as pc:
+        for page in pc.iter_pdf("report.pdf"):
+            print(page.page, page.classification.doc_type.value)
+
+        results = pc.classify_pdfs(paths, pages_for=lambda n: range(0, n, 10),
+                                   continuity=False, extract=True)
+
+        scores = [page.scores for page in pc.iter_texts(texts, continuity=False)]
+
+Workers are started with the "spawn" method so the pool is safe to use
+from threaded servers and behaves the same on Windows and Linux. Callers
+running as a script must keep their entry point under
+`if __name__ == "__main__":`.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Optional
+
+try:
+    import fitz  # PyMuPDF
+    FITZ_AVAILABLE = True
+except ImportError:
+    FITZ_AVAILABLE = False
+
+from classification_cache import hash_text
+from document_classifier import ClassificationResult, PageScores, resolve_page, score_page
+from zone_extractor import ZoneExtractionResult, extract_by_type
+
+# Pages per task; large enough to amortize opening the PDF in the worker
+CHUNK_SIZE = 32
+
+
+@dataclass
+class ClassifiedPage:
+    """One PDF page with its raw scores and resolved classification."""
+    page_index: int  # 0-based
+    text: str  # Full text, or the first text_chars characters
+    text_hash: str  # hash_text() of the full page text
+    char_count: int  # Length of the full page text
+    scores: PageScores
+    classification: ClassificationResult  # After continuity (if enabled)
+    extraction: Optional[ZoneExtractionResult] = None
+
+    @property
+    def page(self) -> int:
+        """1-based page number."""
+        return self.page_index + 1
+
+    @property
+    def all_scores(self) -> dict[str, float]:
+        """get_all_scores() vector, computed in the same score_page() call."""
+        return self.scores.all_scores
+
+
+def _classify_text(
+    page_index: int,
+    text: str,
+    header_lines: int,
+    text_chars: Optional[int],
+    extract: bool,
+) -> ClassifiedPage:
+    scored = score_page(text, header_lines, all_scores=True)
+    return ClassifiedPage(
+        page_index=page_index,
+        text=text if text_chars is None else text[:text_chars],
+        text_hash=hash_text(text),
+        char_count=len(text),
+        scores=scored,
+        classification=scored.result,
+        # Same as extract_document(text): no continuity on a lone page
+        extraction=extract_by_type(text, scored.result) if extract else None,
+    )
+
+
+def _score_chunk(
+    path: str,
+    page_indexes: list[int],
+    header_lines: int,
+    text_chars: Optional[int],
+    extract: bool,
+) -> list[ClassifiedPage]:
+    """Worker: extract and score a run of pages from one PDF."""
+    doc = fitz.open(path)
+    try:
+        return [
+            _classify_text(i, doc[i].get_text(), header_lines, text_chars, extract)
+            for i in page_indexes
+        ]
+    finally:
+        doc.close()
+
+
+def _score_text_chunk(
+    first_index: int,
+    texts: list[str],
+    header_lines: int,
+    text_chars: Optional[int],
+    extract: bool,
+) -> list[ClassifiedPage]:
+    """Worker: score a run of consecutive page texts."""
+    return [
+        _classify_text(first_index + i, text, header_lines, text_chars, extract)
+        for i, text in enumerate(texts)
+    ]
+
+
+def page_count(path: str) -> int:
+    """Number of pages in a PDF."""
+    with fitz.open(path) as doc:
+        return len(doc)
+
+
+class ParallelClassifier:
+    """
+    Process pool that classifies PDF pages (or page texts) in parallel.
+
+    The pool is created on first use and reused until shutdown(), so a
+    long-running server pays the worker start-up cost once.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = CHUNK_SIZE):
+        if not FITZ_AVAILABLE:
+            raise ImportError("PyMuPDF (fitz) is required for parallel classification")
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.chunk_size = max(1, chunk_size)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def shutdown(self):
+        """Stop the worker processes (a later call starts a new pool)."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Run a picklable module-level function in the shared pool."""
+        return self._pool().submit(fn, *args, **kwargs)
+
+    # =========================================================================
+    # Scheduling
+    # =========================================================================
+
+    def _submit(self, path: str, indexes: list[int], header_lines: int,
+                text_chars: Optional[int], extract: bool) -> list:
+        """Queue one PDF's pages as chunk futures, in page order."""
+        chunks = [indexes[i:i + self.chunk_size] for i in range(0, len(indexes), self.chunk_size)]
+        pool = self._pool()
+        return [
+            pool.submit(_score_chunk, path, chunk, header_lines, text_chars, extract)
+            for chunk in chunks
+        ]
+
+    @staticmethod
+    def _collect(futures: list, continuity: bool, prev_type: Optional[str],
+                 on_progress: Optional[Callable[[int, int], None]], total: int) -> Iterator[ClassifiedPage]:
+        """Yield pages in order, applying continuity as each chunk arrives."""
+        done = 0
+        state = prev_type
+        try:
+            for future in futures:
+                for page in future.result():
+                    if continuity:
+                        page.classification = resolve_page(page.scores, state)
+                        state = page.classification.doc_type.value
+                    done += 1
+                    if on_progress:
+                        on_progress(done, total)
+                    yield page
+        finally:
+            # Abandoned iteration: drop chunks that have not started yet
+            for future in futures:
+                future.cancel()
+
+    def iter_pdf(
+        self,
+        path: str,
+        pages: Optional[Iterable[int]] = None,
+        continuity: bool = True,
+        prev_type: Optional[str] = None,
+        header_lines: int = 25,
+        text_chars: Optional[int] = None,
+        extract: bool = False,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Iterator[ClassifiedPage]:
+        """
+        Classify pages of one PDF, yielding them in page order.
+
+        All chunks are queued immediately; pages are yielded as soon as the
+        chunk containing them (and every earlier chunk) has finished.
+
+        Args:
+            path: PDF file path
+            pages: 0-based page indexes (default: every page)
+            continuity: Apply multi-page continuity; assumes `pages` are
+                consecutive
+            prev_type: Doc type of the page before the first one
+            header_lines: Header size passed to the classifier
+            text_chars: Truncate returned text (None keeps the full text)
+            extract: Also run zone extraction on each page
+            on_progress: Called with (pages_done, pages_total)
+
+        Returns:
+            Iterator of ClassifiedPage
+        """
+        indexes = list(range(page_count(path))) if pages is None else list(pages)
+        futures = self._submit(path, indexes, header_lines, text_chars, extract)
+        return self._collect(futures, continuity, prev_type, on_progress, len(indexes))
+
+    def iter_texts(
+        self,
+        texts: list[str],
+        continuity: bool = True,
+        prev_type: Optional[str] = None,
+        header_lines: int = 25,
+        text_chars: Optional[int] = None,
+        extract: bool = False,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Iterator[ClassifiedPage]:
+        """
+        Classify page texts (e.g. OCR output), yielding them in order.
+
+        Same as iter_pdf, with page_index the position in texts. Use
+        text_chars=0 when only the scores are needed, so the texts are not
+        sent back from the workers.
+        """
+        pool = self._pool()
+        futures = [
+            pool.submit(_score_text_chunk, i, texts[i:i + self.chunk_size], header_lines, text_chars, extract)
+            for i in range(0, len(texts), self.chunk_size)
+        ]
+        return self._collect(futures, continuity, prev_type, on_progress, len(texts))
+
+    def classify_pdf(self, path: str, **kwargs) -> list[ClassifiedPage]:
+        """Classify pages of one PDF (see iter_pdf for arguments)."""
+        return list(self.iter_pdf(path, **kwargs))
+
+    def classify_pdfs(
+        self,
+        paths: Iterable[str],
+        pages_for: Optional[Callable[[int], Iterable[int]]] = None,
+        continuity: bool = True,
+        header_lines: int = 25,
+        text_chars: Optional[int] = None,
+        extract: bool = False,
+        on_progress: Optional[Callable[[str, int, int], None]] = None,
+    ) -> dict[str, list[ClassifiedPage]]:
+        """
+        Classify many PDFs at once.
+
+        Chunks of every file are queued before any result is collected, so
+        small files do not leave workers idle.
+
+        Args:
+            paths: PDF file paths
+            pages_for: Maps a file's page count to the 0-based indexes to
+                classify (default: every page)
+            continuity: Apply continuity within each file
+            header_lines: Header size passed to the classifier
+            text_chars: Truncate returned text (None keeps the full text)
+            extract: Also run zone extraction on each page
+            on_progress: Called with (path, pages_done, pages_total) per file
+
+        Returns:
+            Dict of path -> list of ClassifiedPage in page order
+        """
+        queued = []
+        for path in paths:
+            total = page_count(path)
+            indexes = list(range(total)) if pages_for is None else list(pages_for(total))
+            queued.append((path, len(indexes), self._submit(path, indexes, header_lines, text_chars, extract)))
+
+        results = {}
+        for path, total, futures in queued:
+            progress = (lambda done, n, p=path: on_progress(p, done, n)) if on_progress else None
+            results[path] = list(self._collect(futures, continuity, None, progress, total))
+        return results
@@ -0,0 +1,129 @@
+"""
+span_resolver.py — Non-overlapping span selection for entity matches
+
+Shared by EntityMatcher and EntityLinker to turn a pile of (possibly
+overlapping) text matches into a clean set of spans.
+
+select_spans greedily accepts items in priority order (e.g. longest first,
+then highest confidence). All spans are known up front, so it compresses
+their endpoints and tracks covered cells in a Fenwick tree: each overlap
+test is O(log n), and since accepted spans are disjoint every cell is
+marked at most once, which keeps the whole selection O(n log n).
+
+SpanSet is the incremental counterpart for callers that do not know their
+spans in advance: disjoint, sorted intervals with a binary-search overlap
+test. Insertion shifts the lists (O(n) per add in the worst case, a fast
+memmove in practice).
+
+Usage:
+    chosen = select_spans(
+        matches,
+        span=lambda m: (m.start_pos, m.end_pos),
+        priority=lambda m: (-(m.end_pos - m.start_pos), -m.confidence),
+    )
+"""
+
+from bisect import bisect_right
+from typing import Any, Callable, Iterable, Optional
+
+
+class SpanSet:
+    """Disjoint half-open [start, end) intervals with binary-search overlap tests."""
+
+    def __init__(self, spans: Iterable[tuple[int, int]] = ()):
+        self._starts: list[int] = []
+        self._ends: list[int] = []
+        for start, end in sorted(spans):
+            if not self.overlaps(start, end):
+                self._starts.append(start)
+                self._ends.append(end)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def overlaps(self, start: int, end: int) -> bool:
+        """True if [start, end) shares a character with any span in the set."""
+        i = bisect_right(self._starts, start)
+        # Closest span starting at or before start, and the next one after it
+        if i > 0 and self._ends[i - 1] > start:
+            return True
+        return i < len(self._starts) and self._starts[i] < end
+
+    def add(self, start: int, end: int) -> bool:
+        """Add a span unless it overlaps; returns whether it was added."""
+        if self.overlaps(start, end):
+            return False
+        i = bisect_right(self._starts, start)
+        self._starts.insert(i, start)
+        self._ends.insert(i, end)
+        return True
+
+
+def select_spans(
+    items: Iterable[Any],
+    span: Callable[[Any], tuple[int, int]],
+    priority: Callable[[Any], Any],
+    accept: Optional[Callable[[Any], bool]] = None,
+) -> list:
+    """
+    Pick non-overlapping items, best first.
+
+    Args:
+        items: Matches of any type
+        span: Maps an item to its (start, end) character range
+        priority: Sort key; lower sorts first and wins overlaps. Ties keep
+            the input order.
+        accept: Optional extra filter, called only for items that do not
+            overlap an accepted one; return False to skip the item (e.g.
+            one link per entity id)
+
+    Returns:
+        Accepted items in priority order
+    """
+    ordered = sorted(items, key=priority)
+    spans = [span(item) for item in ordered]
+    cells = {pos: i for i, pos in enumerate(sorted({pos for pair in spans for pos in pair}))}
+    taken = _CoveredCells(len(cells))
+    chosen = []
+    for item, (start, end) in zip(ordered, spans):
+        lo, hi = cells[start], cells[end]
+        # An empty span is tested as the single position it sits at
+        if taken.any(lo, max(hi, lo + 1)):
+            continue
+        if accept is not None and not accept(item):
+            continue
+        taken.cover(lo, hi)
+        chosen.append(item)
+    return chosen
+
+
+class _CoveredCells:
+    """
+    Fenwick tree over compressed cells [pos_i, pos_i+1). Cells are only
+    covered once (accepted spans are disjoint), so covering is O(log n)
+    per cell over the whole selection.
+    """
+
+    def __init__(self, size: int):
+        self._tree = [0] * (size + 1)
+
+    def _prefix(self, i: int) -> int:
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def any(self, lo: int, hi: int) -> bool:
+        """True if any cell in [lo, hi) is covered."""
+        return self._prefix(hi) > self._prefix(lo)
+
+    def cover(self, lo: int, hi: int):
+        """Mark cells [lo, hi) covered (none of them may be covered yet)."""
+        tree = self._tree
+        size = len(tree)
+        for cell in range(lo + 1, hi + 1):
+            i = cell
+            while i < size:
+                tree[i] += 1
+                i += i & -i
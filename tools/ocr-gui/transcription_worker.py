@@ -11,22 +11,24 @@ Outputs:
 - {base}.txt — plain transcript (consumed by metadata parser + classifier)
 - {base}.vtt — WebVTT for playback sync
 - {base}.transcript.json — structured segments with timestamps
+
+Whisper models are loaded through a process-wide registry (get_model_registry)
+so every worker and job reuses the same warm model.
 """
 
+import importlib.util
 import os
 import json
 import subprocess
 import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Callable, Optional
 
-# Check for whisper availability
-try:
-    import whisper
-    WHISPER_AVAILABLE = True
-except ImportError:
-    WHISPER_AVAILABLE = False
+# Check for whisper availability; it is imported on first model load, since
+# importing it pulls in torch
+WHISPER_AVAILABLE = importlib.util.find_spec("whisper") is not None
 
 AUDIO_EXTENSIONS = {".mp3", ".wav", ".m4a", ".flac", ".ogg", ".wma"}
 VIDEO_EXTENSIONS = {".mp4", ".webm", ".mov", ".mkv", ".avi"}
@@ -34,6 +36,206 @@ MEDIA_EXTENSIONS = AUDIO_EXTENSIONS | VIDEO_EXTENSIONS
 
 WHISPER_MODELS = ["tiny", "base", "small", "medium", "large"]
 
+# Approximate fp32 weight size per model (MB), used until a model is loaded
+WHISPER_MODEL_MB = {"tiny": 150, "base": 290, "small": 970, "medium": 3000, "large": 6000}
+
+# Memory budget for warm models (LRU eviction of idle models beyond it)
+WHISPER_MODEL_BUDGET_MB = int(os.environ.get("WHISPER_MODEL_BUDGET_MB", "4096"))
+
+
+# ============================================================================
+# MODEL REGISTRY
+# ============================================================================
+
+class _LoadedModel:
+    """A warm Whisper model and its usage bookkeeping."""
+
+    def __init__(self, model, size_mb: float, load_seconds: float):
+        self.model = model
+        self.size_mb = size_mb
+        self.load_seconds = load_seconds
+        self.in_use = 0
+        self.uses = 0
+        self.last_used = time.time()
+        # Whisper installs decoder hooks per call: one transcription at a time
+        self.lock = threading.Lock()
+
+
+class WhisperModelRegistry:
+    """
+    Process-wide cache of loaded Whisper models keyed by (size, device).
+
+    Each model is loaded once and kept warm across files and jobs. When the
+    loaded models exceed budget_mb, idle ones are evicted least recently
+    used first; a model in use is never evicted.
+
+    Usage:
+        model = registry.acquire("base")
+        try:
+            model.transcribe(path)
+        finally:
+            registry.release("base")
+    """
+
+    def __init__(self, budget_mb: int = WHISPER_MODEL_BUDGET_MB):
+        self.budget_mb = budget_mb
+        self._models: OrderedDict[tuple, _LoadedModel] = OrderedDict()  # LRU first
+        self._loading: dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+
+    @staticmethod
+    def resolve_device(device: Optional[str] = None) -> str:
+        """Device whisper.load_model would pick when none is given."""
+        if device:
+            return device
+        try:
+            import torch
+            return "cuda" if torch.cuda.is_available() else "cpu"
+        except ImportError:
+            return "cpu"
+
+    def acquire(self, model_size: str, device: Optional[str] = None):
+        """
+        Return a warm model, loading it on first use.
+
+        Blocks while another thread is transcribing with the same model.
+        Every acquire() must be paired with release().
+        """
+        key = (model_size, self.resolve_device(device))
+        entry = self._get_or_load(key)
+        entry.lock.acquire()
+        return entry.model
+
+    def release(self, model_size: str, device: Optional[str] = None):
+        """Return a model obtained with acquire()."""
+        key = (model_size, self.resolve_device(device))
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is None:
+                return
+            entry.in_use -= 1
+            entry.last_used = time.time()
+            entry.lock.release()
+            self._evict()
+
+    def _get_or_load(self, key: tuple) -> _LoadedModel:
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._claim(key, entry)
+                return entry
+            loading = self._loading.setdefault(key, threading.Lock())
+
+        # One loader per key; other threads wait and then hit the cache
+        with loading:
+            with self._lock:
+                entry = self._models.get(key)
+                if entry is not None:
+                    self.hits += 1
+                    self._claim(key, entry)
+                    return entry
+                self.misses += 1
+
+            import whisper
+
+            model_size, device = key
+            start = time.time()
+            model = whisper.load_model(model_size, device=device)
+            elapsed = time.time() - start
+            entry = _LoadedModel(model, _model_size_mb(model, model_size), elapsed)
+
+            with self._lock:
+                self.load_seconds += elapsed
+                self._models[key] = entry
+                self._claim(key, entry)
+                self._loading.pop(key, None)
+                self._evict()
+            return entry
+
+    def _claim(self, key: tuple, entry: _LoadedModel):
+        """Mark a model in use and most recently used. Caller holds the lock."""
+        entry.in_use += 1
+        entry.uses += 1
+        entry.last_used = time.time()
+        self._models.move_to_end(key)
+
+    def _evict(self):
+        """Drop idle LRU models while over budget. Caller holds the lock."""
+        total = sum(e.size_mb for e in self._models.values())
+        for key in list(self._models):
+            if total <= self.budget_mb:
+                break
+            entry = self._models[key]
+            if entry.in_use:
+                continue
+            del self._models[key]
+            total -= entry.size_mb
+            self.evictions += 1
+            _free_model(entry.model, key[1])
+
+    def clear(self):
+        """Unload every idle model."""
+        with self._lock:
+            for key in [k for k, e in self._models.items() if not e.in_use]:
+                entry = self._models.pop(key)
+                _free_model(entry.model, key[1])
+
+    def stats(self) -> dict:
+        """Loaded models plus hit/miss/load-time counters."""
+        with self._lock:
+            models = [
+                {
+                    "model": size,
+                    "device": device,
+                    "size_mb": round(e.size_mb, 1),
+                    "load_seconds": round(e.load_seconds, 2),
+                    "in_use": e.in_use,
+                    "uses": e.uses,
+                    "last_used": e.last_used,
+                }
+                for (size, device), e in self._models.items()
+            ]
+            return {
+                "budget_mb": self.budget_mb,
+                "loaded_mb": round(sum(e.size_mb for e in self._models.values()), 1),
+                "models": models,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "load_seconds": round(self.load_seconds, 2),
+            }
+
+
+def _model_size_mb(model, model_size: str) -> float:
+    """Parameter memory of a loaded model (falls back to the size table)."""
+    try:
+        return sum(p.numel() * p.element_size() for p in model.parameters()) / (1024 * 1024)
+    except Exception:
+        return WHISPER_MODEL_MB.get(model_size, 1000)
+
+
+def _free_model(model, device: str):
+    del model
+    if device.startswith("cuda"):
+        try:
+            import torch
+            torch.cuda.empty_cache()
+        except ImportError:
+            pass
+
+
+_REGISTRY = WhisperModelRegistry()
+
+
+def get_model_registry() -> WhisperModelRegistry:
+    """Return the process-wide Whisper model registry."""
+    return _REGISTRY
+
 
 class TranscriptionWorker:
     """Handles audio/video transcription in a background thread using Whisper."""
@@ -42,6 +244,7 @@ class TranscriptionWorker:
         self,
         model_size: str = "base",
         language: Optional[str] = None,
+        device: Optional[str] = None,
         output_dir: str = ".",
         output_txt: bool = True,
         output_vtt: bool = True,
@@ -52,6 +255,7 @@ class TranscriptionWorker:
     ):
         self.model_size = model_size if model_size in WHISPER_MODELS else "base"
         self.language = language
+        self.device = device
         self.output_dir = output_dir
         self.output_txt = output_txt
         self.output_vtt = output_vtt
@@ -63,7 +267,7 @@ class TranscriptionWorker:
 
         self._cancel_flag = threading.Event()
         self._thread: Optional[threading.Thread] = None
-        self._model = None
+        self._models = get_model_registry()
 
     def log(self, message: str):
         if self.on_log:
@@ -129,29 +333,31 @@ class TranscriptionWorker:
             self._cleanup_temp(temp_wav)
             return False, "Cancelled"
 
-        # Step 2: Load Whisper model
+        # Step 2: Load Whisper model (shared registry, stays warm across files)
         self._update_progress(15, f"Loading Whisper model: {self.model_size}")
         try:
-            if self._model is None:
-                self._model = whisper.load_model(self.model_size)
+            model = self._models.acquire(self.model_size, self.device)
         except Exception as e:
             self._cleanup_temp(temp_wav)
             return False, f"Failed to load Whisper model: {e}"
 
-        if self._cancel_flag.is_set():
-            self._cleanup_temp(temp_wav)
-            return False, "Cancelled"
-
-        # Step 3: Transcribe
-        self._update_progress(25, f"Transcribing: {filename} (this may take a while)")
         try:
-            options = {}
-            if self.language:
-                options["language"] = self.language
-            result = self._model.transcribe(audio_path, **options)
-        except Exception as e:
-            self._cleanup_temp(temp_wav)
-            return False, f"Transcription failed: {e}"
+            if self._cancel_flag.is_set():
+                self._cleanup_temp(temp_wav)
+                return False, "Cancelled"
+
+            # Step 3: Transcribe
+            self._update_progress(25, f"Transcribing: {filename} (this may take a while)")
+            try:
+                options = {}
+                if self.language:
+                    options["language"] = self.language
+                result = model.transcribe(audio_path, **options)
+            except Exception as e:
+                self._cleanup_temp(temp_wav)
+                return False, f"Transcription failed: {e}"
+        finally:
+            self._models.release(self.model_size, self.device)
 
         if self._cancel_flag.is_set():
             self._cleanup_temp(temp_wav)
@@ -13,7 +13,8 @@ See: docs/ui/ocr/plans/document-layout-analyzer.md
 import re
 from dataclasses import dataclass, field
 from typing import Optional, List
-from document_classifier import DocType, classify_document, ClassificationResult
+from document_classifier import DocType, ClassificationResult
+from document_context import DocumentContext
 
 
 @dataclass
@@ -453,36 +454,130 @@ TYPE_PATTERNS = {
 }
 
 
+# =============================================================================
+# COMPILED EXTRACTION PLANS
+# =============================================================================
+
+# Cheap necessary conditions for expensive patterns: wherever the pattern
+# matches, its prefilter matches too, so a prefilter miss skips the pattern.
+PATTERN_PREFILTERS = {
+    # FBI 302 "NAME, 2527 Glenfield" subject: with IGNORECASE every word run is
+    # a candidate NAME, so pages without the ", 2527 G" tail are slow to reject
+    r"([A-Z][A-Z]+(?:\s+[A-Z][A-Z]+)*),\s*\d+\s+[A-Za-z]": r",\s*\d+\s+[A-Za-z]",
+}
+
+
+@dataclass(frozen=True)
+class PatternStep:
+    """One precompiled field pattern, in TYPE_PATTERNS order."""
+    regex: re.Pattern
+    field_name: str
+    zone: str
+    confidence: float
+    has_groups: bool
+    prefilter: Optional[re.Pattern] = None
+
+
+@dataclass(frozen=True)
+class ExtractionPlan:
+    """
+    Precompiled patterns for one document type.
+
+    steps keeps the original pattern order, which decides which pattern wins
+    a field (e.g. an FBI 302 header file number beats the "any" fallback)
+    and the order fields are reported in. zones lists the zones the steps
+    search, and fields every field the type can produce.
+    """
+    doc_type: DocType
+    steps: tuple[PatternStep, ...]
+    zones: frozenset[str]
+    fields: frozenset[str]
+
+
+_PLANS: dict[DocType, ExtractionPlan] = {}
+
+
+def get_extraction_plan(doc_type: DocType) -> ExtractionPlan:
+    """Return the compiled plan for doc_type, building it on first use."""
+    plan = _PLANS.get(doc_type)
+    if plan is None:
+        steps = []
+        for pattern, field_name, zone, confidence in TYPE_PATTERNS.get(doc_type, []):
+            regex = re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+            prefilter = PATTERN_PREFILTERS.get(pattern)
+            if prefilter is not None:
+                prefilter = re.compile(prefilter, re.IGNORECASE | re.MULTILINE)
+            steps.append(PatternStep(regex, field_name, zone, confidence, regex.groups > 0, prefilter))
+        plan = ExtractionPlan(
+            doc_type=doc_type,
+            steps=tuple(steps),
+            zones=frozenset(s.zone for s in steps),
+            fields=frozenset(s.field_name for s in steps),
+        )
+        _PLANS[doc_type] = plan
+    return plan
+
+
 # =============================================================================
 # EXTRACTION ENGINE
 # =============================================================================
 
-def extract_zones(text: str, doc_type: DocType) -> tuple[str, str, str]:
+def zone_bounds(text: str, doc_type: DocType) -> Optional[tuple[int, int]]:
     """
-    Split document into header, body, and footer zones.
-    
+    Locate the header/body/footer boundaries without splitting the text.
+
+    Only the newlines inside the header and footer are visited: the header
+    ends at the header_lines-th newline from the start and the footer
+    begins after the footer_lines-th newline from the end.
+
     Args:
         text: Full OCR text
         doc_type: Classified document type
-        
+
     Returns:
-        Tuple of (header_text, body_text, footer_text)
+        (header_end, footer_start) offsets, so header is text[:header_end],
+        body is text[header_end + 1:footer_start - 1] and footer is
+        text[footer_start:]; or None if the document is too short to zone
     """
     config = ZONE_CONFIG.get(doc_type, ZONE_CONFIG[DocType.UNKNOWN])
-    lines = text.split('\n')
-    
     header_count = config["header_lines"]
     footer_count = config["footer_lines"]
-    
+
     # Handle short documents
-    total_lines = len(lines)
+    total_lines = text.count('\n') + 1
     if total_lines <= header_count + footer_count:
+        return None
+
+    header_end = -1
+    for _ in range(header_count):
+        header_end = text.find('\n', header_end + 1)
+
+    footer_start = len(text)
+    for _ in range(footer_count):
+        footer_start = text.rfind('\n', 0, footer_start)
+    return header_end, footer_start + 1
+
+
+def extract_zones(text: str, doc_type: DocType) -> tuple[str, str, str]:
+    """
+    Split document into header, body, and footer zones.
+    
+    Args:
+        text: Full OCR text
+        doc_type: Classified document type
+        
+    Returns:
+        Tuple of (header_text, body_text, footer_text)
+    """
+    bounds = zone_bounds(text, doc_type)
+    if bounds is None:
         # Document too short - treat as all header
         return text, "", ""
-    
-    header = '\n'.join(lines[:header_count])
-    footer = '\n'.join(lines[-footer_count:])
-    body = '\n'.join(lines[header_count:-footer_count])
+
+    header_end, footer_start = bounds
+    header = text[:header_end]
+    body = text[header_end + 1:footer_start - 1]
+    footer = text[footer_start:]
     
     return header, body, footer
 
@@ -588,13 +683,18 @@ def _segment_numbered_blocks(text: str) -> List[BodySegment]:
     return segments
 
 
-def extract_by_type(text: str, classification: ClassificationResult) -> ZoneExtractionResult:
+def extract_by_type(
+    text: str,
+    classification: ClassificationResult,
+    context: Optional[DocumentContext] = None,
+) -> ZoneExtractionResult:
     """
     Extract fields using type-specific patterns applied to correct zones.
     
     Args:
         text: Full OCR text
         classification: Result from document classifier
+        context: DocumentContext for text, to reuse its line index
         
     Returns:
         ZoneExtractionResult with all extracted fields
@@ -604,53 +704,60 @@ def extract_by_type(text: str, classification: ClassificationResult) -> ZoneExtr
         doc_type_confidence=classification.confidence,
     )
     
-    # Get zone-split text
-    header, body, footer = extract_zones(text, classification.doc_type)
-    
-    # Get patterns for this document type
-    patterns = TYPE_PATTERNS.get(classification.doc_type, [])
+    plan = get_extraction_plan(classification.doc_type)
     
-    if not patterns:
+    if not plan.steps:
         result.extraction_notes.append(f"No patterns defined for {classification.doc_type.value}")
         return result
     
-    # Apply each pattern to the appropriate zone
-    for pattern, field_name, zone, base_confidence in patterns:
-        # Skip if field already extracted with higher confidence
-        if field_name in result.fields:
+    # Slice only the zones this type searches (body is always segmented)
+    if context is not None:
+        config = ZONE_CONFIG.get(classification.doc_type, ZONE_CONFIG[DocType.UNKNOWN])
+        bounds = context.zone_bounds(config["header_lines"], config["footer_lines"])
+    else:
+        bounds = zone_bounds(text, classification.doc_type)
+    if bounds is None:
+        # Document too short - treat as all header
+        zone_text = {"header": text, "body": "", "footer": "", "any": text}
+    else:
+        header_end, footer_start = bounds
+        zone_text = {"body": text[header_end + 1:footer_start - 1], "any": text}
+        if "header" in plan.zones:
+            zone_text["header"] = text[:header_end]
+        if "footer" in plan.zones:
+            zone_text["footer"] = text[footer_start:]
+    
+    scale = min(1.0, classification.confidence + 0.3)
+    
+    # Apply each pattern to the appropriate zone, in pattern order
+    for step in plan.steps:
+        # Skip if field already extracted by an earlier pattern
+        if step.field_name in result.fields:
+            continue
+        
+        search_text = zone_text[step.zone]
+        if step.prefilter is not None and not step.prefilter.search(search_text):
             continue
         
-        # Determine which text to search
-        if zone == "header":
-            search_text = header
-        elif zone == "footer":
-            search_text = footer
-        elif zone == "body":
-            search_text = body
-        else:  # "any"
-            search_text = text
-        
-        # Try to match
-        match = re.search(pattern, search_text, re.IGNORECASE | re.MULTILINE)
+        match = step.regex.search(search_text)
         if match:
             # Get the captured group (first group or full match)
-            value = match.group(1) if match.groups() else match.group(0)
-            value = value.strip()
-            
-            # Adjust confidence based on classification confidence
-            adjusted_confidence = base_confidence * min(1.0, classification.confidence + 0.3)
+            value = match.group(1) if step.has_groups else match.group(0)
             
-            result.fields[field_name] = ExtractedZoneField(
-                field_name=field_name,
-                value=value,
-                zone=zone,
-                confidence=adjusted_confidence,
-                pattern_name=f"{classification.doc_type.value}_{field_name}",
+            result.fields[step.field_name] = ExtractedZoneField(
+                field_name=step.field_name,
+                value=value.strip(),
+                zone=step.zone,
+                confidence=step.confidence * scale,
+                pattern_name=f"{classification.doc_type.value}_{step.field_name}",
                 raw_match=match.group(0),
             )
+            # Every field this type can produce is filled
+            if len(result.fields) == len(plan.fields):
+                break
     
     # Step 3: Segment the body
-    result.segments = segment_body(body, classification.doc_type)
+    result.segments = segment_body(zone_text["body"], classification.doc_type)
     
     result.extraction_notes.append(
         f"Extracted {len(result.fields)} field(s) and {len(result.segments)} body segment(s) for {classification.doc_type.value}"
@@ -659,21 +766,26 @@ def extract_by_type(text: str, classification: ClassificationResult) -> ZoneExtr
     return result
 
 
-def extract_document(text: str) -> ZoneExtractionResult:
+def extract_document(text: str, context: Optional[DocumentContext] = None) -> ZoneExtractionResult:
     """
     Full document extraction pipeline: classify then extract.
     
     Args:
         text: Full OCR text
+        context: DocumentContext for text, shared with other stages so the
+            document is classified once
         
     Returns:
         ZoneExtractionResult with classification and extracted fields
     """
-    # Step 1: Classify
-    classification = classify_document(text)
+    if context is None:
+        context = DocumentContext(text)
+    
+    # Step 1: Classify (cached on the context)
+    classification = context.classification
     
     # Step 2: Extract based on type
-    result = extract_by_type(text, classification)
+    result = extract_by_type(text, classification, context)
     
     return result
 
@@ -9,15 +9,19 @@ Then open: http://localhost:5000
 """
 
 import os
+import hashlib
 import json
 import re
 import threading
 import zipfile
 import tarfile
 import shutil
+import tempfile
+import time
+import uuid
 from datetime import datetime
 from pathlib import Path
-from flask import Flask, request, jsonify, send_from_directory, send_file
+from flask import Flask, Response, request, jsonify, send_from_directory, send_file
 from werkzeug.utils import secure_filename
 
 # Ensure ffmpeg is on PATH (winget install location)
@@ -35,6 +39,10 @@ UI_DIR = os.path.join(NEW_UI_ROOT, "tools", "ocr") # Directory for OCR tool file
 # Import OCR worker and metadata parser from ocr-gui
 import sys
 sys.path.insert(0, os.path.join(TOOLS_DIR, "ocr-gui"))
+from job_queue import JobQueue, DEFAULT_WORKERS, PRIORITY_NAMES, PRIORITY_QUICK, PRIORITY_NORMAL, PRIORITY_BULK
+from history_catalog import HistoryCatalog, SORT_COLUMNS as HISTORY_SORT_KEYS
+from artifact_manifest import ARTIFACT_SUFFIXES, ROLES, ArtifactManifests, document_base
+
 try:
     from ocr_worker import OCRWorker
     OCR_AVAILABLE = True
@@ -43,7 +51,7 @@ except ImportError:
     print("Warning: ocr_worker not available, using placeholder processing")
 
 try:
-    from transcription_worker import TranscriptionWorker, WHISPER_AVAILABLE, MEDIA_EXTENSIONS, AUDIO_EXTENSIONS, VIDEO_EXTENSIONS, WHISPER_MODELS
+    from transcription_worker import TranscriptionWorker, WHISPER_AVAILABLE, MEDIA_EXTENSIONS, AUDIO_EXTENSIONS, VIDEO_EXTENSIONS, WHISPER_MODELS, get_model_registry
 except ImportError:
     WHISPER_AVAILABLE = False
     MEDIA_EXTENSIONS = set()
@@ -67,8 +75,12 @@ except ImportError:
     print("Warning: metadata_parser not available")
 
 try:
-    from document_classifier import classify_document, classify, get_all_scores, get_agency
-    from zone_extractor import extract_document, extract
+    from document_classifier import classify_with_scores, get_agency
+    from document_context import DocumentContext
+    from zone_extractor import extract_document
+    from classification_cache import ClassificationCache, build_page_result, TEXT_SAMPLE_CHARS
+    from parallel_classifier import ParallelClassifier, FITZ_AVAILABLE as PARALLEL_CLASSIFIER_AVAILABLE
+    from document_splitter import DocumentSplitter, load_pages, write_sidecar
     CLASSIFIER_AVAILABLE = True
 except ImportError:
     CLASSIFIER_AVAILABLE = False
@@ -88,42 +100,37 @@ except ImportError:
     INFLATION_AVAILABLE = False
     print("Warning: inflation module not available")
 
-try:
-    from entity_linker import EntityLinker
-    LINKER_AVAILABLE = True
-except ImportError:
-    LINKER_AVAILABLE = False
-    print("Warning: entity_linker not available")
-
 # TTS worker (Kokoro)
 sys.path.insert(0, TOOLS_DIR)
 try:
-    from tts_worker import TTSWorker, KOKORO_AVAILABLE, VOICES as TTS_VOICES
+    from tts_worker import TTSWorker, KOKORO_AVAILABLE, VOICES as TTS_VOICES, get_pipeline_pool, get_synthesizer
+    from tts_cache import TTSCache
 except ImportError:
     KOKORO_AVAILABLE = False
     TTS_VOICES = []
     print("Warning: tts_worker not available")
 
+try:
+    from search_index import SearchIndex
+    SEARCH_AVAILABLE = True
+except ImportError:
+    SEARCH_AVAILABLE = False
+    print("Warning: search_index not available")
+
 # Initialize global engines
 DATA_DIR = Path(NEW_UI_ROOT) / "assets" / "data"
-linker = EntityLinker(DATA_DIR) if LINKER_AVAILABLE else None
 
+# Matcher and linker share one copy-on-write index snapshot (loaded by init_app)
 try:
-    from entity_matcher import EntityMatcher, EntityIndex, find_entities, generate_entities_json
+    from entity_index_service import EntityIndexService
+    from entity_matcher import EntityIndex, find_entities, generate_entities_json
     ENTITY_MATCHER_AVAILABLE = True
-    # Initialize matcher with real entity data from JSON files
-    _entity_matcher = EntityMatcher()
-    _entity_data_dir = str(DATA_DIR)
-    _loaded = _entity_matcher.load_from_entity_files(_entity_data_dir)
-    if _loaded == 0:
-        print("Warning: No entities loaded from JSON files, falling back to sample data")
-        _entity_matcher.load_sample_data()
-    else:
-        print(f"Entity matcher loaded {_loaded} entities from JSON files")
-except ImportError:
+    LINKER_AVAILABLE = True
+except ImportError as e:
     ENTITY_MATCHER_AVAILABLE = False
-    _entity_matcher = None
-    print("Warning: entity_matcher module not available")
+    LINKER_AVAILABLE = False
+    print(f"Warning: entity index not available ({e})")
+entity_index = None
 
 # Flask app serving from docs/ui/ocr/
 # Note: static_url_path="/static" avoids conflict with API routes
@@ -149,11 +156,130 @@ IMAGE_PDF_EXTENSIONS = {"pdf", "jpg", "jpeg", "png", "tiff", "webp", "heic", "he
 
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 app.config["MAX_CONTENT_LENGTH"] = MAX_FILE_SIZE
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-# Global state
-processing_jobs = {}  # job_id -> {status, files, progress, worker}
-job_counter = 0
+# Durable job store: bounded worker pool with priority lanes
+JOB_DB_PATH = os.path.join(UPLOAD_FOLDER, "jobs.db")
+JOB_WORKERS = int(os.environ.get("OCR_JOB_WORKERS", str(DEFAULT_WORKERS)))
+BULK_JOB_BYTES = 50 * 1024 * 1024  # Uploads above this total run in the bulk lane
+job_queue = None
+
+# Persistent per-page classification cache (used by /api/review)
+CLASSIFICATION_CACHE_PATH = os.path.join(UPLOAD_FOLDER, "classification_cache.db")
+classification_cache = None
+
+# Full-text index of processed/ (one row per page / transcript segment)
+SEARCH_DB_PATH = os.path.join(UPLOAD_FOLDER, "search_index.db")
+SEARCH_MAX_LIMIT = 100
+search_index = None
+
+# Catalog behind /api/history, refreshed incrementally instead of per request
+history_catalog = None
+HISTORY_MAX_LIMIT = 1000
+
+# One <base>.manifest.json per document naming its source and derivatives
+artifact_manifests = None
+
+
+def init_app():
+    """
+    Open the server's stores and indexes: job queue, classification cache,
+    search index, history catalog, artifact manifests, entity index and
+    TTS cache.
+
+    Runs once when this module is loaded, except in process pool workers.
+    Spawned workers re-run the main module as __mp_main__ and need none of
+    this, so they skip it and start without touching the databases.
+    """
+    global job_queue, classification_cache, search_index, history_catalog
+    global artifact_manifests, entity_index, tts_cache
+
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    job_queue = JobQueue(
+        JOB_DB_PATH,
+        run_job=lambda job: process_job_worker(job),
+        workers=JOB_WORKERS,
+    )
+
+    if CLASSIFIER_AVAILABLE:
+        try:
+            classification_cache = ClassificationCache(CLASSIFICATION_CACHE_PATH)
+        except Exception as e:
+            print(f"Warning: classification cache unavailable ({e}), using in-memory cache")
+            classification_cache = ClassificationCache(":memory:")
+
+    if SEARCH_AVAILABLE:
+        try:
+            search_index = SearchIndex(SEARCH_DB_PATH)
+        except Exception as e:
+            print(f"Warning: search index unavailable ({e})")
+
+    history_catalog = HistoryCatalog(UPLOAD_FOLDER, audio_exts=AUDIO_EXTS, video_exts=VIDEO_EXTS)
+    artifact_manifests = ArtifactManifests(UPLOAD_FOLDER, source_exts=IMAGE_PDF_EXTENSIONS | MEDIA_EXTS | PASSTHROUGH_EXTS)
+
+    if ENTITY_MATCHER_AVAILABLE:
+        entity_index = EntityIndexService(str(DATA_DIR))
+        entity_index.load()
+        print(f"Entity index loaded {entity_index.matcher.index.total_count()} entities from JSON files")
+
+    if KOKORO_AVAILABLE:
+        try:
+            tts_cache = TTSCache(TTS_CACHE_DIR, max_bytes=TTS_CACHE_MB * 1024 * 1024)
+        except Exception as e:
+            print(f"Warning: TTS cache unavailable ({e})")
+
+
+def _artifacts_changed(base_name: str, source_path: str = None):
+    """
+    Record that a source's files were (re)written: rewrite its artifact
+    manifest, restat it in the history catalog and re-index it for search.
+    Failures never affect the caller.
+    """
+    try:
+        artifact_manifests.record(base_name, source_path=source_path)
+    except Exception as e:
+        print(f"Warning: could not write manifest for {base_name}: {e}")
+    history_catalog.touch(base_name)
+    if search_index is None:
+        return
+    try:
+        search_index.index_source(UPLOAD_FOLDER, base_name)
+    except Exception as e:
+        print(f"Warning: search indexing failed for {base_name}: {e}")
+
+
+# First review of a long PDF scores its pages in a process pool
+REVIEW_PARALLEL_MIN_PAGES = 64
+REVIEW_WORKERS = int(os.environ.get("REVIEW_WORKERS", "0")) or None  # None = CPU count
+_review_classifier = None
+_review_classifier_lock = threading.Lock()
+
+
+def get_review_classifier():
+    """Return the shared ParallelClassifier, or None if unavailable."""
+    global _review_classifier
+    if not (CLASSIFIER_AVAILABLE and PARALLEL_CLASSIFIER_AVAILABLE):
+        return None
+    with _review_classifier_lock:
+        if _review_classifier is None:
+            _review_classifier = ParallelClassifier(workers=REVIEW_WORKERS)
+        return _review_classifier
+
+
+# Multi-page OCR output is split into logical documents after each job,
+# in the review classifier's process pool
+_document_splitter = None
+_document_splitter_lock = threading.Lock()
+
+
+def get_document_splitter():
+    """Return the shared DocumentSplitter, or None if unavailable."""
+    global _document_splitter
+    if not (CLASSIFIER_AVAILABLE and PARSER_AVAILABLE):
+        return None
+    with _document_splitter_lock:
+        if _document_splitter is None:
+            _document_splitter = DocumentSplitter(get_review_classifier())
+        return _document_splitter
 
 
 def allowed_file(filename):
@@ -278,7 +404,7 @@ def get_config():
     """Return default configuration and output directory."""
     return jsonify({
         "output_dir": UPLOAD_FOLDER,
-        "backends": ["wsl", "python"],
+        "backends": ["wsl", "native", "python"],
         "default_backend": "wsl",
         "ocr_available": OCR_AVAILABLE,
         "whisper_available": WHISPER_AVAILABLE,
@@ -289,6 +415,19 @@ def get_config():
     })
 
 
+@app.route("/api/transcription/models", methods=["GET"])
+def transcription_models():
+    """
+    Report warm Whisper models and registry hit/miss/load-time metrics.
+
+    Response:
+        { "budget_mb": 4096, "loaded_mb": 290.0, "models": [...], "hits": 49, "misses": 1, ... }
+    """
+    if not WHISPER_AVAILABLE:
+        return jsonify({"error": "Whisper not available"}), 503
+    return jsonify(get_model_registry().stats())
+
+
 @app.route("/api/download", methods=["POST"])
 def download_url():
     """
@@ -382,9 +521,12 @@ def serve_downloaded_file(filename):
 
 @app.route("/api/jobs", methods=["POST"])
 def create_job():
-    """Create a new OCR processing job."""
-    global job_counter
-    
+    """
+    Create a new OCR processing job.
+
+    The optional form field `priority` (quick|normal|bulk) overrides the
+    lane picked from the file types and sizes.
+    """
     files = request.files.getlist("files")
     backend = request.form.get("backend", "wsl")
     output_pdf = request.form.get("output_pdf", "true") == "true"
@@ -395,11 +537,17 @@ def create_job():
     deskew = request.form.get("deskew", "true") == "true"
     clean = request.form.get("clean", "true") == "true"
     force_ocr = request.form.get("force_ocr", "false") == "true"
+    ocr_mode = request.form.get("ocr_mode", "") or None  # skip | redo | force
+    output_type = request.form.get("output_type", "pdfa")
+    optimize = request.form.get("optimize", "1")
     whisper_model = request.form.get("whisper_model", "base")
     whisper_language = request.form.get("whisper_language", "") or None
+    priority = request.form.get("priority", "")
 
     if not files:
         return jsonify({"error": "No files provided"}), 400
+    if priority and priority not in PRIORITY_NAMES:
+        return jsonify({"error": f"Invalid priority: {priority}"}), 400
     
     # Validate files
     for file in files:
@@ -419,7 +567,7 @@ def create_job():
 
         if is_archive(filename):
             # Extract archive
-            extract_dir = os.path.join(upload_dir, f"ext_{filename}_{job_counter + 1}")
+            extract_dir = os.path.join(upload_dir, f"ext_{filename}_{uuid.uuid4().hex[:8]}")
             os.makedirs(extract_dir, exist_ok=True)
             
             try:
@@ -462,12 +610,7 @@ def create_job():
             })
     
     # Create job
-    job_counter += 1
-    job_id = f"job_{job_counter}"
-    
-    processing_jobs[job_id] = {
-        "id": job_id,
-        "status": "queued",
+    job = job_queue.create({
         "files": saved_files,
         "progress": 0,
         "log": [],
@@ -481,69 +624,118 @@ def create_job():
             "deskew": deskew,
             "clean": clean,
             "force_ocr": force_ocr,
+            "ocr_mode": ocr_mode,
+            "output_type": output_type,
+            "optimize": int(optimize) if optimize.isdigit() else 1,
             "whisper_model": whisper_model,
             "whisper_language": whisper_language,
         },
-    }
+    }, priority=PRIORITY_NAMES[priority] if priority else _job_priority(saved_files))
     
-    return jsonify(processing_jobs[job_id]), 201
+    return jsonify(job), 201
+
+
+def _job_priority(files: list) -> int:
+    """Pick a queue lane: imports are quick, large uploads are bulk."""
+    if files and all(is_text_file(f["name"]) or is_subtitle(f["name"]) or is_docx(f["name"])
+                     or is_email_file(f["name"]) for f in files):
+        return PRIORITY_QUICK
+    if sum(f.get("size", 0) for f in files) > BULK_JOB_BYTES:
+        return PRIORITY_BULK
+    return PRIORITY_NORMAL
+
+
+@app.route("/api/jobs", methods=["GET"])
+def list_jobs():
+    """
+    List recent jobs and queue state.
+
+    Query params:
+        status: Only jobs with this status
+        limit: Max jobs (default: 50)
+    """
+    try:
+        limit = max(1, min(int(request.args.get("limit", 50)), 500))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    return jsonify({
+        "jobs": job_queue.recent(request.args.get("status") or None, limit),
+        "queue": job_queue.stats(),
+    })
 
 
 @app.route("/api/jobs/<job_id>", methods=["GET"])
 def get_job(job_id):
     """Get job status and progress."""
-    if job_id not in processing_jobs:
+    job = job_queue.get(job_id)
+    if job is None:
         return jsonify({"error": "Job not found"}), 404
-    return jsonify(processing_jobs[job_id])
+    return jsonify(job)
 
 
 @app.route("/api/jobs/<job_id>/start", methods=["POST"])
 def start_job(job_id):
-    """Start processing a job."""
-    if job_id not in processing_jobs:
+    """Queue a job for the worker pool (?priority=quick|normal|bulk overrides its lane)."""
+    priority = request.args.get("priority", "")
+    if priority and priority not in PRIORITY_NAMES:
+        return jsonify({"error": f"Invalid priority: {priority}"}), 400
+
+    job = job_queue.get(job_id)
+    if job is None:
         return jsonify({"error": "Job not found"}), 404
-    
-    job = processing_jobs[job_id]
-    job["status"] = "processing"
-    job["log"].append("OCR processing started...")
-    
-    # Start processing in background thread
-    thread = threading.Thread(target=process_job_worker, args=(job_id,))
-    thread.daemon = True
-    thread.start()
+    if job["status"] == "pending":
+        job = job_queue.submit(
+            job_id,
+            PRIORITY_NAMES[priority] if priority else None,
+            message=f"Queued for processing ({priority or job['priority']} lane)",
+        )
     
     return jsonify(job)
 
 
-def process_job_worker(job_id):
-    """Background worker to process OCR job."""
-    job = processing_jobs[job_id]
+def process_job_worker(job):
+    """Process an OCR job on a job queue worker thread."""
+    job_id = job["id"]
     
     try:
         job["log"].append(f"Using backend: {job['backend']}")
         
         total_files = len(job["files"])
         for i, file_info in enumerate(job["files"]):
+            if job_queue.is_cancelled(job_id):
+                job["log"].append("Remaining files skipped")
+                return
+            if file_info.get("status") == "completed":
+                # Finished before a server restart
+                continue
+
             file_info["status"] = "processing"
             file_info["progress"] = 0
             job["log"].append(f"Processing: {file_info['name']}")
             job["progress"] = int((i / total_files) * 100)
+            job_queue.save(job)
             
             def on_progress(pct, msg):
                 job["log"].append(msg)
                 file_info["progress"] = pct
                 file_info["current_msg"] = msg
                 job["progress"] = int((i / total_files) * 100 + (pct / total_files))
+                job_queue.save(job, force=False)
 
             def on_complete(success, msg):
                 if success:
                     file_info["status"] = "completed"
                     file_info["progress"] = 100
                     job["log"].append(f"✓ {file_info['name']} completed")
+                elif job_queue.is_cancelled(job_id):
+                    file_info["status"] = "cancelled"
+                    file_info["progress"] = 0
+                    job["log"].append(f"✗ {file_info['name']} cancelled")
                 else:
                     file_info["status"] = "failed"
                     file_info["progress"] = 0
                     job["log"].append(f"✗ {file_info['name']} failed: {msg}")
+                job_queue.save(job)
 
             if is_text_file(file_info["name"]):
                 # Plain text passthrough — no OCR needed
@@ -673,7 +865,11 @@ def process_job_worker(job_id):
                     output_vtt=True,
                     output_json=True,
                 )
-                worker.process_file(file_info["path"], on_progress, on_complete)
+                job_queue.attach_worker(job_id, worker)
+                try:
+                    worker.process_file(file_info["path"], on_progress, on_complete)
+                finally:
+                    job_queue.detach_worker(job_id)
 
                 # Auto-run metadata parser on completed transcripts
                 if file_info["status"] == "completed" and PARSER_AVAILABLE:
@@ -692,22 +888,42 @@ def process_job_worker(job_id):
                     deskew=job["options"]["deskew"],
                     clean=job["options"]["clean"],
                     force_ocr=job["options"]["force_ocr"],
+                    ocr_mode=job["options"].get("ocr_mode"),
+                    output_type=job["options"].get("output_type", "pdfa"),
+                    optimize=job["options"].get("optimize", 1),
                 )
-                worker.process_file(file_info["path"], on_progress, on_complete)
+                job_queue.attach_worker(job_id, worker)
+                try:
+                    worker.process_file(file_info["path"], on_progress, on_complete)
+                finally:
+                    job_queue.detach_worker(job_id)
 
                 # Auto-run metadata parser on completed files
                 if file_info["status"] == "completed" and PARSER_AVAILABLE:
                     _run_metadata_parser(file_info, job)
+                    _run_document_splitter(file_info, job)
             else:
                 # Placeholder processing
                 import time
                 time.sleep(1)
                 file_info["status"] = "completed"
                 job["log"].append(f"✓ {file_info['name']} (placeholder)")
+
+            if file_info["status"] == "completed":
+                _artifacts_changed(os.path.splitext(os.path.basename(file_info["name"]))[0], file_info.get("path"))
         
+        if job_queue.is_cancelled(job_id):
+            job["log"].append("✗ Job cancelled")
+            return
+
         job["progress"] = 100
-        job["status"] = "completed"
-        job["log"].append("✓ All files processed successfully!")
+        failed = [f["name"] for f in job["files"] if f.get("status") != "completed"]
+        if failed:
+            job["status"] = "failed"
+            job["log"].append(f"✗ {len(failed)} of {total_files} file(s) did not complete: {', '.join(failed)}")
+        else:
+            job["status"] = "completed"
+            job["log"].append("✓ All files processed successfully!")
         
     except Exception as e:
         job["status"] = "failed"
@@ -739,8 +955,11 @@ def _run_metadata_parser(file_info: dict, job: dict):
         job["log"].append(f"  → Metadata parser: No text output found")
         return
     
+    # One classification shared by the parser and the type badge below
+    context = DocumentContext(ocr_text) if CLASSIFIER_AVAILABLE else None
+    
     try:
-        result = parse_metadata(ocr_text)
+        result = parse_metadata(ocr_text, context=context)
         file_info["parsed_metadata"] = result
         
         # Log extraction summary
@@ -765,7 +984,7 @@ def _run_metadata_parser(file_info: dict, job: dict):
     # Auto-classify document type (feeds the badge in ocr-gui.js)
     if CLASSIFIER_AVAILABLE and ocr_text:
         try:
-            classification = classify_document(ocr_text)
+            classification = context.classification
             agency = get_agency(classification.doc_type)
             if "parsed_metadata" not in file_info:
                 file_info["parsed_metadata"] = {}
@@ -781,49 +1000,69 @@ def _run_metadata_parser(file_info: dict, job: dict):
             job["log"].append(f"  → Classifier error: {str(e)}")
 
 
+def _run_document_splitter(file_info: dict, job: dict):
+    """
+    Split multi-page OCR output into logical documents and write
+    <base>.documents.json with each document's pages, type and metadata.
+    A summary is stored in file_info["parsed_metadata"]["documents"].
+
+    Only for OCR'd PDFs/images: the .ocr.json "pages" of text ingests and
+    transcripts are paragraphs and segments, not physical pages.
+    """
+    splitter = get_document_splitter()
+    if splitter is None:
+        return
+
+    base_name = os.path.splitext(file_info["name"])[0]
+    try:
+        pages = load_pages(os.path.join(UPLOAD_FOLDER, base_name))
+        if len(pages) < 2:
+            return
+        documents = splitter.split(pages)
+        sidecar_name = f"{base_name}.documents.json"
+        write_sidecar(os.path.join(UPLOAD_FOLDER, sidecar_name), file_info["name"], pages, documents)
+    except Exception as e:
+        job["log"].append(f"  → Document splitter error: {str(e)}")
+        return
+
+    file_info.setdefault("parsed_metadata", {})["documents"] = {
+        "count": len(documents),
+        "file": sidecar_name,
+    }
+    job["log"].append(f"  → Split {len(pages)} pages into {len(documents)} document(s): {sidecar_name}")
+
+
 @app.route("/api/jobs/<job_id>/cancel", methods=["POST"])
 def cancel_job(job_id):
-    """Cancel a job."""
-    if job_id not in processing_jobs:
+    """
+    Cancel a job.
+
+    Queued jobs are dropped immediately. A running job's OCR/transcription
+    worker is signalled and the job ends as cancelled at its next check.
+    """
+    job = job_queue.cancel(job_id)
+    if job is None:
         return jsonify({"error": "Job not found"}), 404
     
-    job = processing_jobs[job_id]
-    if job["status"] in ["processing", "queued"]:
-        job["status"] = "cancelled"
-        job["log"].append("Job cancelled by user")
-    
     return jsonify(job)
 
 
 @app.route("/api/download/<filename>")
 def download_file(filename):
     """Serve a processed file. Use ?download=true to force browser download.
-    
-    Checks multiple locations:
+
+    Resolved through the document's artifact manifest, in this order:
     1. processed/{filename} (OCR output)
     2. processed/{basename}_searchable.pdf (OCR output with suffix)
     3. processed/uploads/{filename} (original uploads / skipped files)
     """
     as_attachment = request.args.get("download", "").lower() == "true"
     safe_name = os.path.basename(filename)
-    
-    # Check multiple locations
-    direct_path = os.path.join(UPLOAD_FOLDER, safe_name)
-    uploads_path = os.path.join(UPLOAD_FOLDER, "uploads", safe_name)
-    
-    # Also try with _searchable suffix
-    base_name = safe_name.replace("_searchable.pdf", ".pdf") if "_searchable" in safe_name else safe_name
-    searchable_name = base_name.replace(".pdf", "_searchable.pdf")
-    searchable_path = os.path.join(UPLOAD_FOLDER, searchable_name)
-    
-    if os.path.exists(direct_path):
-        return send_from_directory(UPLOAD_FOLDER, safe_name, as_attachment=as_attachment)
-    elif os.path.exists(searchable_path):
-        return send_from_directory(UPLOAD_FOLDER, searchable_name, as_attachment=as_attachment)
-    elif os.path.exists(uploads_path):
-        return send_from_directory(os.path.join(UPLOAD_FOLDER, "uploads"), safe_name, as_attachment=as_attachment)
-    else:
+
+    path = artifact_manifests.locate(safe_name)
+    if not path:
         return jsonify({"error": f"File not found: {safe_name}"}), 404
+    return send_from_directory(os.path.dirname(path), os.path.basename(path), as_attachment=as_attachment)
 
 
 @app.route("/api/output-dir", methods=["GET", "POST"])
@@ -840,9 +1079,11 @@ def handle_output_dir():
 
 def enrich_extraction_with_entities(result: dict) -> dict:
     """Enrich document segments and add global linked entities summary."""
-    if not (LINKER_AVAILABLE and linker):
+    if not LINKER_AVAILABLE:
         return result
-        
+
+    # One snapshot for the whole document, even if the index is swapped meanwhile
+    linker = entity_index.linker
     all_entities = []
     seen_ids = set()
     
@@ -955,9 +1196,10 @@ def classify_endpoint():
         return jsonify({"error": "Empty text provided"}), 400
     
     try:
-        result = classify(text)
+        classification, all_scores = classify_with_scores(text)
+        result = classification.to_dict()
         # Also include alternative scores
-        result["all_scores"] = get_all_scores(text)
+        result["all_scores"] = all_scores
         return jsonify(result)
     except Exception as e:
         return jsonify({"error": f"Classification error: {str(e)}"}), 500
@@ -995,7 +1237,7 @@ def extract_endpoint():
         return jsonify({"error": "Empty text provided"}), 400
     
     try:
-        result = extract(text)
+        result = extract_document(text).to_dict()
         return jsonify(result)
     except Exception as e:
         return jsonify({"error": f"Extraction error: {str(e)}"}), 500
@@ -1193,13 +1435,14 @@ def entities_endpoint():
     filename = data.get("filename", "document.txt")
     include_candidates = data.get("include_candidates", True)
 
+    matcher = entity_index.matcher
     try:
         if include_candidates:
             # Full sidecar output with candidates
-            result = _entity_matcher.generate_sidecar(text, filename)
+            result = matcher.generate_sidecar(text, filename)
         else:
             # Just matched entities
-            matches = _entity_matcher.find_matches(text)
+            matches = matcher.find_matches(text)
             result = {
                 "entities": [m.to_dict() for m in matches],
                 "summary": {
@@ -1231,15 +1474,17 @@ def entities_index_endpoint():
     if not ENTITY_MATCHER_AVAILABLE:
         return jsonify({"error": "Entity matcher not available"}), 503
 
+    index = entity_index.matcher.index
     return jsonify({
-        "total_entities": _entity_matcher.index.total_count(),
-        "loaded_at": _entity_matcher.index.loaded_at,
+        "total_entities": index.total_count(),
+        "loaded_at": index.loaded_at,
         "breakdown": {
-            "persons": len(_entity_matcher.index.persons),
-            "aliases": len(_entity_matcher.index.aliases),
-            "places": len(_entity_matcher.index.places),
-            "orgs": len(_entity_matcher.index.orgs),
-        }
+            "persons": len(index.persons),
+            "aliases": len(index.aliases),
+            "places": len(index.places),
+            "orgs": len(index.orgs),
+        },
+        "service": entity_index.stats(),
     })
 
 
@@ -1332,11 +1577,9 @@ def entities_export_endpoint():
         with open(file_path, "w", encoding="utf-8") as f:
             json.dump(existing, f, indent=2, ensure_ascii=False)
 
-        # Reload entity matcher index if entity data files were updated
-        if target_file in ("people.json", "places.json", "organizations.json"):
-            if ENTITY_MATCHER_AVAILABLE and _entity_matcher:
-                _entity_matcher.index = EntityIndex()
-                _entity_matcher.load_from_entity_files(str(DATA_DIR))
+        # Rebuild the shared entity index from the files in the background
+        if ENTITY_MATCHER_AVAILABLE:
+            entity_index.add_record(target_file)
 
         return jsonify({
             "success": True,
@@ -1365,6 +1608,14 @@ def review_endpoint(filename):
         filename: Name of the file in the processed/ directory
                   (e.g. "yates-searchable.pdf" or "interview.mp3")
 
+    Query params (all optional):
+        offset:    First page/segment index to return (default 0)
+        limit:     Maximum number of pages/segments to return (default: all)
+        prev_type: Doc type of the page before `offset` (continuity state).
+                   Pass `next_prev_type` from the previous window; if omitted,
+                   pages before `offset` are classified (or read from cache).
+        stream:    "ndjson" or "sse" to stream results as they are computed
+
     Response:
         {
             "filename": "yates-searchable.pdf",
@@ -1381,185 +1632,306 @@ def review_endpoint(filename):
                 ...
             ]
         }
+
+        With offset/limit, the response also carries "offset", "limit",
+        "has_more", "next_offset" and "next_prev_type".
+
+        Streaming modes emit one event per line (NDJSON) or per SSE message:
+            {"event": "meta", "data": {filename, total_pages, ...}}
+            {"event": "page", "data": {page result}}
+            {"event": "done", "data": {"count": n, "has_more": ..., "next_offset": ..., "next_prev_type": ...}}
+            {"event": "error", "data": {"error": "..."}}
     """
     if not CLASSIFIER_AVAILABLE:
         return jsonify({"error": "Document classifier not available"}), 503
 
     # Only look in the processed/ output folder — never traverse outside it
     safe_name = os.path.basename(filename)
-    
-    # Check multiple possible locations:
-    # 1. Direct output: processed/{filename} (OCR'd files)
-    # 2. Uploads subfolder: processed/uploads/{filename} (skipped/original files)
-    # 3. With _searchable suffix: processed/{basename}_searchable.pdf
-    pdf_path = os.path.join(UPLOAD_FOLDER, safe_name)
-    uploads_path = os.path.join(UPLOAD_FOLDER, "uploads", safe_name)
-    
-    # Also try without _searchable suffix (user might pass original name)
-    base_name = safe_name.replace("_searchable.pdf", ".pdf") if "_searchable" in safe_name else safe_name
-    searchable_name = base_name.replace(".pdf", "_searchable.pdf")
-    searchable_path = os.path.join(UPLOAD_FOLDER, searchable_name)
-    
-    # Priority: direct path > searchable version > uploads folder
-    if os.path.exists(pdf_path):
-        pass  # Use pdf_path as-is
-    elif os.path.exists(searchable_path):
-        pdf_path = searchable_path
-    elif os.path.exists(uploads_path):
-        pdf_path = uploads_path
-    else:
+
+    try:
+        offset = max(0, int(request.args.get("offset", 0)))
+        limit = request.args.get("limit")
+        limit = max(0, int(limit)) if limit not in (None, "") else None
+    except ValueError:
+        return jsonify({"error": "offset and limit must be integers"}), 400
+    prev_type = request.args.get("prev_type") or None
+    stream = (request.args.get("stream") or "").lower()
+    if stream and stream not in ("ndjson", "sse"):
+        return jsonify({"error": "stream must be 'ndjson' or 'sse'"}), 400
+    paged = offset > 0 or limit is not None
+
+    # Direct output > _searchable version > uploads/ original (artifact manifest)
+    pdf_path = artifact_manifests.locate(safe_name)
+    if not pdf_path:
         return jsonify({"error": f"File not found: {safe_name} (checked processed/, processed/uploads/, and _searchable variants)"}), 404
 
-    # Check if this is a media file with a transcript
+    try:
+        source = _open_review_source(safe_name, pdf_path)
+    except FileNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except ImportError:
+        return jsonify({"error": "PyMuPDF (fitz) not installed. Run: pip install pymupdf"}), 503
+    except Exception as e:
+        return jsonify({"error": f"{_review_error_label(safe_name)} error: {str(e)}"}), 500
+
+    total = source.total
+    offset = min(offset, total)
+    stop = total if limit is None else min(total, offset + limit)
+    meta = {"filename": safe_name, "total_pages": total, **source.meta}
+    if paged:
+        meta.update({"offset": offset, "limit": limit})
+
+    def window_summary(last_type):
+        return {
+            "has_more": stop < total,
+            "next_offset": stop,
+            "next_prev_type": last_type,
+        }
+
+    if stream:
+        def generate():
+            last_type = prev_type
+            count = 0
+            try:
+                yield _review_event(stream, "meta", meta)
+                for page_result in _classify_review_pages(source, offset, stop, prev_type):
+                    last_type = page_result["doc_type"]
+                    count += 1
+                    yield _review_event(stream, "page", page_result)
+                yield _review_event(stream, "done", {"count": count, **window_summary(last_type)})
+            except Exception as e:
+                yield _review_event(stream, "error", {"error": f"{_review_error_label(safe_name)} error: {str(e)}"})
+            finally:
+                source.close()
+
+        mimetype = "text/event-stream" if stream == "sse" else "application/x-ndjson"
+        return Response(generate(), mimetype=mimetype, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    try:
+        results = list(_classify_review_pages(source, offset, stop, prev_type))
+    except Exception as e:
+        return jsonify({"error": f"{_review_error_label(safe_name)} error: {str(e)}"}), 500
+    finally:
+        source.close()
+
+    response = {**meta, "pages": results}
+    if paged:
+        response.update(window_summary(results[-1]["doc_type"] if results else prev_type))
+    return jsonify(response)
+
+
+def _review_error_label(safe_name: str) -> str:
+    """Error prefix matching the review source kind."""
     ext = os.path.splitext(safe_name)[1].lower()
     if ext in {f".{e}" for e in MEDIA_EXTS}:
-        base_name = os.path.splitext(safe_name)[0]
-        transcript_path = os.path.join(UPLOAD_FOLDER, f"{base_name}.transcript.json")
-        if not os.path.exists(transcript_path):
-            return jsonify({"error": f"Transcript not found for {safe_name}. Process the file first."}), 404
+        return "Transcript review"
+    if ext in {f".{e}" for e in TEXT_EXTS}:
+        return "Text review"
+    return "Review"
 
-        try:
-            with open(transcript_path, "r", encoding="utf-8") as f:
-                transcript = json.load(f)
-
-            segments = transcript.get("segments", [])
-            results = []
-            prev_type = "UNKNOWN"
 
-            for seg in segments:
-                text = seg.get("text", "").strip()
-                if not text:
-                    continue
+class _ReviewSource:
+    """
+    Lazily readable pages/segments of one reviewable file.
 
-                if CLASSIFIER_AVAILABLE:
-                    classification = classify_document(text, prev_type=prev_type)
-                    all_scores = get_all_scores(text)
-                    prev_type = classification.doc_type.value
-                    page_result = classification.to_dict()
-                    page_result["all_scores"] = {k: round(v, 4) for k, v in all_scores.items()}
-                else:
-                    page_result = {
-                        "doc_type": "TRANSCRIPT",
-                        "confidence": 1.0,
-                        "matched_patterns": ["AUDIO_TRANSCRIPT"],
-                        "agency": "UNKNOWN",
-                        "all_scores": {"TRANSCRIPT": 1.0},
-                    }
-
-                page_result.update({
-                    "page": seg.get("id", 0) + 1,
-                    "page_index": seg.get("id", 0),
-                    "text": text[:2000],
-                    "segment_start": seg.get("start", 0),
-                    "segment_end": seg.get("end", 0),
-                    "media_type": transcript.get("media_type", "audio"),
-                })
-                results.append(page_result)
+    get_text(i) returns the text of entry i and page_fields(i) the
+    positional fields merged into its result. PDFs are read page by page
+    through fitz so a window never extracts pages it does not return.
+    """
 
-            return jsonify({
-                "filename": safe_name,
-                "total_pages": len(results),
-                "media_type": transcript.get("media_type", "audio"),
-                "duration": transcript.get("duration", 0),
-                "pages": results,
-            })
-        except Exception as e:
-            return jsonify({"error": f"Transcript review error: {str(e)}"}), 500
+    def __init__(self, total, get_text, page_fields, meta=None, pdf_path=None, close=None):
+        self.total = total
+        self.get_text = get_text
+        self.page_fields = page_fields
+        self.meta = meta or {}
+        self.pdf_path = pdf_path
+        self._close = close
 
-    # Check if this is a text file with an .ocr.json sidecar
-    text_exts = {f".{e}" for e in TEXT_EXTS}
-    if ext in text_exts:
-        base_name = os.path.splitext(safe_name)[0]
-        sidecar_path = os.path.join(UPLOAD_FOLDER, f"{base_name}.ocr.json")
-        if not os.path.exists(sidecar_path):
-            return jsonify({"error": f"Sidecar not found for {safe_name}. Process the file first."}), 404
+    def close(self):
+        if self._close:
+            self._close()
+            self._close = None
 
-        try:
-            with open(sidecar_path, "r", encoding="utf-8") as f:
-                sidecar = json.load(f)
 
-            pages = sidecar.get("pages", [])
-            results = []
-            prev_type = "UNKNOWN"
+def _open_review_source(safe_name: str, pdf_path: str) -> _ReviewSource:
+    """Open a PDF, transcript or text sidecar for review."""
+    ext = os.path.splitext(safe_name)[1].lower()
 
-            for p in pages:
-                text = (p.get("text") or "").strip()
-                if not text:
-                    continue
+    # Media file with a transcript: one entry per non-empty segment
+    if ext in {f".{e}" for e in MEDIA_EXTS}:
+        transcript_path = artifact_manifests.artifact_path(document_base(safe_name), "transcript")
+        if not transcript_path:
+            raise FileNotFoundError(f"Transcript not found for {safe_name}. Process the file first.")
+
+        with open(transcript_path, "r", encoding="utf-8") as f:
+            transcript = json.load(f)
+        media_type = transcript.get("media_type", "audio")
+        entries = [
+            (seg, seg.get("text", "").strip())
+            for seg in transcript.get("segments", [])
+            if seg.get("text", "").strip()
+        ]
+
+        def segment_fields(i):
+            seg, text = entries[i]
+            return {
+                "page": seg.get("id", 0) + 1,
+                "page_index": seg.get("id", 0),
+                "text": text[:2000],
+                "segment_start": seg.get("start", 0),
+                "segment_end": seg.get("end", 0),
+                "media_type": media_type,
+            }
 
-                page_num = p.get("page", len(results) + 1)
+        return _ReviewSource(
+            len(entries),
+            lambda i: entries[i][1],
+            segment_fields,
+            meta={"media_type": media_type, "duration": transcript.get("duration", 0)},
+        )
 
-                if CLASSIFIER_AVAILABLE:
-                    classification = classify_document(text, prev_type=prev_type)
-                    all_scores = get_all_scores(text)
-                    prev_type = classification.doc_type.value
-                    page_result = classification.to_dict()
-                    page_result["all_scores"] = {k: round(v, 4) for k, v in all_scores.items()}
-                else:
-                    page_result = {
-                        "doc_type": "TEXT",
-                        "confidence": 1.0,
-                        "matched_patterns": ["TEXT_INGEST"],
-                        "agency": "UNKNOWN",
-                        "all_scores": {"TEXT": 1.0},
-                    }
-
-                page_result.update({
-                    "page": page_num,
-                    "page_index": page_num - 1,
-                    "text": text[:2000],
-                })
-                results.append(page_result)
+    # Text file with an .ocr.json sidecar: one entry per non-empty page
+    if ext in {f".{e}" for e in TEXT_EXTS}:
+        sidecar_path = artifact_manifests.artifact_path(document_base(safe_name), "ocr_json")
+        if not sidecar_path:
+            raise FileNotFoundError(f"Sidecar not found for {safe_name}. Process the file first.")
+
+        with open(sidecar_path, "r", encoding="utf-8") as f:
+            sidecar = json.load(f)
+        entries = []
+        for p in sidecar.get("pages", []):
+            text = (p.get("text") or "").strip()
+            if text:
+                entries.append((p.get("page", len(entries) + 1), text))
+
+        def sidecar_fields(i):
+            page_num, text = entries[i]
+            return {
+                "page": page_num,
+                "page_index": page_num - 1,
+                "text": text[:2000],
+            }
 
-            return jsonify({
-                "filename": safe_name,
-                "total_pages": len(results),
-                "pages": results,
-            })
-        except Exception as e:
-            return jsonify({"error": f"Text review error: {str(e)}"}), 500
+        return _ReviewSource(len(entries), lambda i: entries[i][1], sidecar_fields)
 
     if not safe_name.lower().endswith(".pdf"):
-        return jsonify({"error": "Only PDF, media, and text files are supported for review"}), 400
+        raise ValueError("Only PDF, media, and text files are supported for review")
 
-    try:
-        import fitz  # PyMuPDF — already used by the OCR stack
+    import fitz  # PyMuPDF — already used by the OCR stack
 
-        results = []
-        doc = fitz.open(pdf_path)
-        prev_type = "UNKNOWN"
+    doc = fitz.open(pdf_path)
+    return _ReviewSource(
+        len(doc),
+        lambda i: doc[i].get_text(),
+        lambda i: {"page": i + 1, "page_index": i},
+        pdf_path=pdf_path,
+        close=doc.close,
+    )
 
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            text = page.get_text()
 
-            classification = classify_document(text, prev_type=prev_type)
-            all_scores = get_all_scores(text)
+def _classify_review_pages(source: _ReviewSource, start: int, stop: int, prev_type=None):
+    """
+    Yield review results for entries [start, stop) as they are classified.
 
-            # Update state for next page
-            prev_type = classification.doc_type.value
+    Continuity: `prev_type` is the doc type of entry start-1. When it is not
+    supplied, entries before `start` are classified first (normally cache
+    hits) so every window sees the same state as a full pass.
+    """
+    # Unchanged PDF with every page cached: skip text extraction entirely
+    if source.pdf_path:
+        cached = classification_cache.get_document(source.pdf_path)
+        if cached is not None:
+            for i in range(start, stop):
+                page_result = cached[i]
+                page_result.update(source.page_fields(i))
+                yield page_result
+            return
+
+        # Cold long document: score pages in parallel, resolve continuity here
+        first = 0 if prev_type is None else start
+        review_classifier = get_review_classifier()
+        if review_classifier and stop - first >= REVIEW_PARALLEL_MIN_PAGES:
+            yield from _classify_review_pages_parallel(review_classifier, source, first, start, stop, prev_type)
+            return
+
+    state = "UNKNOWN"
+    page_hashes = []
+    if prev_type is None:
+        for i in range(start):
+            page_result, text_hash = classification_cache.classify(source.get_text(i), state)
+            page_hashes.append(text_hash)
+            state = page_result["doc_type"]
+    else:
+        state = prev_type
 
-            page_result = classification.to_dict()
-            page_result.update({
-                "page":             page_num + 1,
-                "page_index":       page_num,
-                "text":             text[:2000], # Send first 2k chars for UI sample/display
-                "all_scores":       {k: round(v, 4) for k, v in all_scores.items()},
-            })
-            results.append(page_result)
+    for i in range(start, stop):
+        # Includes all_scores and the first 2k chars for UI sample/display
+        page_result, text_hash = classification_cache.classify(source.get_text(i), state)
+        page_hashes.append(text_hash)
 
-        doc.close()
+        # Update state for next page
+        state = page_result["doc_type"]
 
-        return jsonify({
-            "filename":    safe_name,
-            "total_pages": len(results),
-            "pages":       results,
-        })
+        page_result.update(source.page_fields(i))
+        yield page_result
 
-    except ImportError:
-        return jsonify({"error": "PyMuPDF (fitz) not installed. Run: pip install pymupdf"}), 503
-    except Exception as e:
-        return jsonify({"error": f"Review error: {str(e)}"}), 500
+    # A complete sequential pass lets the next review skip fitz
+    if source.pdf_path and len(page_hashes) == source.total:
+        classification_cache.put_document(source.pdf_path, page_hashes)
+
+
+def _classify_review_pages_parallel(review_classifier, source: _ReviewSource, first: int,
+                                    start: int, stop: int, prev_type=None):
+    """
+    Parallel variant of _classify_review_pages for uncached PDFs.
+
+    Pages [first, stop) are scored by the worker pool; continuity is applied
+    in page order as chunks arrive, and only pages from `start` on are
+    yielded. Results are written to the cache exactly as the sequential
+    path would write them.
+    """
+    state = prev_type or "UNKNOWN"
+    page_hashes = []
+    pages = review_classifier.iter_pdf(
+        source.pdf_path,
+        pages=range(first, stop),
+        prev_type=state,
+        text_chars=TEXT_SAMPLE_CHARS,
+    )
+    for page in pages:
+        page_result = build_page_result(page.classification, page.all_scores, page.text)
+        classification_cache.put_page(page.text_hash, state, page_result)
+        page_hashes.append(page.text_hash)
+        state = page_result["doc_type"]
+
+        if page.page_index >= start:
+            page_result.update(source.page_fields(page.page_index))
+            yield page_result
+
+    if first == 0 and stop == source.total:
+        classification_cache.put_document(source.pdf_path, page_hashes)
+
+
+def _review_event(stream: str, event: str, data: dict) -> str:
+    """Encode one review stream event as an NDJSON line or SSE message."""
+    if stream == "sse":
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"event": event, "data": data}) + "\n"
+
+
+@app.route("/api/classifier/cache", methods=["GET"])
+def classifier_cache_endpoint():
+    """
+    Report persistent classification cache size and hit rate.
+
+    Response:
+        { "version": "3712729737faa547", "pages": 912, "documents": 3, "hits": 1824, "misses": 912 }
+    """
+    if not CLASSIFIER_AVAILABLE:
+        return jsonify({"error": "Document classifier not available"}), 503
+    return jsonify(classification_cache.stats())
 
 
 # ============================================================================
@@ -1773,151 +2145,248 @@ def feedback_export_post():
     })
 
 
-@app.route("/api/history", methods=["GET"])
-def get_history():
+# ============================================================================
+# SEARCH ENDPOINT
+# ============================================================================
+
+@app.route("/api/search", methods=["GET"])
+def search_endpoint():
     """
-    Return a list of all previously processed documents.
-    Scans the processed/ folder for PDFs and matching sidecars.
+    Full-text search over processed/ (OCR pages, transcripts, text ingests).
+
+    Query params:
+        q: Search text (required). Words are ANDed, "quoted phrases" and
+           trailing * prefixes are supported
+        agency: FBI, CIA, WARREN COMMISSION, ...
+        doc_type: Comma-separated doc types (FBI_302,CIA_CABLE)
+        date_from, date_to: ISO dates (YYYY-MM-DD), inclusive
+        kind: ocr | transcript | text
+        source: Restrict to one base name
+        limit: Page size (default 20, max 100)
+        offset: Results to skip
+
+    Response:
+        {
+            "query": "oswald mexico",
+            "total": 42,
+            "results": [
+                {"source": "...", "page": 3, "doc_type": "CIA_CABLE",
+                 "agency": "CIA", "date": "1963-10-10",
+                 "snippet": "... <mark>Oswald</mark> ...", "score": 7.21}
+            ],
+            "took_ms": 3.1
+        }
     """
-    if not os.path.exists(UPLOAD_FOLDER):
-        return jsonify({"files": []})
+    if search_index is None:
+        return jsonify({"error": "Search index not available"}), 503
 
-    files = []
-    media_ext_set = {f".{e}" for e in MEDIA_EXTS}
-    audio_ext_set = {f".{e}" for e in AUDIO_EXTS}
-    video_ext_set = {f".{e}" for e in VIDEO_EXTS}
+    query = (request.args.get("q") or "").strip()
+    if not query:
+        return jsonify({"error": "No query provided"}), 400
+    try:
+        limit = min(max(int(request.args.get("limit", 20)), 1), SEARCH_MAX_LIMIT)
+        offset = max(int(request.args.get("offset", 0)), 0)
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers"}), 400
+    doc_types = [t.strip() for t in request.args.get("doc_type", "").split(",") if t.strip()]
 
-    def infer_kind(filename, ext):
-        if ext == ".pdf":
-            return "document"
-        if ext in audio_ext_set:
-            return "audio"
-        if ext in video_ext_set:
-            return "video"
-        if ext in (".jpg", ".jpeg", ".png", ".tiff", ".webp", ".heic", ".heif"):
-            return "image"
-        if ext == ".txt":
-            return "text"
-        return "other"
+    started = time.perf_counter()
+    try:
+        found = search_index.search(
+            query,
+            agency=request.args.get("agency") or None,
+            doc_types=doc_types or None,
+            date_from=request.args.get("date_from") or None,
+            date_to=request.args.get("date_to") or None,
+            kind=request.args.get("kind") or None,
+            source=request.args.get("source") or None,
+            limit=limit,
+            offset=offset,
+        )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-    # Scan processed/ folder
-    for entry in os.scandir(UPLOAD_FOLDER):
-        if not entry.is_file():
-            continue
-        filename = entry.name
-        ext = os.path.splitext(filename)[1].lower()
+    return jsonify({
+        "query": query,
+        "total": found["total"],
+        "limit": limit,
+        "offset": offset,
+        "results": found["results"],
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+    })
 
-        if ext == ".pdf":
-            files.append({
-                "name": filename,
-                "status": "completed",
-                "size": entry.stat().st_size,
-                "type": "OCR_RESULT" if "_searchable" in filename else "UPLOAD",
-                "kind": infer_kind(filename, ext),
-                "origin": "processed",
-            })
-        elif ext in media_ext_set:
-            base_name = os.path.splitext(filename)[0]
-            has_transcript = os.path.exists(os.path.join(UPLOAD_FOLDER, f"{base_name}.transcript.json"))
-            files.append({
-                "name": filename,
-                "status": "completed" if has_transcript else "pending",
-                "size": entry.stat().st_size,
-                "type": "TRANSCRIPT" if has_transcript else "MEDIA_UPLOAD",
-                "kind": infer_kind(filename, ext),
-                "origin": "processed",
-            })
-        elif ext == ".txt":
-            base_name = os.path.splitext(filename)[0]
-            has_sidecar = os.path.exists(os.path.join(UPLOAD_FOLDER, f"{base_name}.ocr.json"))
-            if has_sidecar:
-                files.append({
-                    "name": filename,
-                    "status": "completed",
-                    "size": entry.stat().st_size,
-                    "type": "TEXT_INGEST",
-                    "kind": infer_kind(filename, ext),
-                    "origin": "processed",
-                })
 
-    # Also check processed/uploads/ for original/skipped files
-    uploads_dir = os.path.join(UPLOAD_FOLDER, "uploads")
-    if os.path.exists(uploads_dir):
-        for entry in os.scandir(uploads_dir):
-            if not entry.is_file():
-                continue
-            filename = entry.name
-            ext = os.path.splitext(filename)[1].lower()
-            if not any(f["name"] == filename for f in files):
-                if ext == ".pdf":
-                    files.append({
-                        "name": filename,
-                        "status": "completed",
-                        "size": entry.stat().st_size,
-                        "type": "ORIGINAL_PDF",
-                        "kind": infer_kind(filename, ext),
-                        "origin": "uploads",
-                    })
-                elif ext in media_ext_set:
-                    base_name = os.path.splitext(filename)[0]
-                    has_transcript = os.path.exists(os.path.join(UPLOAD_FOLDER, f"{base_name}.transcript.json"))
-                    files.append({
-                        "name": filename,
-                        "status": "completed" if has_transcript else "pending",
-                        "size": entry.stat().st_size,
-                        "type": "TRANSCRIPT" if has_transcript else "MEDIA_UPLOAD",
-                        "kind": infer_kind(filename, ext),
-                        "origin": "uploads",
-                    })
-
-    return jsonify({"files": files})
+@app.route("/api/search/stats", methods=["GET"])
+def search_stats_endpoint():
+    """Indexed sources and segments."""
+    if search_index is None:
+        return jsonify({"error": "Search index not available"}), 503
+    return jsonify(search_index.stats())
+
+
+@app.route("/api/history", methods=["GET"])
+def get_history():
+    """
+    Return previously processed documents from the history catalog.
+
+    Query params (all optional; without them every file is returned):
+        kind: Comma-separated kinds (document, audio, video, image, text, other)
+        type: Comma-separated types (OCR_RESULT, UPLOAD, TRANSCRIPT, MEDIA_UPLOAD,
+              TEXT_INGEST, ORIGINAL_PDF)
+        status: completed | pending
+        origin: processed | uploads
+        q: Case-insensitive substring of the file name
+        sort: name | modified | size | kind | type | status (default name)
+        order: asc | desc (default asc)
+        limit: Page size (max 1000)
+        offset: Files to skip
+
+    Response:
+        {"files": [...], "total": 123, "offset": 0, "limit": 50}
+    """
+    args = request.args
+    sort = args.get("sort", "name")
+    if sort not in HISTORY_SORT_KEYS:
+        return jsonify({"error": f"sort must be one of: {', '.join(HISTORY_SORT_KEYS)}"}), 400
+    try:
+        limit = args.get("limit")
+        limit = min(max(int(limit), 1), HISTORY_MAX_LIMIT) if limit else None
+        offset = max(int(args.get("offset", 0)), 0)
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers"}), 400
+
+    def csv(name):
+        return [v.strip() for v in args.get(name, "").split(",") if v.strip()] or None
+
+    history_catalog.refresh()
+    page = history_catalog.query(
+        kind=csv("kind"),
+        file_type=csv("type"),
+        status=args.get("status") or None,
+        origin=args.get("origin") or None,
+        search=args.get("q") or None,
+        sort=sort,
+        descending=args.get("order", "asc").lower() == "desc",
+        limit=limit,
+        offset=offset,
+    )
+    return jsonify({"files": page["files"], "total": page["total"], "offset": offset, "limit": limit})
 
 
 @app.route("/api/history/<filename>", methods=["DELETE"])
 def delete_history_file(filename):
-    """Delete a source artifact and common sidecars by basename."""
+    """Delete a source artifact and its derived sidecars (from its manifest)."""
     safe_name = os.path.basename(filename)
     if not safe_name or safe_name in (".", ".."):
         return jsonify({"error": "Invalid filename"}), 400
 
-    processed_path = os.path.join(UPLOAD_FOLDER, safe_name)
-    uploads_path = os.path.join(UPLOAD_FOLDER, "uploads", safe_name)
-    primary_path = processed_path if os.path.exists(processed_path) else uploads_path if os.path.exists(uploads_path) else None
-
-    if not primary_path:
+    base_name = document_base(safe_name)
+    manifest, relpath = artifact_manifests.resolve(safe_name)
+    if not relpath:
         return jsonify({"error": "File not found"}), 404
 
-    deleted = []
-    warnings = []
-
-    def _remove_if_exists(path):
-        if os.path.exists(path) and os.path.isfile(path):
-            try:
-                os.remove(path)
-                deleted.append(os.path.relpath(path, PROJECT_ROOT).replace("\\", "/"))
-                return True
-            except OSError as e:
-                warnings.append(f"Failed to delete {os.path.basename(path)}: {e}")
-        return False
-
-    # Delete primary file first.
-    _remove_if_exists(primary_path)
-
-    # Delete sidecars in processed root that share basename.
-    base_name, _ = os.path.splitext(safe_name)
-    sidecar_exts = (".ocr.json", ".transcript.json", ".txt", ".vtt", ".srt", ".md")
-    for ext in sidecar_exts:
-        sidecar_path = os.path.join(UPLOAD_FOLDER, f"{base_name}{ext}")
-        if os.path.normpath(sidecar_path) != os.path.normpath(primary_path):
-            _remove_if_exists(sidecar_path)
+    if relpath in manifest["alternate_sources"]:
+        # Another upload sharing the base name; the derivatives are not its
+        deleted, warnings = artifact_manifests.remove(base_name, roles=(), alternates=[relpath])
+    else:
+        primary_role = next(role for role in ROLES if manifest.get(role) == relpath)
+        # The named file plus every derivative except the other PDF
+        roles = [primary_role] + [
+            role for role in ARTIFACT_SUFFIXES
+            if role != primary_role and role != "searchable_pdf"
+        ]
+        deleted, warnings = artifact_manifests.remove(base_name, roles, alternates=[])
+        if search_index is not None:
+            search_index.remove_source(base_name)
 
     return jsonify({
         "success": True,
-        "deleted": deleted,
+        "deleted": [_project_relpath(artifact_manifests.abspath(p)) for p in deleted],
         "warnings": warnings,
     })
 
 
+def _project_relpath(path: str) -> str:
+    return os.path.relpath(path, PROJECT_ROOT).replace("\\", "/")
+
+
+def _requested_documents(data: dict) -> list[str]:
+    """Distinct document base names from a {"files": [...]} request body."""
+    names = data.get("files") or []
+    if isinstance(names, str):
+        names = [names]
+    bases = []
+    for name in names:
+        safe_name = os.path.basename(str(name))
+        if safe_name and safe_name not in (".", ".."):
+            base_name = document_base(safe_name)
+            if base_name not in bases:
+                bases.append(base_name)
+    return bases
+
+
+@app.route("/api/history/bulk-delete", methods=["POST"])
+def bulk_delete_history():
+    """
+    Delete whole documents: source, searchable PDF, every derivative and
+    the manifest.
+
+    Request:  {"files": ["yates_searchable.pdf", "interview.mp3"]}
+    Response: {"success": true, "documents": {"yates": [deleted...]}, "missing": [], "warnings": []}
+    """
+    bases = _requested_documents(request.get_json(silent=True) or {})
+    if not bases:
+        return jsonify({"error": "No files provided"}), 400
+
+    documents, missing, warnings = {}, [], []
+    for base_name in bases:
+        if not artifact_manifests.get(base_name):
+            missing.append(base_name)
+            continue
+        deleted, failed = artifact_manifests.remove(base_name)
+        documents[base_name] = [_project_relpath(artifact_manifests.abspath(p)) for p in deleted]
+        warnings.extend(failed)
+        if search_index is not None:
+            search_index.remove_source(base_name)
+
+    return jsonify({"success": True, "documents": documents, "missing": missing, "warnings": warnings})
+
+
+@app.route("/api/history/export", methods=["POST"])
+def export_history():
+    """
+    Download documents with all their derivatives as one ZIP, one folder
+    per document with its manifest.
+
+    Request: {"files": ["yates_searchable.pdf", "interview.mp3"]}
+    """
+    bases = _requested_documents(request.get_json(silent=True) or {})
+    if not bases:
+        return jsonify({"error": "No files provided"}), 400
+
+    out = tempfile.SpooledTemporaryFile(max_size=64 * 1024 * 1024)
+    exported = 0
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf:
+        for base_name in bases:
+            if artifact_manifests.export(base_name, zf):
+                exported += 1
+    if not exported:
+        return jsonify({"error": "None of the files were found"}), 404
+
+    out.seek(0)
+    download_name = f"{bases[0]}-export.zip" if len(bases) == 1 else f"export-{len(bases)}-documents.zip"
+    return send_file(out, mimetype="application/zip", as_attachment=True, download_name=download_name)
+
+
+@app.route("/api/artifacts/<filename>", methods=["GET"])
+def artifact_manifest_endpoint(filename):
+    """Artifact manifest of the document a file belongs to."""
+    manifest = artifact_manifests.get(document_base(os.path.basename(filename)))
+    if not manifest:
+        return jsonify({"error": "File not found"}), 404
+    return jsonify(manifest)
+
+
 @app.route("/api/feedback/corrections", methods=["GET"])
 def feedback_corrections():
     """
@@ -1991,6 +2460,7 @@ def paste_input():
     json_path = os.path.join(UPLOAD_FOLDER, basename + ".ocr.json")
     with open(json_path, "w", encoding="utf-8") as f:
         json.dump(ocr_json, f, indent=2)
+    _artifacts_changed(basename)
     return jsonify({"ok": True, "basename": basename, "pages": len(ocr_json["pages"]), "chars": len(text)})
 
 
@@ -2088,6 +2558,7 @@ def _scrape_html(url):
     json_path = os.path.join(UPLOAD_FOLDER, basename + ".ocr.json")
     with open(json_path, "w", encoding="utf-8") as f:
         json.dump(ocr_json, f, indent=2)
+    _artifacts_changed(basename)
     return {"success": True, "type": "scraped", "title": title, "basename": basename,
             "pages": len(ocr_json["pages"]), "chars": len(text)}
 
@@ -2198,6 +2669,7 @@ def _extract_yt_transcript(url, lang="en"):
     json_path = os.path.join(UPLOAD_FOLDER, basename + ".ocr.json")
     with open(json_path, "w", encoding="utf-8") as f:
         json.dump(ocr_json, f, indent=2)
+    _artifacts_changed(basename)
 
     print(f"[yt-transcript] Extracted {caption_source} transcript: {title} ({len(text)} chars)")
 
@@ -2331,15 +2803,117 @@ def ingest_url():
 # TTS ENDPOINTS (Kokoro Text-to-Speech)
 # ============================================================================
 
+# Languages whose pipelines are built at startup, e.g. TTS_PREWARM=a,b
+TTS_PREWARM = [lang.strip() for lang in os.environ.get("TTS_PREWARM", "").split(",") if lang.strip()]
+
+# Content-addressed cache of synthesized passages / chunks
+TTS_CACHE_DIR = os.path.join(UPLOAD_FOLDER, "tts_cache")
+TTS_CACHE_MB = int(os.environ.get("TTS_CACHE_MB", "2048"))
+tts_cache = None  # Opened by init_app
+
+# Long-text chunk sizes; a chunk may end early (after TTS_CHUNK_MIN_CHARS) at a
+# sentence whose hash picks it as a boundary, so boundaries depend on nearby
+# text only and an edit re-chunks (and resynthesizes) just its neighbourhood
+TTS_CHUNK_MAX_CHARS = 1200
+TTS_CHUNK_MIN_CHARS = 400
+TTS_CHUNK_BOUNDARY_MOD = 4
+
+# Long exports are assembled in a temp file that spills to disk past this size
+TTS_SPOOL_BYTES = 64 * 1024 * 1024
+
+# Chunk progress of long-form syntheses, keyed by client-supplied task_id
+tts_progress = {}
+_tts_progress_lock = threading.Lock()
+TTS_PROGRESS_TTL = 3600
+
+
+def _tts_progress_callback(task_id):
+    """Return an on_progress callback recording chunk progress under task_id."""
+    if not task_id:
+        return None
+
+    def on_progress(done, total):
+        now = time.time()
+        with _tts_progress_lock:
+            tts_progress[task_id] = {"done": done, "total": total, "updated": now}
+            for key in [k for k, v in tts_progress.items() if now - v["updated"] > TTS_PROGRESS_TTL]:
+                del tts_progress[key]
+
+    on_progress(0, 0)
+    return on_progress
+
+
+def _is_chunk_boundary(sentence: str) -> bool:
+    """Content-defined chunk boundary: stable for the same sentence text."""
+    digest = hashlib.sha1(" ".join(sentence.split()).encode("utf-8", errors="replace")).digest()
+    return digest[0] % TTS_CHUNK_BOUNDARY_MOD == 0
+
+
+def build_tts_chunks(raw_text: str, max_chars: int = TTS_CHUNK_MAX_CHARS,
+                     min_chars: int = TTS_CHUNK_MIN_CHARS):
+    """Split long text into synthesis chunks of whole sentences (<= max_chars)."""
+    # Sentence-aware split first, then hard wrap if needed.
+    sentences = [s.strip() for s in re.split(r"(?<=[.!?])\s+", raw_text) if s.strip()]
+    chunks = []
+    current = []
+    current_len = 0
+    for sent in sentences:
+        if len(sent) > max_chars:
+            if current:
+                chunks.append(" ".join(current).strip())
+                current = []
+                current_len = 0
+            for i in range(0, len(sent), max_chars):
+                part = sent[i:i + max_chars].strip()
+                if part:
+                    chunks.append(part)
+            continue
+        if current_len + len(sent) + 1 > max_chars and current:
+            chunks.append(" ".join(current).strip())
+            current = [sent]
+            current_len = len(sent)
+        else:
+            current.append(sent)
+            current_len += len(sent) + 1
+        if current_len >= min_chars and _is_chunk_boundary(sent):
+            chunks.append(" ".join(current).strip())
+            current = []
+            current_len = 0
+    if current:
+        chunks.append(" ".join(current).strip())
+    if not chunks:
+        chunks = [raw_text[i:i + max_chars].strip() for i in range(0, len(raw_text), max_chars)]
+    # Skip degenerate chunks (e.g., OCR noise with no letters/numbers)
+    cleaned = []
+    for c in chunks:
+        if len(re.findall(r"[A-Za-z0-9]", c)) < 20:
+            continue
+        cleaned.append(c)
+    return cleaned
+
+
 @app.route("/api/tts/config", methods=["GET"])
 def tts_config():
-    """Return TTS availability and voice list."""
+    """Return TTS availability, voice list and pipeline pool state."""
     return jsonify({
         "available": KOKORO_AVAILABLE,
         "voices": TTS_VOICES if KOKORO_AVAILABLE else [],
+        "pipelines": get_pipeline_pool().stats() if KOKORO_AVAILABLE else {},
+        "workers": get_synthesizer().workers if KOKORO_AVAILABLE else 0,
+        "cache": tts_cache.stats() if tts_cache else None,
     })
 
 
+@app.route("/api/tts/progress/<task_id>", methods=["GET"])
+def tts_progress_status(task_id):
+    """Return chunk progress for a batch or long-document synthesis."""
+    with _tts_progress_lock:
+        progress = tts_progress.get(task_id)
+    if progress is None:
+        return jsonify({"error": "Unknown task"}), 404
+    return jsonify({"task_id": task_id, "done": progress["done"], "total": progress["total"]})
+
+
 @app.route("/api/tts/preview", methods=["POST"])
 def tts_preview():
     """Synthesize a short preview (<=200 chars) and return audio blob."""
@@ -2359,7 +2933,7 @@ def tts_preview():
     lang = "b" if voice.startswith("b") else "a"
 
     try:
-        worker = TTSWorker(voice=voice, speed=speed, lang=lang)
+        worker = TTSWorker(voice=voice, speed=speed, lang=lang, cache=tts_cache)
         buf = worker.synthesize_to_buffer(text, voice=voice, speed=speed, format=fmt)
         mime = "audio/wav" if fmt == "wav" else "audio/mpeg"
         from flask import Response
@@ -2370,7 +2944,7 @@ def tts_preview():
 
 @app.route("/api/tts/synthesize", methods=["POST"])
 def tts_synthesize():
-    """Synthesize full text and return audio blob."""
+    """Synthesize full text and return audio blob (or a stream with "stream": true)."""
     if not KOKORO_AVAILABLE:
         return jsonify({"error": "Kokoro TTS not installed"}), 503
 
@@ -2382,14 +2956,41 @@ def tts_synthesize():
     voice = data.get("voice", "af_heart")
     speed = float(data.get("speed", 1.0))
     fmt = data.get("format", "wav").lower()
+    stream = bool(data.get("stream", False)) or request.args.get("stream") in ("1", "true")
 
     lang = "b" if voice.startswith("b") else "a"
 
+    if stream:
+        # Send audio as each sentence is synthesized; playback can start early
+        if fmt not in {"wav", "mp3"}:
+            return jsonify({"error": f"Unsupported format: {fmt}"}), 400
+        worker = TTSWorker(voice=voice, speed=speed, lang=lang, cache=tts_cache)
+        chunks = worker.stream_encoded(text, format=fmt)
+        try:
+            # Produce the first audio before committing to a 200, so model
+            # load and first-sentence failures still return a JSON error
+            head = [next(chunks, b"")]
+            if fmt == "wav":
+                head.append(next(chunks, b""))
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+        def generate():
+            yield from head
+            try:
+                yield from chunks
+            except Exception as e:
+                # Headers are sent: log and end the audio at the last good chunk
+                print(f"Warning: TTS stream stopped after an error: {e}")
+
+        mime = "audio/wav" if fmt == "wav" else "audio/mpeg"
+        return Response(generate(), mimetype=mime,
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
     try:
-        worker = TTSWorker(voice=voice, speed=speed, lang=lang)
+        worker = TTSWorker(voice=voice, speed=speed, lang=lang, cache=tts_cache)
         buf = worker.synthesize_to_buffer(text, voice=voice, speed=speed, format=fmt)
         mime = "audio/wav" if fmt == "wav" else "audio/mpeg"
-        from flask import Response
         return Response(buf.read(), mimetype=mime)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -2413,8 +3014,9 @@ def tts_batch():
     lang = "b" if voice.startswith("b") else "a"
 
     try:
-        worker = TTSWorker(voice=voice, speed=speed, lang=lang)
-        zip_buf = worker.synthesize_batch(items, voice=voice, speed=speed, format=fmt)
+        worker = TTSWorker(voice=voice, speed=speed, lang=lang, cache=tts_cache)
+        zip_buf = worker.synthesize_batch(items, voice=voice, speed=speed, format=fmt,
+                                          on_progress=_tts_progress_callback(data.get("task_id")))
         from flask import Response
         return Response(
             zip_buf.read(),
@@ -2439,6 +3041,7 @@ def tts_from_file():
     audio_format = str(data.get("format", "wav")).strip().lower()
     preview = bool(data.get("preview", False))
     max_chars = int(data.get("max_chars", 200))
+    output = str(data.get("output", "zip")).strip().lower()
 
     if not raw_name:
         return jsonify({"error": "filename is required"}), 400
@@ -2446,16 +3049,14 @@ def tts_from_file():
         return jsonify({"error": f"Unsupported source: {source_format}"}), 400
     if audio_format not in {"wav", "mp3"}:
         return jsonify({"error": f"Unsupported format: {audio_format}"}), 400
+    if output not in {"zip", "single"}:
+        return jsonify({"error": f"Unsupported output: {output}"}), 400
 
-    safe_base = os.path.basename(raw_name).replace("_searchable", "")
-    safe_base = os.path.splitext(safe_base)[0]
-    if source_format == "transcript":
-        target_path = os.path.join(UPLOAD_FOLDER, f"{safe_base}.transcript.json")
-    else:
-        target_path = os.path.join(UPLOAD_FOLDER, f"{safe_base}.{source_format}")
-
-    if not os.path.isfile(target_path):
-        return jsonify({"error": f"Source file not found: {os.path.basename(target_path)}"}), 404
+    safe_base = document_base(os.path.basename(raw_name))
+    target_path = artifact_manifests.artifact_path(safe_base, source_format)
+    if not target_path:
+        suffix = ARTIFACT_SUFFIXES[source_format]
+        return jsonify({"error": f"Source file not found: {safe_base}{suffix}"}), 404
 
     with open(target_path, "r", encoding="utf-8", errors="ignore") as f:
         raw_text = f.read()
@@ -2483,7 +3084,7 @@ def tts_from_file():
         text = text[:max(1, max_chars)]
 
     lang = "b" if str(voice).startswith("b") else "a"
-    worker = TTSWorker(voice=voice, speed=speed, lang=lang)
+    worker = TTSWorker(voice=voice, speed=speed, lang=lang, cache=tts_cache)
 
     try:
         if preview or len(text) <= 5000:
@@ -2496,48 +3097,26 @@ def tts_from_file():
                 download_name=f"{safe_base}.{audio_format}"
             )
 
-        # Long text: bounded chunking for safer synthesis
-        def build_tts_chunks(raw_text: str, max_chars: int = 1200):
-            # Sentence-aware split first, then hard wrap if needed.
-            sentences = [s.strip() for s in re.split(r"(?<=[.!?])\s+", raw_text) if s.strip()]
-            chunks = []
-            current = []
-            current_len = 0
-            for sent in sentences:
-                if len(sent) > max_chars:
-                    if current:
-                        chunks.append(" ".join(current).strip())
-                        current = []
-                        current_len = 0
-                    for i in range(0, len(sent), max_chars):
-                        part = sent[i:i + max_chars].strip()
-                        if part:
-                            chunks.append(part)
-                    continue
-                if current_len + len(sent) + 1 > max_chars and current:
-                    chunks.append(" ".join(current).strip())
-                    current = [sent]
-                    current_len = len(sent)
-                else:
-                    current.append(sent)
-                    current_len += len(sent) + 1
-            if current:
-                chunks.append(" ".join(current).strip())
-            if not chunks:
-                chunks = [raw_text[i:i + max_chars].strip() for i in range(0, len(raw_text), max_chars)]
-            # Skip degenerate chunks (e.g., OCR noise with no letters/numbers)
-            cleaned = []
-            for c in chunks:
-                if len(re.findall(r"[A-Za-z0-9]", c)) < 20:
-                    continue
-                cleaned.append(c)
-            return cleaned
-
-        chunks = build_tts_chunks(text, max_chars=1200)
+        chunks = build_tts_chunks(text)
         if not chunks:
             return jsonify({"error": "No synthesizeable text chunks after normalization"}), 400
+        on_progress = _tts_progress_callback(data.get("task_id"))
+        out = tempfile.SpooledTemporaryFile(max_size=TTS_SPOOL_BYTES)
+        if output == "single":
+            # One continuous file, chunks appended in order as they finish
+            worker.synthesize_concatenated(chunks, out, voice=voice, speed=speed,
+                                           format=audio_format, on_progress=on_progress)
+            out.seek(0)
+            return send_file(
+                out,
+                mimetype="audio/mpeg" if audio_format == "mp3" else "audio/wav",
+                as_attachment=True,
+                download_name=f"{safe_base}.{audio_format}"
+            )
+
         items = [{"id": str(i + 1), "text": c, "label": f"Part-{i + 1:03d}"} for i, c in enumerate(chunks)]
-        zip_buf = worker.synthesize_batch(items, voice=voice, speed=speed, format=audio_format)
+        zip_buf = worker.synthesize_batch(items, voice=voice, speed=speed, format=audio_format,
+                                          on_progress=on_progress, out=out)
         return send_file(
             zip_buf,
             mimetype="application/zip",
@@ -2567,6 +3146,10 @@ def serve_ui_files(filename):
 # MAIN
 # ============================================================================
 
+if __name__ != "__mp_main__":
+    init_app()
+
+
 if __name__ == "__main__":
     print("=" * 60)
     print("Primary Sources — OCR Web Server")
@@ -2574,6 +3157,19 @@ if __name__ == "__main__":
     print(f"Serving UI from: {UI_DIR}")
     print(f"Output folder:   {UPLOAD_FOLDER}")
     print(f"OCR backend:     {'Available' if OCR_AVAILABLE else 'Placeholder mode'}")
+    print(f"Job workers:     {job_queue.workers} (+{job_queue.quick_workers} quick)")
+    if KOKORO_AVAILABLE and TTS_PREWARM:
+        # Build pipelines in the background so startup is not blocked
+        threading.Thread(target=get_pipeline_pool().prewarm, args=(TTS_PREWARM,), daemon=True).start()
+        print(f"TTS prewarm:     {', '.join(TTS_PREWARM)}")
+    history_catalog.start()
+    if search_index is not None:
+        # Catch up with files added or removed while the server was down
+        threading.Thread(target=search_index.sync, args=(UPLOAD_FOLDER,), daemon=True).start()
+        print(f"Search index:    {SEARCH_DB_PATH}")
+    resumed = job_queue.resume()
+    if resumed:
+        print(f"Resumed jobs:    {resumed}")
     print("-" * 60)
     print("Open browser to: http://localhost:5000")
     print("=" * 60)
@@ -0,0 +1,456 @@
+"""
+search_index.py — Full-text search over everything in processed/
+
+Indexes the OCR text, transcripts and text ingests written to processed/
+in a SQLite FTS5 table, one row per page (or transcript segment), so the
+server can answer /api/search with BM25-ranked hits and highlighted
+snippets instead of the browser filtering raw JSON.
+
+Each row carries the page number, doc type, agency, classification
+confidence and document date. For OCR'd pages these come from the
+<base>.documents.json sidecar, or from running the document splitter here
+when there is none; transcripts and text ingests are classified and dated
+once as a whole, so date filters cover every kind.
+
+Sources are indexed incrementally: index_source() replaces one base
+name's rows, and sync() re-indexes only sources whose files changed.
+
+Usage:
+    index = SearchIndex("processed/search_index.db")
+    index.sync("processed")                  # Catch up with the folder
+    index.index_source("processed", "report")
+    hits = index.search("oswald mexico", agency="CIA", limit=20)
+"""
+
+import html
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from typing import Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'ocr-gui'))
+from document_classifier import get_agency
+from document_context import DocumentContext
+from document_splitter import DocumentSplitter, Page, split_text_pages
+from metadata_parser import MetadataParser
+
+# Files that make up one indexed source, by suffix
+SOURCE_SUFFIXES = (".transcript.json", ".ocr.json", ".txt", ".documents.json")
+
+# Part of every source signature; bump when indexed columns change so
+# sync() re-indexes existing sources
+INDEX_VERSION = 2
+
+# Tokens of context in a snippet
+SNIPPET_TOKENS = 24
+
+# Snippet highlight markers (control characters never found in OCR text,
+# replaced with <mark> after the snippet is HTML-escaped)
+_MARK_OPEN = "\x02"
+_MARK_CLOSE = "\x03"
+
+# In-process splitter for OCR text indexed without a documents sidecar
+_SPLITTER = DocumentSplitter()
+
+# Dates of transcripts and text ingests (built on first use)
+_PARSER: Optional[MetadataParser] = None
+
+_QUERY_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def to_match_query(query: str) -> str:
+    """
+    Turn user input into a safe FTS5 MATCH expression.
+
+    Words are ANDed, "quoted phrases" stay phrases and a trailing * makes a
+    prefix search (ruby* matches Ruby and Rubenstein). FTS5 operators and
+    punctuation in the input are treated as plain text.
+    """
+    terms = []
+    for phrase, word in _QUERY_TOKEN.findall(query):
+        if phrase:
+            words = re.findall(r"\w+", phrase)
+            if words:
+                terms.append('"' + " ".join(words) + '"')
+            continue
+        parts = re.findall(r"\w+", word)
+        terms.extend(f'"{part}"' for part in parts)
+        if parts and word.endswith("*"):
+            terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _ocr_page_text(page_data: dict) -> str:
+    """Text of one .ocr.json page (Python backend pages only carry lines)."""
+    if page_data.get("text") is not None:
+        return page_data["text"]
+    return "\n".join(line.get("text", "") for line in page_data.get("lines", []))
+
+
+def load_source(folder: str, base_name: str) -> tuple[str, list[dict]]:
+    """
+    Read one source's pages or segments.
+
+    Returns:
+        (kind, rows) where kind is "transcript", "ocr" (physical pages) or
+        "text" (paragraphs or a single block) and each row has page, text
+        and, for transcripts, start/end times
+    """
+    base_path = os.path.join(folder, base_name)
+
+    transcript_path = f"{base_path}.transcript.json"
+    if os.path.exists(transcript_path):
+        with open(transcript_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        rows = [
+            {"page": i + 1, "text": seg.get("text", ""), "start": seg.get("start"), "end": seg.get("end")}
+            for i, seg in enumerate(data.get("segments", []))
+        ]
+        return "transcript", rows
+
+    json_path = f"{base_path}.ocr.json"
+    if os.path.exists(json_path):
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        pages = data.get("pages", [])
+        rows = [{"page": p.get("page", i + 1), "text": _ocr_page_text(p)} for i, p in enumerate(pages)]
+        # OCRWorker pages carry line boxes; ingests write paragraphs as pages
+        physical = any("lines" in p for p in pages)
+        if any(row["text"].strip() for row in rows):
+            return ("ocr" if physical else "text"), rows
+
+    txt_path = f"{base_path}.txt"
+    if os.path.exists(txt_path):
+        with open(txt_path, "r", encoding="utf-8", errors="replace") as f:
+            pages = split_text_pages(f.read())
+        rows = [{"page": p.page, "text": p.text} for p in pages]
+        return ("ocr" if len(rows) > 1 else "text"), rows
+
+    return "text", []
+
+
+def _classify_rows(folder: str, base_name: str, kind: str, rows: list[dict]):
+    """Fill doc_type, agency, confidence and date_iso on each row."""
+    sidecar_path = os.path.join(folder, f"{base_name}.documents.json")
+    if kind == "ocr":
+        if os.path.exists(sidecar_path):
+            with open(sidecar_path, "r", encoding="utf-8") as f:
+                documents = json.load(f).get("documents", [])
+        else:
+            # Same split the server writes to the sidecar after OCR
+            pages = [Page(row["page"], row["text"]) for row in rows]
+            documents = [document.to_dict() for document in _SPLITTER.split(pages)]
+        for row in rows:
+            for doc in documents:
+                first, last = doc["pages"]
+                if first <= row["page"] <= last:
+                    row.update(
+                        doc_type=doc.get("doc_type"),
+                        agency=doc.get("agency"),
+                        confidence=doc.get("confidence"),
+                        date_iso=doc.get("date_iso"),
+                    )
+                    break
+        return
+
+    # Transcripts and ingests: segments are too short to classify alone
+    text = "\n\n".join(row["text"] for row in rows)
+    context = DocumentContext(text)
+    classification = context.classification
+    date_iso = _get_parser().parse(text, context=context).date_iso
+    for row in rows:
+        row.update(
+            doc_type=classification.doc_type.value,
+            agency=get_agency(classification.doc_type),
+            confidence=round(classification.confidence, 3),
+            date_iso=date_iso,
+        )
+
+
+def _get_parser() -> MetadataParser:
+    global _PARSER
+    if _PARSER is None:
+        _PARSER = MetadataParser()
+    return _PARSER
+
+
+class SearchIndex:
+    """Thread-safe SQLite FTS5 index of processed sources."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._conn = self._connect()
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sources (
+                source      TEXT PRIMARY KEY,
+                kind        TEXT NOT NULL,
+                signature   TEXT NOT NULL,
+                segments    INTEGER NOT NULL,
+                modified    REAL NOT NULL,
+                indexed_at  REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS segments (
+                id          INTEGER PRIMARY KEY,
+                source      TEXT NOT NULL,
+                page        INTEGER NOT NULL,
+                kind        TEXT NOT NULL,
+                doc_type    TEXT,
+                agency      TEXT,
+                confidence  REAL,
+                date_iso    TEXT,
+                start_time  REAL,
+                end_time    REAL,
+                text        TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS segments_source ON segments(source);
+            CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+                text,
+                content='segments',
+                content_rowid='id',
+                tokenize='porter unicode61 remove_diacritics 2'
+            );
+            """
+        )
+        self._conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """Per-thread read connection, so searches never wait on indexing."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    # =========================================================================
+    # Indexing
+    # =========================================================================
+
+    @staticmethod
+    def signature(folder: str, base_name: str) -> tuple[Optional[str], float]:
+        """
+        Modification signature of a source's files (None if it has none)
+        and the newest file's mtime.
+        """
+        parts = []
+        modified = 0.0
+        for suffix in SOURCE_SUFFIXES:
+            try:
+                st = os.stat(os.path.join(folder, f"{base_name}{suffix}"))
+            except OSError:
+                continue
+            parts.append(f"{suffix}:{st.st_mtime_ns}:{st.st_size}")
+            modified = max(modified, st.st_mtime)
+        return (f"v{INDEX_VERSION}|" + "|".join(parts) if parts else None), modified
+
+    def _delete_rows(self, source: str):
+        """Remove a source's rows. Caller holds the lock."""
+        self._conn.execute(
+            "INSERT INTO segments_fts(segments_fts, rowid, text) "
+            "SELECT 'delete', id, text FROM segments WHERE source = ?",
+            (source,),
+        )
+        self._conn.execute("DELETE FROM segments WHERE source = ?", (source,))
+        self._conn.execute("DELETE FROM sources WHERE source = ?", (source,))
+
+    def index_source(self, folder: str, base_name: str) -> int:
+        """
+        (Re)index one source by base name.
+
+        Returns:
+            Number of rows indexed (a source whose files are gone is removed)
+        """
+        signature, modified = self.signature(folder, base_name)
+        kind, rows = load_source(folder, base_name) if signature else ("text", [])
+        rows = [row for row in rows if row["text"].strip()]
+        if rows:
+            _classify_rows(folder, base_name, kind, rows)
+
+        with self._lock:
+            self._delete_rows(base_name)
+            for row in rows:
+                cursor = self._conn.execute(
+                    "INSERT INTO segments (source, page, kind, doc_type, agency, confidence, date_iso, "
+                    "start_time, end_time, text) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        base_name, row["page"], kind, row.get("doc_type"), row.get("agency"),
+                        row.get("confidence"), row.get("date_iso"), row.get("start"), row.get("end"),
+                        row["text"],
+                    ),
+                )
+                self._conn.execute(
+                    "INSERT INTO segments_fts(rowid, text) VALUES (?, ?)",
+                    (cursor.lastrowid, row["text"]),
+                )
+            if signature:
+                # Recorded even when empty so sync() does not retry it
+                self._conn.execute(
+                    "INSERT INTO sources (source, kind, signature, segments, modified, indexed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (base_name, kind, signature, len(rows), modified, time.time()),
+                )
+            self._conn.commit()
+        return len(rows)
+
+    def remove_source(self, base_name: str):
+        """Drop a source from the index."""
+        with self._lock:
+            self._delete_rows(base_name)
+            self._conn.commit()
+
+    def sync(self, folder: str) -> dict:
+        """
+        Bring the index up to date with a folder: index new and changed
+        sources, drop sources whose files are gone.
+
+        Returns:
+            Counts of indexed, removed and unchanged sources
+        """
+        base_names = set()
+        for entry in os.scandir(folder):
+            if not entry.is_file():
+                continue
+            for suffix in (".transcript.json", ".ocr.json", ".txt"):
+                if entry.name.endswith(suffix):
+                    base_names.add(entry.name[:-len(suffix)])
+                    break
+
+        with self._lock:
+            known = dict(self._conn.execute("SELECT source, signature FROM sources").fetchall())
+
+        counts = {"indexed": 0, "removed": 0, "unchanged": 0}
+        for base_name in sorted(base_names):
+            if known.get(base_name) == self.signature(folder, base_name)[0]:
+                counts["unchanged"] += 1
+                continue
+            try:
+                self.index_source(folder, base_name)
+                counts["indexed"] += 1
+            except (OSError, ValueError) as e:
+                print(f"Warning: could not index {base_name}: {e}")
+        for base_name in set(known) - base_names:
+            self.remove_source(base_name)
+            counts["removed"] += 1
+        return counts
+
+    # =========================================================================
+    # Querying
+    # =========================================================================
+
+    def search(
+        self,
+        query: str,
+        agency: Optional[str] = None,
+        doc_types: Optional[list[str]] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        kind: Optional[str] = None,
+        source: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> dict:
+        """
+        BM25-ranked full-text search.
+
+        Args:
+            query: User query (see to_match_query)
+            agency: Only rows of this agency (FBI, CIA, WARREN COMMISSION...)
+            doc_types: Only rows of these doc types
+            date_from: Only rows dated on or after this ISO date
+            date_to: Only rows dated on or before this ISO date
+            kind: "ocr", "transcript" or "text"
+            source: Only rows of this base name
+            limit: Page size
+            offset: Rows to skip
+
+        Returns:
+            {"total": n, "results": [...]} with HTML-escaped snippets whose
+            matches are wrapped in <mark>
+        """
+        match = to_match_query(query)
+        if not match:
+            return {"total": 0, "results": []}
+
+        where = ["segments_fts MATCH ?"]
+        params: list = [match]
+        if agency:
+            where.append("s.agency = ?")
+            params.append(agency.upper())
+        if doc_types:
+            where.append(f"s.doc_type IN ({', '.join('?' * len(doc_types))})")
+            params.extend(t.upper() for t in doc_types)
+        if date_from:
+            where.append("s.date_iso >= ?")
+            params.append(date_from)
+        if date_to:
+            where.append("s.date_iso <= ?")
+            params.append(date_to)
+        if kind:
+            where.append("s.kind = ?")
+            params.append(kind)
+        if source:
+            where.append("s.source = ?")
+            params.append(source)
+        condition = " AND ".join(where)
+
+        conn = self._reader()
+        total = conn.execute(
+            f"SELECT COUNT(*) FROM segments_fts JOIN segments s ON s.id = segments_fts.rowid WHERE {condition}",
+            params,
+        ).fetchone()[0]
+        rows = conn.execute(
+            f"""
+            SELECT s.source, s.page, s.kind, s.doc_type, s.agency, s.confidence, s.date_iso,
+                   s.start_time, s.end_time, src.modified, src.indexed_at,
+                   snippet(segments_fts, 0, ?, ?, '…', ?) AS snippet,
+                   bm25(segments_fts) AS score
+            FROM segments_fts
+            JOIN segments s ON s.id = segments_fts.rowid
+            JOIN sources src ON src.source = s.source
+            WHERE {condition}
+            ORDER BY score
+            LIMIT ? OFFSET ?
+            """,
+            [_MARK_OPEN, _MARK_CLOSE, SNIPPET_TOKENS] + params + [limit, offset],
+        ).fetchall()
+
+        results = []
+        for (src, page, row_kind, doc_type, row_agency, confidence, date_iso,
+             start, end, modified, indexed_at, snippet, score) in rows:
+            snippet = html.escape(snippet).replace(_MARK_OPEN, "<mark>").replace(_MARK_CLOSE, "</mark>")
+            result = {
+                "source": src,
+                "page": page,
+                "kind": row_kind,
+                "doc_type": doc_type,
+                "agency": row_agency,
+                "confidence": confidence,
+                "date": date_iso,
+                "snippet": snippet,
+                "score": round(-score, 4),
+                "modified": modified,
+                "indexed_at": indexed_at,
+            }
+            if row_kind == "transcript":
+                result["start"] = start
+                result["end"] = end
+            results.append(result)
+        return {"total": total, "results": results}
+
+    def stats(self) -> dict:
+        conn = self._reader()
+        sources, segments = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(segments), 0) FROM sources"
+        ).fetchone()
+        return {"sources": sources, "segments": segments}
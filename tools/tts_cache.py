@@ -0,0 +1,163 @@
+"""
+tts_cache.py — Content-addressed disk cache of synthesized audio
+
+Stores encoded TTS output on disk so re-listening to the same passage with
+the same settings skips Kokoro entirely.
+
+Entries are keyed by SHA-1 of:
+- the normalized text (Unicode NFC, whitespace collapsed)
+- voice, speed and lang code
+- output format ("wav", "mp3", or "pcm" for raw 16-bit chunk samples)
+
+Audio lives in <root>/<key[:2]>/<key>.<format>; a SQLite index next to it
+tracks sizes and last use, and the least recently used files are evicted
+once the total size exceeds max_bytes.
+
+TTSWorker looks entries up per chunk, so re-exporting a document where one
+passage changed only synthesizes the chunks whose text differs.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Optional
+
+# Default size cap
+MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form of a passage for cache keys."""
+    return unicodedata.normalize("NFC", " ".join(text.split()))
+
+
+def cache_key(text: str, voice: str, speed: float, lang: str, format: str) -> str:
+    """Content hash identifying one synthesized passage."""
+    payload = json.dumps(
+        [normalize_text(text), voice, f"{float(speed):g}", lang, format.lower()],
+        ensure_ascii=False,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Thread-safe, size-bounded LRU store of synthesized audio files."""
+
+    def __init__(self, root: str, max_bytes: int = MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(root, "index.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key        TEXT PRIMARY KEY,
+                format     TEXT NOT NULL,
+                size       INTEGER NOT NULL,
+                last_used  REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_last_used ON entries(last_used);
+            """
+        )
+        self._conn.commit()
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    key = staticmethod(cache_key)
+
+    def _path(self, key: str, format: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.{format.lower()}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached audio for key, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT format, size FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            try:
+                with open(self._path(key, row[0]), "rb") as f:
+                    data = f.read()
+            except OSError:
+                # File removed behind our back
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                self._bytes -= row[1]
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+        return data
+
+    def put(self, key: str, format: str, data: bytes):
+        """Store audio under key, evicting old entries past the size cap."""
+        path = self._path(key, format)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, format, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, format.lower(), len(data), time.time()),
+            )
+            self._bytes += len(data) - (row[0] if row else 0)
+            if self._bytes > self.max_bytes:
+                self._prune()
+            self._conn.commit()
+
+    # =========================================================================
+    # Maintenance
+    # =========================================================================
+
+    def _prune(self):
+        """Evict least recently used files until under max_bytes. Caller holds the lock."""
+        rows = self._conn.execute("SELECT key, format, size FROM entries ORDER BY last_used ASC")
+        evicted = []
+        for key, format, size in rows:
+            if self._bytes <= self.max_bytes:
+                break
+            evicted.append(key)
+            self._bytes -= size
+            try:
+                os.remove(self._path(key, format))
+            except OSError:
+                pass
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in evicted])
+
+    def clear(self):
+        """Drop all cached audio."""
+        with self._lock:
+            for key, format in self._conn.execute("SELECT key, format FROM entries").fetchall():
+                try:
+                    os.remove(self._path(key, format))
+                except OSError:
+                    pass
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Return size and hit/miss counters."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {
+            "entries": entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
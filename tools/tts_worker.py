@@ -5,21 +5,34 @@ Modeled on transcription_worker.py. Wraps Kokoro KPipeline for local,
 CPU-friendly speech synthesis (82M params, <0.3s per passage, Apache 2.0).
 
 Outputs: WAV or MP3 audio files at 24kHz sample rate.
+
+Pipelines come from a process-wide pool (get_pipeline_pool) so constructing
+a TTSWorker per request is cheap: the Kokoro model loads once and warm
+pipelines are reused across requests.
+
+Batches and long documents are synthesized chunk by chunk in a process
+pool (get_synthesizer); each worker process keeps its own warm pipelines
+and finished chunks are written to the zip or audio file in order. Pass a
+tts_cache.TTSCache as `cache` to reuse previously synthesized passages.
 """
 
+import importlib.util
 import io
+import multiprocessing
 import os
+import struct
+import threading
+import time
 import zipfile
-from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
 
 import numpy as np
 
-# Check for Kokoro availability
-try:
-    from kokoro import KPipeline
-    KOKORO_AVAILABLE = True
-except ImportError:
-    KOKORO_AVAILABLE = False
+# Check for Kokoro availability; it is imported when the first pipeline is
+# built, since importing it pulls in torch
+KOKORO_AVAILABLE = importlib.util.find_spec("kokoro") is not None
 
 # Check for soundfile availability
 try:
@@ -30,6 +43,15 @@ except ImportError:
 
 SAMPLE_RATE = 24000
 
+# Warm pipelines per lang_code; also the max concurrent syntheses per language
+TTS_PIPELINES_PER_LANG = int(os.environ.get("TTS_PIPELINES_PER_LANG", "2"))
+
+# Processes used for batch / long-document synthesis (0 = half the cores, max 4)
+TTS_WORKERS = int(os.environ.get("TTS_WORKERS", "0")) or max(1, min(4, (os.cpu_count() or 2) // 2))
+
+# Chunks queued per process; bounds memory held by finished-but-unwritten audio
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
 # Kokoro voices — subset of most useful ones for document narration
 VOICES = [
     # American Female
@@ -62,22 +84,157 @@ VOICES = [
 ]
 
 
+# ============================================================================
+# PIPELINE POOL
+# ============================================================================
+
+class PipelinePool:
+    """
+    Thread-safe pool of warm Kokoro pipelines keyed by lang_code.
+
+    At most max_per_lang pipelines exist per language; a caller borrowing
+    one while all are busy waits for a free one, which bounds concurrent
+    synthesis. All pipelines share one Kokoro model.
+
+    Usage:
+        with get_pipeline_pool().pipeline("a") as pipeline:
+            for result in pipeline(text, voice="af_heart"):
+                ...
+    """
+
+    def __init__(self, max_per_lang: int = TTS_PIPELINES_PER_LANG):
+        self.max_per_lang = max(1, max_per_lang)
+        self._idle: dict[str, list] = {}
+        self._created: dict[str, int] = {}
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.load_seconds = 0.0
+
+    def _create(self, lang: str):
+        """Build a pipeline, reusing the shared model once one exists."""
+        if not KOKORO_AVAILABLE:
+            raise RuntimeError("Kokoro not installed. Run: pip install kokoro")
+        from kokoro import KPipeline
+
+        start = time.time()
+        pipeline = None
+        if self._model is None:
+            # Only one caller loads the model; concurrent first requests
+            # (for any lang) wait here and then share it
+            with self._model_lock:
+                if self._model is None:
+                    pipeline = KPipeline(lang_code=lang)
+                    self._model = getattr(pipeline, "model", None)
+        if pipeline is None:
+            pipeline = KPipeline(lang_code=lang, model=self._model)
+        with self._cond:
+            self.load_seconds += time.time() - start
+        return pipeline
+
+    def acquire(self, lang: str):
+        """Borrow a pipeline for lang, creating or waiting for one as needed."""
+        with self._cond:
+            while True:
+                idle = self._idle.setdefault(lang, [])
+                if idle:
+                    self.hits += 1
+                    return idle.pop()
+                if self._created.get(lang, 0) < self.max_per_lang:
+                    # Reserve the slot; build outside the lock
+                    self._created[lang] = self._created.get(lang, 0) + 1
+                    self.misses += 1
+                    break
+                self.waits += 1
+                self._cond.wait()
+
+        try:
+            return self._create(lang)
+        except Exception:
+            with self._cond:
+                self._created[lang] -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, lang: str, pipeline):
+        """Return a borrowed pipeline."""
+        with self._cond:
+            self._idle.setdefault(lang, []).append(pipeline)
+            self._cond.notify()
+
+    @contextmanager
+    def pipeline(self, lang: str):
+        """Context manager around acquire()/release()."""
+        pipeline = self.acquire(lang)
+        try:
+            yield pipeline
+        finally:
+            self.release(lang, pipeline)
+
+    def prewarm(self, langs: List[str], count: int = 1):
+        """Create up to count idle pipelines per language ahead of requests."""
+        for lang in langs:
+            borrowed = [self.acquire(lang) for _ in range(min(count, self.max_per_lang))]
+            for pipeline in borrowed:
+                self.release(lang, pipeline)
+
+    def stats(self) -> dict:
+        """Pipelines per language plus hit/miss/wait counters."""
+        with self._cond:
+            return {
+                "max_per_lang": self.max_per_lang,
+                "pipelines": dict(self._created),
+                "idle": {lang: len(p) for lang, p in self._idle.items()},
+                "hits": self.hits,
+                "misses": self.misses,
+                "waits": self.waits,
+                "load_seconds": round(self.load_seconds, 2),
+            }
+
+
+_POOL = PipelinePool()
+
+
+def get_pipeline_pool() -> PipelinePool:
+    """Return the process-wide Kokoro pipeline pool."""
+    return _POOL
+
+
+# ============================================================================
+# STREAMING ENCODING
+# ============================================================================
+
+# RIFF/data sizes used when the total length is unknown up front
+_STREAM_SIZE = 0xFFFFFFFF
+
+
+def _streaming_wav_header() -> bytes:
+    """Header for a mono 16-bit PCM WAV stream of unknown length."""
+    return (
+        b"RIFF" + struct.pack("<I", _STREAM_SIZE) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, SAMPLE_RATE, SAMPLE_RATE * 2, 2, 16)
+        + b"data" + struct.pack("<I", _STREAM_SIZE)
+    )
+
+
+def _pcm16(audio) -> bytes:
+    """Float samples in [-1, 1] as little-endian 16-bit PCM."""
+    return (np.clip(np.asarray(audio, dtype=np.float32), -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
 class TTSWorker:
     """Handles text-to-speech synthesis using Kokoro TTS pipeline."""
 
-    def __init__(self, voice: str = "af_heart", speed: float = 1.0, lang: str = "a"):
+    def __init__(self, voice: str = "af_heart", speed: float = 1.0, lang: str = "a",
+                 pool: Optional[PipelinePool] = None, cache=None):
         self.voice = voice
         self.speed = speed
         self.lang = lang
-        self._pipeline = None
-
-    def _get_pipeline(self):
-        """Lazy-load the Kokoro pipeline on first use."""
-        if self._pipeline is None:
-            if not KOKORO_AVAILABLE:
-                raise RuntimeError("Kokoro not installed. Run: pip install kokoro")
-            self._pipeline = KPipeline(lang_code=self.lang)
-        return self._pipeline
+        self.pool = pool or get_pipeline_pool()
+        self.cache = cache  # Optional tts_cache.TTSCache
 
     def synthesize(self, text: str, voice: Optional[str] = None, speed: Optional[float] = None) -> np.ndarray:
         """Synthesize text to numpy audio array (24kHz).
@@ -90,21 +247,59 @@ class TTSWorker:
         Returns:
             numpy array of audio samples at 24kHz.
         """
-        pipeline = self._get_pipeline()
-        v = voice or self.voice
-        s = speed or self.speed
-
         # Kokoro yields results per chunk — concatenate all
-        chunks = []
-        for result in pipeline(text, voice=v, speed=s):
-            if result.audio is not None:
-                chunks.append(result.audio)
+        chunks = list(self.iter_audio(text, voice=voice, speed=speed))
 
         if not chunks:
             return np.array([], dtype=np.float32)
 
         return np.concatenate(chunks)
 
+    def iter_audio(self, text: str, voice: Optional[str] = None, speed: Optional[float] = None) -> Iterator[np.ndarray]:
+        """Yield audio (24kHz samples) per Kokoro result as it is produced.
+
+        The pipeline stays borrowed from the pool until the iterator is
+        exhausted or closed.
+        """
+        v = voice or self.voice
+        s = speed or self.speed
+        with self.pool.pipeline(self.lang) as pipeline:
+            for result in pipeline(text, voice=v, speed=s):
+                if result.audio is not None:
+                    yield result.audio
+
+    def stream_encoded(
+        self,
+        text: str,
+        voice: Optional[str] = None,
+        speed: Optional[float] = None,
+        format: str = "wav",
+    ) -> Iterator[bytes]:
+        """Yield encoded audio as each Kokoro result is produced.
+
+        WAV is sent as one 16-bit PCM stream whose header declares an
+        unknown length. MP3 is sent as a sequence of independently encoded
+        segments, which players decode back to back.
+
+        Args:
+            text: Text to synthesize.
+            voice: Override voice ID.
+            speed: Override speed.
+            format: "wav" or "mp3".
+
+        Returns:
+            Iterator of byte strings.
+        """
+        if format.lower() == "wav":
+            yield _streaming_wav_header()
+        for audio in self.iter_audio(text, voice=voice, speed=speed):
+            if format.lower() == "wav":
+                yield _pcm16(audio)
+            else:
+                buf = io.BytesIO()
+                sf.write(buf, audio, SAMPLE_RATE, format=format.upper())
+                yield buf.getvalue()
+
     def synthesize_to_file(
         self,
         text: str,
@@ -150,12 +345,21 @@ class TTSWorker:
         Returns:
             BytesIO buffer containing the audio data.
         """
-        audio = self.synthesize(text, voice=voice, speed=speed)
+        v = voice or self.voice
+        s = speed or self.speed
+        key = self.cache.key(text, v, s, self.lang, format) if self.cache else None
+        data = self.cache.get(key) if self.cache else None
+        if data is not None:
+            return io.BytesIO(data)
+
+        audio = self.synthesize(text, voice=v, speed=s)
         if len(audio) == 0:
             raise ValueError("No audio generated — text may be empty or unsupported")
 
         buf = io.BytesIO()
         sf.write(buf, audio, SAMPLE_RATE, format=format.upper())
+        if self.cache:
+            self.cache.put(key, format, buf.getvalue())
         buf.seek(0)
         return buf
 
@@ -165,40 +369,243 @@ class TTSWorker:
         voice: Optional[str] = None,
         speed: Optional[float] = None,
         format: str = "wav",
-    ) -> io.BytesIO:
-        """Synthesize multiple items and return as zip archive.
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        out=None,
+    ):
+        """Synthesize multiple items in parallel and return as zip archive.
 
         Args:
             items: List of {"id": str, "text": str, "label": str} dicts.
             voice: Override voice ID.
             speed: Override speed.
             format: "wav" or "mp3".
+            on_progress: Called with (items_done, items_total).
+            out: Seekable binary file to write the zip to (default: BytesIO).
 
         Returns:
-            BytesIO buffer containing a zip of audio files.
+            The zip file object, rewound to the start.
         """
-        ext = format.lower()
-        zip_buf = io.BytesIO()
-
-        with zipfile.ZipFile(zip_buf, "w", zipfile.ZIP_DEFLATED) as zf:
-            for item in items:
-                text = item.get("text", "").strip()
-                label = item.get("label", item.get("id", "untitled"))
-                # Sanitize filename
-                safe_label = "".join(c if c.isalnum() or c in " -_" else "" for c in label).strip()
-                safe_label = safe_label.replace(" ", "-") or "audio"
-                filename = f"{safe_label}.{ext}"
+        zip_buf = out if out is not None else io.BytesIO()
+        get_synthesizer().write_zip(
+            items, zip_buf,
+            voice=voice or self.voice, speed=speed or self.speed, lang=self.lang,
+            format=format, on_progress=on_progress, cache=self.cache,
+        )
+        zip_buf.seek(0)
+        return zip_buf
 
-                if not text:
-                    continue
+    def synthesize_concatenated(
+        self,
+        texts: List[str],
+        out,
+        voice: Optional[str] = None,
+        speed: Optional[float] = None,
+        format: str = "wav",
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ):
+        """Synthesize chunks in parallel into one continuous audio file.
 
-                audio_buf = self.synthesize_to_buffer(text, voice=voice, speed=speed, format=format)
-                zf.writestr(filename, audio_buf.read())
+        Args:
+            texts: Chunk texts, in playback order.
+            out: Path or writable binary file object.
+            voice: Override voice ID.
+            speed: Override speed.
+            format: "wav" or "mp3".
+            on_progress: Called with (chunks_done, chunks_total).
 
-        zip_buf.seek(0)
-        return zip_buf
+        Returns:
+            out
+        """
+        return get_synthesizer().write_concatenated(
+            texts, out,
+            voice=voice or self.voice, speed=speed or self.speed, lang=self.lang,
+            format=format, on_progress=on_progress, cache=self.cache,
+        )
 
     @staticmethod
     def get_voices() -> List[dict]:
         """Return list of available voices."""
         return VOICES
+
+
+# ============================================================================
+# PARALLEL SYNTHESIS
+# ============================================================================
+
+def _init_synthesis_process(torch_threads: int):
+    """Worker initializer: split the CPU threads between synthesis processes."""
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+
+def _synthesize_chunk(text: str, voice: str, speed: float, lang: str, format: str) -> bytes:
+    """Worker: synthesize one chunk with this process's pipelines.
+
+    Returns audio encoded as format, or raw 16-bit PCM samples for "pcm".
+    """
+    audio = TTSWorker(voice=voice, speed=speed, lang=lang).synthesize(text)
+    if len(audio) == 0:
+        raise ValueError("No audio generated — text may be empty or unsupported")
+    if format == "pcm":
+        return _pcm16(audio)
+    buf = io.BytesIO()
+    sf.write(buf, audio, SAMPLE_RATE, format=format.upper())
+    return buf.getvalue()
+
+
+def _zip_filename(item: dict, ext: str) -> str:
+    """Sanitized archive name for a batch item."""
+    label = item.get("label", item.get("id", "untitled"))
+    safe_label = "".join(c if c.isalnum() or c in " -_" else "" for c in label).strip()
+    safe_label = safe_label.replace(" ", "-") or "audio"
+    return f"{safe_label}.{ext}"
+
+
+class ParallelSynthesizer:
+    """
+    Process pool that synthesizes text chunks in parallel, in order.
+
+    Each process loads its own Kokoro pipelines on first use and keeps them
+    warm, so the pool is created lazily and reused until shutdown(). Single
+    chunks, or a pool of one worker, are synthesized in the calling thread
+    with the shared pipeline pool instead.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = max(1, workers or TTS_WORKERS)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_synthesis_process,
+                    initargs=(max(1, (os.cpu_count() or 1) // self.workers),),
+                )
+            return self._executor
+
+    def shutdown(self):
+        """Stop the worker processes (a later call starts a new pool)."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def iter_chunks(
+        self,
+        texts: List[str],
+        voice: str,
+        speed: float,
+        lang: str,
+        format: str = "wav",
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        cache=None,
+    ) -> Iterator[tuple]:
+        """
+        Synthesize chunks, yielding (index, audio_bytes) in chunk order.
+
+        At most CHUNKS_IN_FLIGHT_PER_WORKER chunks per process are queued
+        ahead of the one being consumed. audio_bytes is encoded in the given
+        format, or raw 16-bit PCM for "pcm". Chunks found in cache (a
+        TTSCache) are not synthesized again; new ones are added to it.
+        """
+        total = len(texts)
+        keys = [cache.key(text, voice, speed, lang, format) for text in texts] if cache else None
+
+        def cached(i):
+            return cache.get(keys[i]) if cache else None
+
+        def store(i, data):
+            """Add a freshly synthesized chunk to the cache."""
+            if cache:
+                cache.put(keys[i], format, data)
+            return data
+
+        def done(i, data):
+            if on_progress:
+                on_progress(i + 1, total)
+            return i, data
+
+        if self.workers <= 1 or total <= 1:
+            for i, text in enumerate(texts):
+                data = cached(i)
+                if data is None:
+                    data = store(i, _synthesize_chunk(text, voice, speed, lang, format))
+                yield done(i, data)
+            return
+
+        window = self.workers * CHUNKS_IN_FLIGHT_PER_WORKER
+        pending = {}
+        next_submit = 0
+        try:
+            for i in range(total):
+                while next_submit < total and next_submit < i + window:
+                    data = cached(next_submit)
+                    if data is None:
+                        data = self._pool().submit(
+                            _synthesize_chunk, texts[next_submit], voice, speed, lang, format
+                        )
+                    pending[next_submit] = data
+                    next_submit += 1
+                data = pending.pop(i)
+                if not isinstance(data, bytes):
+                    data = store(i, data.result())
+                yield done(i, data)
+        finally:
+            # Abandoned or failed: drop chunks that have not started yet
+            for data in pending.values():
+                if not isinstance(data, bytes):
+                    data.cancel()
+
+    def write_zip(self, items: List[dict], out, voice: str, speed: float, lang: str,
+                  format: str = "wav", on_progress: Optional[Callable[[int, int], None]] = None,
+                  cache=None):
+        """Synthesize batch items into a zip, one audio file per item (see TTSWorker.synthesize_batch)."""
+        ext = format.lower()
+        entries = []
+        for item in items:
+            text = item.get("text", "").strip()
+            if text:
+                entries.append((_zip_filename(item, ext), text))
+
+        with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf:
+            texts = [text for _, text in entries]
+            for i, data in self.iter_chunks(texts, voice, speed, lang, format=ext,
+                                            on_progress=on_progress, cache=cache):
+                zf.writestr(entries[i][0], data)
+        return out
+
+    def write_concatenated(self, texts: List[str], out, voice: str, speed: float, lang: str,
+                           format: str = "wav", on_progress: Optional[Callable[[int, int], None]] = None,
+                           cache=None):
+        """Synthesize chunks into one audio file (see TTSWorker.synthesize_concatenated)."""
+        with sf.SoundFile(out, "w", samplerate=SAMPLE_RATE, channels=1, format=format.upper()) as f:
+            for _, data in self.iter_chunks(texts, voice, speed, lang, format="pcm",
+                                            on_progress=on_progress, cache=cache):
+                f.write(np.frombuffer(data, dtype="<i2"))
+        return out
+
+
+_SYNTHESIZER: Optional[ParallelSynthesizer] = None
+_SYNTHESIZER_LOCK = threading.Lock()
+
+
+def get_synthesizer() -> ParallelSynthesizer:
+    """Return the process-wide parallel synthesizer (created on first use)."""
+    global _SYNTHESIZER
+    with _SYNTHESIZER_LOCK:
+        if _SYNTHESIZER is None:
+            _SYNTHESIZER = ParallelSynthesizer()
+        return _SYNTHESIZER
@@ -4,15 +4,13 @@ Warren Commission Volume Testing
 
 Tests the classifier across all WC volumes to discover patterns and improve detection.
 """
-import fitz
 import json
 import os
 import sys
 from datetime import datetime
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'ocr-gui'))
-from document_classifier import classify_document, get_all_scores, DocType
-from zone_extractor import extract_document
+from parallel_classifier import ParallelClassifier, page_count
 
 WC_DIR = "raw-material/warren-commission"
 OUTPUT_DIR = "tools/output/wc_volumes"
@@ -26,28 +24,28 @@ def get_wc_volumes():
             files.append((vol_num, os.path.join(WC_DIR, f)))
     return sorted(files)
 
-def test_volume(vol_num: int, pdf_path: str, sample_size: int = 15):
-    """Test a single volume and return results."""
+def sample_pages(total_pages: int, sample_size: int = 15) -> list:
+    """0-based indexes of pages sampled evenly across a volume."""
+    step = max(1, total_pages // sample_size)
+    return list(range(0, total_pages, step))[:sample_size]
+
+def test_volume(vol_num: int, pdf_path: str, pages: list):
+    """Report results for a volume's pages classified by ParallelClassifier."""
     print(f"\n{'='*60}")
     print(f"VOLUME {vol_num}: {os.path.basename(pdf_path)}")
     print(f"{'='*60}")
     
-    pdf = fitz.open(pdf_path)
-    total_pages = len(pdf)
+    total_pages = page_count(pdf_path)
     print(f"Total pages: {total_pages}")
     
-    # Sample pages evenly distributed
-    step = max(1, total_pages // sample_size)
-    sample_pages = list(range(1, total_pages + 1, step))[:sample_size]
-    
     results = []
     type_counts = {}
     
-    for page_num in sample_pages:
-        text = pdf[page_num - 1].get_text()
-        
-        classification = classify_document(text)
-        extraction = extract_document(text)
+    for page in pages:
+        page_num = page.page
+        text = page.text
+        classification = page.classification
+        extraction = page.extraction
         
         doc_type = classification.doc_type.value
         type_counts[doc_type] = type_counts.get(doc_type, 0) + 1
@@ -63,12 +61,10 @@ def test_volume(vol_num: int, pdf_path: str, sample_size: int = 15):
         conf_str = f"{classification.confidence:.0%}"
         print(f"  Page {page_num:4d}: {doc_type:15s} ({conf_str:>4s}) - {len(extraction.fields)} fields")
     
-    pdf.close()
-    
     return {
         "volume": vol_num,
         "total_pages": total_pages,
-        "sample_size": len(sample_pages),
+        "sample_size": len(pages),
         "type_counts": type_counts,
         "results": results
     }
@@ -87,8 +83,18 @@ def main():
     all_results = []
     overall_counts = {}
     
+    # Sampled pages of every volume are classified in parallel up front
+    with ParallelClassifier() as classifier:
+        classified = classifier.classify_pdfs(
+            [pdf_path for _, pdf_path in volumes],
+            pages_for=sample_pages,
+            continuity=False,
+            text_chars=200,
+            extract=True,
+        )
+    
     for vol_num, pdf_path in volumes:
-        result = test_volume(vol_num, pdf_path)
+        result = test_volume(vol_num, pdf_path, classified[pdf_path])
         all_results.append(result)
         
         # Aggregate counts
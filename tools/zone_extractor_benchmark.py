@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Zone Extractor Benchmark - compiled extraction plans vs. per-call regexes
+
+Runs zone_extractor.extract_by_type on FBI 302 pages (the Yates documents)
+and Warren Commission testimony pages, checks that every result is
+byte-identical to the original split/join + re.search implementation, and
+times both.
+
+Usage:
+    python tools/zone_extractor_benchmark.py [--rounds 200]
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'ocr-gui'))
+from document_classifier import ClassificationResult, DocType
+import zone_extractor
+from zone_extractor import (
+    ExtractedZoneField,
+    TYPE_PATTERNS,
+    ZONE_CONFIG,
+    ZoneExtractionResult,
+    extract_by_type,
+    extract_zones,
+    segment_body,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FBI_302_TEXT = os.path.join(ROOT, "web", "html", "processed", "ralphleonyatesdocumentsfull.txt")
+WC_TESTIMONY_PAGES = os.path.join(ROOT, "tools", "output", "wc_vol1_test", "pages", "*.txt")
+
+
+# =============================================================================
+# REFERENCE IMPLEMENTATION (before compiled plans)
+# =============================================================================
+
+def reference_zones(text: str, doc_type: DocType) -> tuple[str, str, str]:
+    config = ZONE_CONFIG.get(doc_type, ZONE_CONFIG[DocType.UNKNOWN])
+    lines = text.split('\n')
+    header_count = config["header_lines"]
+    footer_count = config["footer_lines"]
+    if len(lines) <= header_count + footer_count:
+        return text, "", ""
+    header = '\n'.join(lines[:header_count])
+    footer = '\n'.join(lines[-footer_count:])
+    body = '\n'.join(lines[header_count:-footer_count])
+    return header, body, footer
+
+
+def reference_extract(text: str, classification: ClassificationResult) -> ZoneExtractionResult:
+    result = ZoneExtractionResult(
+        doc_type=classification.doc_type.value,
+        doc_type_confidence=classification.confidence,
+    )
+    header, body, footer = reference_zones(text, classification.doc_type)
+    patterns = TYPE_PATTERNS.get(classification.doc_type, [])
+    if not patterns:
+        result.extraction_notes.append(f"No patterns defined for {classification.doc_type.value}")
+        return result
+    for pattern, field_name, zone, base_confidence in patterns:
+        if field_name in result.fields:
+            continue
+        if zone == "header":
+            search_text = header
+        elif zone == "footer":
+            search_text = footer
+        elif zone == "body":
+            search_text = body
+        else:
+            search_text = text
+        match = re.search(pattern, search_text, re.IGNORECASE | re.MULTILINE)
+        if match:
+            value = match.group(1) if match.groups() else match.group(0)
+            result.fields[field_name] = ExtractedZoneField(
+                field_name=field_name,
+                value=value.strip(),
+                zone=zone,
+                confidence=base_confidence * min(1.0, classification.confidence + 0.3),
+                pattern_name=f"{classification.doc_type.value}_{field_name}",
+                raw_match=match.group(0),
+            )
+    result.segments = segment_body(body, classification.doc_type)
+    result.extraction_notes.append(
+        f"Extracted {len(result.fields)} field(s) and {len(result.segments)} body segment(s) for {classification.doc_type.value}"
+    )
+    return result
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def load_pages() -> dict[DocType, list[str]]:
+    """FBI 302 pages (form-feed separated) and WC testimony pages."""
+    pages = {DocType.FBI_302: [], DocType.WC_TESTIMONY: []}
+    if os.path.exists(FBI_302_TEXT):
+        with open(FBI_302_TEXT, encoding="utf-8", errors="replace") as f:
+            pages[DocType.FBI_302] = [p for p in f.read().split('\f') if p.strip()]
+    for path in sorted(glob.glob(WC_TESTIMONY_PAGES)):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            pages[DocType.WC_TESTIMONY].append(f.read())
+    return pages
+
+
+def snapshot(result: ZoneExtractionResult) -> str:
+    """Serialize everything extract_by_type produces, raw matches included."""
+    data = result.to_dict()
+    data["raw"] = {name: (f.raw_match, f.confidence) for name, f in result.fields.items()}
+    return json.dumps(data, ensure_ascii=False)
+
+
+def check_identical(pages: dict[DocType, list[str]]) -> int:
+    """Compare both implementations on every page for every doc type."""
+    checked = 0
+    texts = [text for group in pages.values() for text in group]
+    for doc_type in DocType:
+        classification = ClassificationResult(doc_type, 0.6, [], "")
+        for text in texts:
+            if extract_zones(text, doc_type) != reference_zones(text, doc_type):
+                raise AssertionError(f"zones differ for {doc_type.value}")
+            if snapshot(extract_by_type(text, classification)) != snapshot(reference_extract(text, classification)):
+                raise AssertionError(f"extraction differs for {doc_type.value}")
+            checked += 1
+    return checked
+
+
+def time_pages(fn, texts: list[str], classification: ClassificationResult, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            fn(text, classification)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument("--rounds", type=int, default=200, help="Passes over each page set")
+    args = parser.parse_args()
+
+    pages = load_pages()
+    if not any(pages.values()):
+        print("No sample pages found")
+        return 1
+
+    checked = check_identical(pages)
+    print(f"Byte-identical on {checked} page/type combinations")
+    print()
+    print(f"{'Pages':<16}{'Count':>6}{'Reference':>12}{'Compiled':>12}{'Speedup':>10}")
+
+    for doc_type, texts in pages.items():
+        if not texts:
+            continue
+        classification = ClassificationResult(doc_type, 1.0, [], "")
+        zone_extractor.get_extraction_plan(doc_type)  # Compile outside the timing
+        old = time_pages(reference_extract, texts, classification, args.rounds)
+        new = time_pages(extract_by_type, texts, classification, args.rounds)
+        calls = len(texts) * args.rounds
+        print(f"{doc_type.value:<16}{len(texts):>6}{old / calls * 1e6:>10.1f}us{new / calls * 1e6:>10.1f}us{old / new:>9.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3522,9 +3522,9 @@ class DocumentWorkbench {
         const statusEl = document.getElementById('load-status');
         if (statusEl) statusEl.innerHTML = '<span class="loading-spinner"></span> Classifying pages…';
         try {
-            const res = await fetch(`/api/review/${encodeURIComponent(this.FILE_NAME)}`);
+            const res = await fetch(`/api/review/${encodeURIComponent(this.FILE_NAME)}?stream=ndjson`);
             if (!res.ok) throw new Error(`HTTP ${res.status}`);
-            this.classificationData = await res.json();
+            this.classificationData = await this.readReviewStream(res, statusEl);
             const pageLabel = this.classificationData.media_type ? 'segments' : 'pages';
             const durationInfo = this.classificationData.duration ? ` • ${this.classifyTab.formatTime(this.classificationData.duration)}` : '';
             document.getElementById('file-info').textContent = `${this.classificationData.filename} • ${this.classificationData.total_pages} ${pageLabel}${durationInfo} • ${new Date().toISOString().slice(0, 16).replace('T', ' ')}`;
@@ -3553,6 +3553,38 @@ class DocumentWorkbench {
         }
     }
 
+    // Reads the NDJSON review stream, painting the first card page as soon as it arrives.
+    async readReviewStream(res, statusEl) {
+        const data = { pages: [] };
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let painted = false;
+        const handle = (line) => {
+            if (!line.trim()) return;
+            const { event, data: payload } = JSON.parse(line);
+            if (event === 'meta') Object.assign(data, payload);
+            else if (event === 'page') data.pages.push(payload);
+            else if (event === 'error') throw new Error(payload.error);
+        };
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            lines.forEach(handle);
+            if (statusEl && data.total_pages) statusEl.innerHTML = `<span class="loading-spinner"></span> Classifying pages… ${data.pages.length}/${data.total_pages}`;
+            if (!painted && data.pages.length >= Math.min(this.classifyTab.itemsPerPage, data.total_pages || Infinity)) {
+                painted = true;
+                this.classificationData = data;
+                this.classifyTab.renderCards(data.pages);
+            }
+        }
+        handle(buffer + decoder.decode());
+        return data;
+    }
+
     reconcileFeedbackStatuses() {
         if (!this.classificationData?.pages || !this.feedback) return;
 